@@ -0,0 +1,36 @@
+"""Strategy-selection latency: per-string run_inference loop vs one batched predict.
+
+Run from src/:  python -m benchmarks.bench_inference
+"""
+import time
+import inference
+
+INPUT_FILE = "./input/input.txt"
+MODEL_PATH = "./models/lightgbm_model.pkl"
+
+def per_string():
+    # What get_best_string used to do: parse the file and unpickle the model once per agent string
+    return max(inference.agent_strings, key=lambda agent: inference.run_inference(INPUT_FILE, agent, MODEL_PATH))
+
+def batched():
+    return inference.rank_agent_strings(INPUT_FILE, MODEL_PATH)[0][0]
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+def main(repeat=3):
+    loop_ms, loop_best = timed(per_string, repeat)
+    inference.load_model.cache_clear()
+    cold_ms, cold_best = timed(batched, 1)
+    warm_ms, warm_best = timed(batched, repeat * 10)
+    assert loop_best == cold_best == warm_best
+    print(f"per-string loop (90 loads + 90 predicts): {loop_ms:8.1f} ms")
+    print(f"batched, cold model cache:                {cold_ms:8.1f} ms")
+    print(f"batched, warm model cache:                {warm_ms:8.1f} ms")
+    print(f"speedup (loop / cold): {loop_ms / cold_ms:.1f}x, (loop / warm): {loop_ms / warm_ms:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Tree-array predictor: parity with LightGBM and latency for single-row and 90-row batches.
+
+Run from src/:  python -m benchmarks.bench_predictor
+"""
+import time
+import numpy as np
+from inference import (REQUIRED_COLUMNS, agent_strings, build_feature_frame, extract_ludii_features, load_model,
+                       parse_ludii_text)
+from models.lgbm import LGBMModel
+from models.tree_predictor import TreeArrayPredictor
+from pipeline import ludii_mnk_description
+
+MODEL_PATH = "./models/lightgbm_model.pkl"
+
+def median_us(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1e6
+
+def dense(matrix):
+    return np.asarray(matrix.toarray() if hasattr(matrix, 'toarray') else matrix, dtype=np.float32)
+
+def synthetic_model(rows=20_000, features=40, trees=300, seed=0, **params):
+    """An LGBMModel trained on data with NaNs and exact zeros, so every missing-value rule is exercised."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[rng.random(X.shape) < 0.1] = 0.0
+    y = np.nan_to_num(X[:, 0]) * 2 + np.isnan(X[:, 1]) - (X[:, 2] == 0) + rng.normal(size=rows) * 0.1
+    model = LGBMModel(n_estimators=trees, learning_rate=0.05)
+    model.model.set_params(verbose=-1, **params)
+    model.train(X[:rows // 2], y[:rows // 2], X[rows // 2:], y[rows // 2:], early_stopping_rounds=None)
+    return model, X
+
+def check_parity(name, expected, actual):
+    error = np.max(np.abs(expected - actual))
+    print(f"parity {name:40s} max |diff| = {error:.2e} over {len(expected)} rows")
+    assert error <= 1e-9, f"{name}: predictor disagrees with LightGBM"
+
+def main(repeat=200):
+    # Shipped strategy model: the tree arrays take the preprocessed (one-hot, scaled) matrix
+    pipeline = load_model(MODEL_PATH)
+    preprocessor, regressor = pipeline[:-1], pipeline[-1]
+    predictor = TreeArrayPredictor.from_booster(regressor.booster_)
+    frames = [build_feature_frame(extract_ludii_features(parse_ludii_text(ludii_mnk_description(m, n, k))), agent_strings)
+              for m, n, k in [(3, 3, 3), (7, 7, 5), (15, 15, 5)]]
+    frame = frames[0]
+    X = np.vstack([dense(preprocessor.transform(other)) for other in frames])
+    check_parity("strategy model (3 games x 90)", regressor.predict(X), predictor.predict(X))
+
+    model, data = synthetic_model()
+    exported = model.export()
+    check_parity("LGBMModel with NaNs/zeros", model.predict(data), exported.predict(data))
+    # Zero-as-missing splits, with both evaluators (trees over 64 leaves are walked level by level)
+    for num_leaves in (31, 127):
+        other, other_data = synthetic_model(trees=50, num_leaves=num_leaves, zero_as_missing=True)
+        other_exported = other.export()
+        assert len(other_exported.zero_splits) and other_exported.quick_scorer == (num_leaves <= 64)
+        check_parity(f"zero as missing, {num_leaves} leaves", other.predict(other_data), other_exported.predict(other_data))
+
+    print(f"\n{'latency (median us)':45s} {'1 row':>10s} {'90 rows':>10s}")
+    batch = X[:len(agent_strings)]
+    rows = [
+        ("pipeline.predict(DataFrame)", lambda n: pipeline.predict(frame[REQUIRED_COLUMNS].iloc[:n])),
+        ("LGBMRegressor.predict(float32)", lambda n: regressor.predict(batch[:n])),
+        ("Booster.predict(float32)", lambda n: regressor.booster_.predict(batch[:n])),
+        ("TreeArrayPredictor.predict(float32)", lambda n: predictor.predict(batch[:n])),
+        (f"LGBMModel.predict ({exported.roots.size} trees)", lambda n: model.predict(data[:n])),
+        (f"exported ({exported.roots.size} trees)", lambda n: exported.predict(data[:n])),
+    ]
+    for name, function in rows:
+        print(f"{name:45s} {median_us(lambda: function(1), repeat):10.1f} {median_us(lambda: function(90), repeat):10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Per-selection cost of Node.best_child_index against branching factor.
+
+Run from src/:  python -m benchmarks.bench_selection
+
+Compares the vectorized ucb_scores path with the previous per-child Python
+loop (kept here as a reference) for every selection policy.
+"""
+import random
+import timeit
+import numpy as np
+from models.mcts import Node, ExplorationConst
+
+BRANCHING = [9, 25, 49, 81, 121, 225, 361]
+POLICIES = {
+    "UCB1": {},
+    "UCB1GRAVE": {"grave_adjustment": True},
+    "UCB1Tuned": {"tuned": True},
+}
+
+def loop_best_child_index(node, exploration_weight, grave_adjustment=False, tuned=False):
+    # The pre-vectorization implementation of Node.best_child
+    choices_weights = []
+    for child in node.children:
+        exploitation = child.wins / (child.visits + 1e-10)
+        exploration = exploration_weight * np.sqrt(np.log(node.visits + 1) / (child.visits + 1e-10))
+        if tuned:
+            variance = np.var([c.wins / c.visits if c.visits > 0 else 0 for c in node.children])
+            exploration *= np.sqrt(variance)
+        if grave_adjustment:
+            exploitation += 0.1 * child.wins / (child.visits + 1e-10)
+        choices_weights.append(exploitation + exploration)
+    return int(np.argmax(choices_weights))
+
+def make_node(branching, rng):
+    parent = Node()
+    children = []
+    for _ in range(branching):
+        child = Node()
+        child.visits = rng.randint(0, 50)
+        child.wins = rng.randint(-child.visits, child.visits)
+        children.append(child)
+    parent.add_children(list(range(branching)), children)
+    parent.visits = sum(child.visits for child in children)
+    return parent
+
+def main(repeat=200):
+    rng = random.Random(0)
+    c = ExplorationConst.CONST_1_41.value
+    print(f"{'policy':<10} {'children':>8} {'vector us':>10} {'loop us':>10} {'speedup':>8}")
+    for name, options in POLICIES.items():
+        for branching in BRANCHING:
+            node = make_node(branching, rng)
+            assert node.best_child_index(c, **options) == loop_best_child_index(node, c, **options)
+            loop_repeat = max(1, repeat // 10) if options.get("tuned") else repeat
+            vector = timeit.timeit(lambda: node.best_child_index(c, **options), number=repeat) / repeat * 1e6
+            loop = timeit.timeit(lambda: loop_best_child_index(node, c, **options), number=loop_repeat) / loop_repeat * 1e6
+            print(f"{name:<10} {branching:>8} {vector:>10.1f} {loop:>10.1f} {loop / vector:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""Startup cost: `python -X importtime` totals for the play path vs the strategy-prediction stack.
+
+Run from src/:  python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+
+# The first three are what a game with --strategy needs; inference is only imported on a strategy cache miss
+MODULES = ["mnk", "models.mcts", "main", "strategy_cache", "inference"]
+HEAVY = ("pandas", "sklearn", "joblib", "lightgbm", "scipy")
+
+def import_times(module):
+    """Return {module name: (self us, cumulative us)} for a fresh interpreter importing module."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+def main(repeat=5, top=5):
+    for module in MODULES:
+        # Best of several runs to keep filesystem cache noise out
+        runs = [import_times(module) for _ in range(repeat)]
+        best = min(runs, key=lambda times: times[module][1])
+        heavy = sorted({name.split(".")[0] for name in best if name.split(".")[0] in HEAVY})
+        print(f"{module:15s} {best[module][1] / 1000:8.1f} ms  heavy: {', '.join(heavy) or '-'}")
+        for name, (self_us, _) in sorted(best.items(), key=lambda item: -item[1][0])[:top]:
+            print(f"    {name:40s} {self_us / 1000:7.1f} ms self")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Benchmark suite: engine, MCTS, strategy selection and data loading, as JSON, checked against a baseline.
+
+Run from src/:  python -m benchmarks.suite [--only engine mcts ...] [--save-baseline]
+
+Every group is seeded, so reruns time the same work. Each result is the best of
+--repeat runs. Results go to --out; if a baseline file exists, every metric is
+compared with it and the run exits with status 1 when one is worse by more than
+--tolerance. Timings depend on the machine, so keep the baseline with the machine
+(the default lives in the git-ignored cache).
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+from helper import ExplorationConst, PlayoutStrategy, SelectionStrategy
+from mnk import MNKGame
+from models.mcts import MCTS
+
+DEFAULT_OUT_PATH = "./cache/benchmarks/latest.json"
+DEFAULT_BASELINE_PATH = "./cache/benchmarks/baseline.json"
+GROUPS = ["engine", "mcts", "inference", "dataloader"]
+
+def best_seconds(function, repeat):
+    # Best of repeat runs keeps scheduler and cache noise out
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def metric(value, unit, higher_is_better):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+def random_game(board, rng):
+    """(position, move) pairs of a uniformly random game on board, each position before its move."""
+    m, n, k = board
+    game = MNKGame(m, n, k, 'X')
+    pairs = []
+    while not game.is_terminal():
+        move = rng.choice(game.get_legal_moves())
+        pairs.append((game.copy(), move))
+        game.apply(move)
+    return pairs
+
+def bench_engine(boards, seed, repeat, calls=20_000):
+    """ns per call of the MNKGame primitives, over the positions of seeded random games."""
+    results = {}
+    for board in boards:
+        rng = random.Random(f"{seed}:{'x'.join(map(str, board))}")
+        pairs = []
+        while len(pairs) < 200:
+            pairs.extend(random_game(board, rng))
+        # check_winner and is_terminal are timed on the position after each move
+        after = [(position.make_move(move), move) for position, move in pairs]
+        loops = max(1, calls // len(pairs))
+        operations = {
+            "make_move": lambda: [position.make_move(move) for position, move in pairs],
+            "get_legal_moves": lambda: [position.get_legal_moves() for position, _ in pairs],
+            "check_winner": lambda: [position.check_winner(*move) for position, move in after],
+            "is_terminal": lambda: [position.is_terminal() for position, _ in after],
+        }
+        for name, operation in operations.items():
+            seconds = best_seconds(lambda: [operation() for _ in range(loops)], repeat)
+            results[f"engine.{'x'.join(map(str, board))}.{name}"] = metric(seconds / (loops * len(pairs)) * 1e9, "ns/call", False)
+    return results
+
+def bench_mcts(board, seed, repeat, iterations=1000, rollouts=500, score_bounds="false"):
+    """
+    Search and playout throughput for every selection and playout strategy, from the empty board.
+
+    Iterations/s is a whole fixed-budget search (selection, expansion, rollout,
+    backpropagation); rollouts/s is the playout policy alone, on the empty board.
+    """
+    m, n, k = board
+    exploration = ExplorationConst.CONST_1_41.value
+    prefix = f"mcts.{'x'.join(map(str, board))}"
+    results = {}
+    for selection in SelectionStrategy:
+        for playout in PlayoutStrategy:
+            strategy = f"MCTS-{selection.value}-{exploration}-{playout.value}-{score_bounds}"
+
+            def search():
+                game = MNKGame(m, n, k, 'X')
+                MCTS(game, strategy, seed=seed).search(game, iterations=iterations, early_stop=False)
+
+            results[f"{prefix}.{selection.value}-{playout.value}.iterations_per_s"] = \
+                metric(iterations / best_seconds(search, repeat), "1/s", True)
+
+    # The playout does not depend on the selection strategy
+    for playout in PlayoutStrategy:
+        strategy = f"MCTS-UCB1-{exploration}-{playout.value}-{score_bounds}"
+
+        def simulate():
+            game = MNKGame(m, n, k, 'X')
+            mcts = MCTS(game, strategy, seed=seed)
+            if mcts.tactics:
+                game.track_threats()
+            for _ in range(rollouts):
+                mcts._simulate(game)
+
+        results[f"{prefix}.{playout.value}.rollouts_per_s"] = metric(rollouts / best_seconds(simulate, repeat), "1/s", True)
+    return results
+
+def bench_inference(repeat):
+    """End-to-end get_best_string latency: cold (model unpickled) and warm (model cached)."""
+    import inference
+    quiet = contextlib.redirect_stdout(io.StringIO())
+
+    def cold():
+        inference.load_model.cache_clear()
+        with quiet:
+            inference.get_best_string()
+
+    def warm():
+        with quiet:
+            inference.get_best_string()
+
+    cold_seconds = best_seconds(cold, repeat)
+    return {
+        "inference.get_best_string.cold": metric(cold_seconds * 1000, "ms", False),
+        "inference.get_best_string.warm": metric(best_seconds(warm, repeat * 5) * 1000, "ms", False),
+    }
+
+def write_synthetic_csv(path, rows, features, rng, with_target=True):
+    # Kaggle-shaped: an id, numeric concept columns with NaNs, a text column and the outcome columns
+    from dataloader import OUTCOME_COLUMNS
+    import pandas as pd
+    frame = pd.DataFrame(rng.normal(size=(rows, features)).astype(np.float32),
+                         columns=[f"concept_{i}" for i in range(features)])
+    frame.iloc[:, ::7] = frame.iloc[:, ::7].mask(rng.random((rows, len(frame.columns[::7]))) < 0.2)
+    frame.insert(0, "Id", np.arange(rows))
+    frame.insert(1, "agent1", "MCTS-UCB1-0.1-Random200-true")
+    if with_target:
+        for column in OUTCOME_COLUMNS:
+            frame[column] = rng.uniform(-1, 1, size=rows).astype(np.float32)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    frame.to_csv(path, index=False)
+
+def bench_dataloader(seed, repeat, rows=20_000, features=200):
+    """dataloader.load_data throughput on synthetic CSVs: cold (CSV parse and cache write) and warm (cache)."""
+    from dataloader import load_data
+    rng = np.random.default_rng(seed)
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with tempfile.TemporaryDirectory() as directory:
+        train, test, cache = (os.path.join(directory, name) for name in ("train", "test", "cache"))
+        write_synthetic_csv(os.path.join(train, "train.csv"), rows, features, rng)
+        write_synthetic_csv(os.path.join(test, "test.csv"), rows // 10, features, rng, with_target=False)
+        total_rows = rows + rows // 10
+
+        def cold():
+            for name in os.listdir(cache) if os.path.exists(cache) else []:
+                os.remove(os.path.join(cache, name))
+            with quiet:
+                load_data(train, test, cache_dir=cache)
+
+        def warm():
+            with quiet:
+                load_data(train, test, cache_dir=cache)
+
+        cold_seconds = best_seconds(cold, repeat)
+        warm_seconds = best_seconds(warm, repeat)
+    return {
+        "dataloader.load_data.cold_rows_per_s": metric(total_rows / cold_seconds, "rows/s", True),
+        "dataloader.load_data.warm_ms": metric(warm_seconds * 1000, "ms", False),
+    }
+
+def compare(results, baseline, tolerance):
+    """
+    Compares results with a baseline.
+
+    Parameters:
+        results (dict): Metric name -> metric of this run.
+        baseline (dict): Metric name -> metric of the baseline run.
+        tolerance (float): Relative change allowed in the worse direction.
+
+    Returns:
+        list: Names of the metrics that regressed.
+    """
+    regressions = []
+    print(f"{'metric':60s} {'baseline':>12s} {'now':>12s} {'change':>8s}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old, new = baseline[name]["value"], result["value"]
+        change = new / old - 1 if old else 0.0
+        worse = -change if result["higher_is_better"] else change
+        flag = ""
+        if worse > tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:60s} {old:12.1f} {new:12.1f} {change:+7.1%}{flag}")
+    return regressions
+
+def run(groups, boards, mcts_board, seed=0, repeat=3, iterations=1000, score_bounds="false"):
+    """
+    Runs the selected benchmark groups.
+
+    Returns:
+        dict: Metric name -> {"value", "unit", "higher_is_better"}.
+    """
+    results = {}
+    for group in groups:
+        start = time.perf_counter()
+        if group == "engine":
+            results.update(bench_engine(boards, seed, repeat))
+        elif group == "mcts":
+            results.update(bench_mcts(mcts_board, seed, repeat, iterations, score_bounds=score_bounds))
+        elif group == "inference":
+            results.update(bench_inference(repeat))
+        elif group == "dataloader":
+            results.update(bench_dataloader(seed, repeat))
+        else:
+            raise ValueError(f"Unknown benchmark group: {group}")
+        print(f"{group}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+def main():
+    from tournament import parse_board
+    parser = argparse.ArgumentParser(description="Headless benchmark suite with JSON output and baseline comparison.")
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS, help="benchmark groups to run")
+    parser.add_argument("--boards", nargs="+", default=[(3, 3, 3), (7, 7, 5), (15, 15, 5)], type=parse_board,
+                        help="engine boards as MxNxK")
+    parser.add_argument("--mcts-board", default="7x7x5", type=parse_board)
+    parser.add_argument("--iterations", type=int, default=1000, help="MCTS iterations per timed search")
+    parser.add_argument("--score-bounds", choices=["true", "false"], default="false")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_OUT_PATH)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="also store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="relative slowdown flagged as a regression")
+    args = parser.parse_args()
+
+    results = run(args.only, args.boards, args.mcts_board, args.seed, args.repeat, args.iterations, args.score_bounds)
+    report = {
+        "meta": {"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                 "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "args": {key: value for key, value in vars(args).items() if key not in ("out", "baseline", "save_baseline")}},
+        "results": results,
+    }
+    paths = [args.out] + ([args.baseline] if args.save_baseline else [])
+    for path in paths:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(report, file, indent=1)
+    print(f"{len(results)} metrics -> {', '.join(paths)}")
+
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,502 @@
+import argparse
+import csv
+import hashlib
+import json
+import math
+import os
+from functools import lru_cache
+import numpy as np
+import ludii_parser
+
+DEFAULT_CONCEPTS_PATH = "../concepts.csv"
+DEFAULT_INDEX_PATH = "./cache/concept_index.json"
+
+# concepts.csv DataTypeId and ComputationTypeId codes
+BOOLEAN, INTEGER, STRING, DOUBLE = 1, 2, 3, 4
+COMPILE, PLAYOUT = 1, 2
+
+DETECTORS = {}
+
+
+def detector(*names):
+    """Registers a function of GameFacts as the detector of one or more concepts."""
+    def register(function):
+        for name in names:
+            DETECTORS[name] = function
+        return function
+    return register
+
+
+# Concepts present whenever one of these ludemes heads a node
+LUDEME_CONCEPTS = {
+    'Stochastic': ('dice', 'roll', 'random'),
+    'Match': ('match',),
+    'SquareShape': ('square',), 'RectangleShape': ('rectangle',), 'HexShape': ('hex',),
+    'TriangleShape': ('tri',), 'DiamondShape': ('diamond',), 'SpiralShape': ('spiral',),
+    'StarShape': ('star',), 'PolygonShape': ('poly',),
+    'SquareTiling': ('square', 'rectangle'), 'HexTiling': ('hex',), 'TriangleTiling': ('tri',),
+    'BrickTiling': ('brick',), 'CelticTiling': ('celtic',), 'QuadHexTiling': ('quadhex',),
+    'ConcentricTiling': ('concentric',), 'SpiralTiling': ('spiral',),
+    'MancalaBoard': ('mancalaBoard',), 'Track': ('track',), 'Hints': ('hints',),
+    'Region': ('regions',), 'Boardless': ('boardless',), 'Hand': ('hand',),
+    'Piece': ('piece',), 'Tile': ('tile',), 'Card': ('card',), 'Domino': ('domino', 'dominoes'), 'Dice': ('dice',),
+    'SwapOption': ('swap',), 'AutoMove': ('automove',),
+    'PiecesPlacedOnBoard': ('place',),
+    'Priority': ('priority',), 'Phase': ('phase',), 'Scoring': ('score', 'addScore', 'byScore'),
+    'AddEffect': ('add',), 'RemoveEffect': ('remove',), 'PromotionEffect': ('promote',), 'PushEffect': ('push',),
+    'Flip': ('flip',), 'Roll': ('roll',), 'Sow': ('sow',), 'StepEffect': ('step',), 'SlideEffect': ('slide',),
+    'LeapEffect': ('leap',), 'HopEffect': ('hop',), 'FromToEffect': ('fromTo',), 'ShootEffect': ('shoot',),
+    'MoveAgain': ('moveAgain',), 'RememberValues': ('remember',), 'ForgetValues': ('forget',),
+    'Then': ('then',), 'DoLudeme': ('do',), 'Trigger': ('trigger',),
+    'Addition': ('+',), 'Subtraction': ('-',), 'Multiplication': ('*',), 'Division': ('/',), 'Modulo': ('%',),
+    'Absolute': ('abs',), 'Roots': ('sqrt',), 'Cosine': ('cos',), 'Sine': ('sin',), 'Tangent': ('tan',),
+    'Exponentiation': ('^',), 'Exponential': ('exp',), 'Logarithm': ('log',),
+    'Minimum': ('min',), 'Maximum': ('max',),
+    'Equal': ('=',), 'NotEqual': ('!=',), 'LesserThan': ('<',), 'LesserThanOrEqual': ('<=',),
+    'GreaterThan': ('>',), 'GreaterThanOrEqual': ('>=',),
+    'Conjunction': ('and',), 'Disjunction': ('or',), 'ExclusiveDisjunction': ('xor',), 'Negation': ('not',),
+    'Union': ('union',), 'Intersection': ('intersection',), 'Complement': ('difference',),
+    'ConditionalStatement': ('if', '?'), 'ControlFlowStatement': ('for', 'forEach', 'while'),
+}
+
+# Concepts present whenever a node starts with one of these 'head atom [atom]' forms
+FORM_CONCEPTS = {
+    'Simultaneous': ('mode Simultaneous',), 'Team': ('set Team',),
+    'HiddenInformation': ('set Hidden', 'set Invisible'), 'InitialRandomPlacement': ('place Random',),
+    'AddDecision': ('move Add',), 'RemoveDecision': ('move Remove',), 'PromotionDecision': ('move Promote',),
+    'RotationDecision': ('move Rotate',), 'StepDecision': ('move Step',), 'SlideDecision': ('move Slide',),
+    'LeapDecision': ('move Leap',), 'HopDecision': ('move Hop',), 'PassDecision': ('move Pass',),
+    'ShootDecision': ('move Shoot',), 'BetDecision': ('move Bet',), 'VoteDecision': ('move Vote',),
+    'ProposeDecision': ('move Propose',), 'SwapPiecesDecision': ('move Swap Pieces',),
+    'SwapPlayersDecision': ('move Swap Players',),
+    'SetNextPlayer': ('set NextPlayer',), 'SetValue': ('set Value',), 'SetCount': ('set Count',),
+    'SetCost': ('set Cost',), 'SetPhase': ('set Phase',), 'SetTrumpSuit': ('set TrumpSuit',),
+    'SetRotation': ('set Rotation',), 'SetSiteState': ('set State',), 'SetVar': ('set Var',),
+    'SetPending': ('set Pending',), 'SetHidden': ('set Hidden',), 'SetInvisible': ('set Invisible',),
+    'ForEachPiece': ('forEach Piece',),
+    'Line': ('is Line',), 'Connection': ('is Connected',), 'Loop': ('is Loop',), 'Pattern': ('is Pattern',),
+    'Contains': ('is In',), 'CanMove': ('can Move',), 'Threat': ('is Threatened',),
+    'IsEmpty': ('is Empty',), 'IsEnemy': ('is Enemy',), 'IsFriend': ('is Friend',),
+    'NoMovesMover': ('no Moves Mover',), 'NoMovesNext': ('no Moves Next',),
+    'NoPieceMover': ('no Pieces Mover',), 'NoPieceNext': ('no Pieces Next',),
+    'CountPiecesMoverComparison': ('count Pieces Mover',), 'CountPiecesNextComparison': ('count Pieces Next',),
+    'Even': ('is Even',), 'Odd': ('is Odd',),
+}
+
+# Direction concepts, from direction atoms (also as named arguments such as dirn:Orthogonal)
+ATOM_CONCEPTS = {
+    'AllDirections': 'All', 'AdjacentDirection': 'Adjacent', 'OrthogonalDirection': 'Orthogonal',
+    'DiagonalDirection': 'Diagonal', 'OffDiagonalDirection': 'OffDiagonal', 'RotationalDirection': 'Rotational',
+    'SameLayerDirection': 'SameLayer',
+    'ForwardDirection': 'Forward', 'BackwardDirection': 'Backward', 'ForwardsDirection': 'Forwards',
+    'BackwardsDirection': 'Backwards', 'RightwardDirection': 'Rightward', 'LeftwardDirection': 'Leftward',
+    'RightwardsDirection': 'Rightwards', 'LeftwardsDirection': 'Leftwards', 'ForwardLeftDirection': 'FL',
+    'ForwardRightDirection': 'FR', 'BackwardLeftDirection': 'BL', 'BackwardRightDirection': 'BR',
+    'SameDirection': 'SameDirection', 'OppositeDirection': 'OppositeDirection',
+}
+
+# End-rule conditions, as the forms that test them, and the concept prefix of their End/Win/Loss/Draw concepts
+END_CONDITIONS = {
+    'is Line': 'Line', 'is Connected': 'Connection', 'is Loop': 'Loop', 'is Pattern': 'Pattern',
+    'no Moves': 'NoMoves', 'no Pieces Next': 'EliminatePieces', 'no Pieces Mover': 'NoOwnPieces',
+    'is In': 'Reach',
+}
+OUTCOMES = ('Win', 'Loss', 'Draw')
+
+
+class GameFacts:
+    """What the detectors read: the parser's counters plus a few facts taken from the AST in one walk."""
+
+    def __init__(self, result):
+        if result.tree is None:
+            raise ValueError("Concept detection needs the AST; parse with build_tree=True")
+        self.ludemes = result.ludemes
+        self.forms = result.forms
+        self.atoms = dict(result.atoms)
+        for atom, count in result.atoms.items():
+            if ':' in atom:
+                value = atom.split(':', 1)[1]
+                self.atoms[value] = self.atoms.get(value, 0) + count
+        self.num_players = None
+        self.board_shape = None
+        self.board_dims = []
+        self.site_type = None
+        self.piece_owners = []
+        self.hand_owners = []
+        self.ends = set()  # (condition prefix, outcome)
+        self.from_to_decision = False
+        self._walk(result.tree, in_end=False)
+
+    def _walk(self, nodes, in_end):
+        for node in nodes:
+            if not isinstance(node, ludii_parser.Node):
+                continue
+            head = node.head
+            if head == 'players' and self.num_players is None:
+                self._read_players(node)
+            elif head == 'board' and self.board_shape is None:
+                self._read_board(node)
+            elif head == 'piece':
+                self.piece_owners.append(_owner(node))
+            elif head == 'hand':
+                self.hand_owners.append(_owner(node))
+            elif head == 'move' and node.children and isinstance(node.children[0], ludii_parser.Node) \
+                    and node.children[0].head == 'from':
+                self.from_to_decision = True
+            elif head == 'if' and in_end:
+                self._read_end_rule(node)
+            self._walk(node.children, in_end or head == 'end')
+
+    def _read_players(self, node):
+        first = node.children[0] if node.children else None
+        if isinstance(first, str) and first.isdecimal():
+            self.num_players = int(first)
+        elif isinstance(first, ludii_parser.Node) and first.head is None:
+            self.num_players = sum(1 for child in first.children
+                                   if isinstance(child, ludii_parser.Node) and child.head == 'player')
+
+    def _read_board(self, node):
+        for child in node.children:
+            if isinstance(child, ludii_parser.Node) and self.board_shape is None:
+                self.board_shape = child.head
+                self.board_dims = [int(arg) for arg in child.children if isinstance(arg, str) and arg.isdecimal()]
+            elif isinstance(child, str) and child.startswith('use:'):
+                self.site_type = child[len('use:'):]
+
+    def _read_end_rule(self, node):
+        condition = next((child for child in node.children if isinstance(child, ludii_parser.Node)), None)
+        if condition is None:
+            return
+        kinds = {END_CONDITIONS[form] for form in _forms(condition) if form in END_CONDITIONS}
+        for result in node.walk():
+            if result.head == 'byScore':
+                kinds.add('Scoring')
+                self.ends.add(('Scoring', 'Win'))
+            if result.head != 'result':
+                continue
+            atoms = [arg for arg in result.children if isinstance(arg, str)]
+            outcome = next((atom for atom in atoms if atom in OUTCOMES), None)
+            if outcome is None:
+                continue
+            if 'Next' in atoms and outcome != 'Draw':
+                # The player to move next winning is the mover losing, and vice versa
+                outcome = 'Loss' if outcome == 'Win' else 'Win'
+            for kind in kinds:
+                self.ends.add((kind, outcome))
+            self.ends.add((None, outcome))
+
+
+def _owner(node):
+    # Number of component (or container) types a piece/hand declaration makes
+    return next((arg for arg in node.children if isinstance(arg, str) and not arg.startswith('"')), None)
+
+
+def _forms(node):
+    # 'head atom' and 'head atom atom' forms of a subtree, as the parser counts them
+    for sub in node.walk():
+        atoms = []
+        for child in sub.children:
+            if not isinstance(child, str) or child.startswith('"'):
+                break
+            atoms.append(child)
+            if len(atoms) == 2:
+                break
+        if sub.head and atoms:
+            yield f"{sub.head} {atoms[0]}"
+            if len(atoms) == 2:
+                yield f"{sub.head} {atoms[0]} {atoms[1]}"
+
+
+def _register_tables():
+    for name, heads in LUDEME_CONCEPTS.items():
+        DETECTORS[name] = lambda facts, heads=heads: any(facts.ludemes[head] for head in heads)
+    for name, forms in FORM_CONCEPTS.items():
+        DETECTORS[name] = lambda facts, forms=forms: any(facts.forms[form] for form in forms)
+    for name, atom in ATOM_CONCEPTS.items():
+        DETECTORS[name] = lambda facts, atom=atom: atom in facts.atoms
+    for kind in set(END_CONDITIONS.values()) | {'Scoring'}:
+        DETECTORS[f'{kind}End'] = lambda facts, kind=kind: any(end_kind == kind for end_kind, _ in facts.ends)
+        for outcome in OUTCOMES:
+            DETECTORS[f'{kind}{outcome}'] = lambda facts, end=(kind, outcome): end in facts.ends
+
+
+_register_tables()
+
+
+@detector('Discrete')
+def _discrete(facts):
+    return True
+
+
+@detector('Realtime')
+def _realtime(facts):
+    return False
+
+
+@detector('Alternating')
+def _alternating(facts):
+    return not facts.forms['mode Simultaneous']
+
+
+@detector('NumPlayers')
+def _num_players(facts):
+    return facts.num_players
+
+
+@detector('Simulation', 'Solitaire', 'TwoPlayer', 'Multiplayer')
+def _player_count_class(facts):
+    n = facts.num_players
+    if n is None:
+        return {}
+    return {'Simulation': n == 0, 'Solitaire': n == 1, 'TwoPlayer': n == 2, 'Multiplayer': n > 2}
+
+
+@detector('Vertex', 'Edge', 'Cell')
+def _site_type(facts):
+    # Boards are played on cells unless declared with use:Vertex or use:Edge
+    site_type = facts.site_type or ('Cell' if facts.board_shape is not None else None)
+    if site_type is None:
+        return {}
+    return {name: site_type == name for name in ('Vertex', 'Edge', 'Cell')}
+
+
+@detector('NumRows', 'NumColumns', 'NumPlayableSitesOnBoard')
+def _board_size(facts):
+    # Rows and columns of square and rectangle boards; playable sites also for hex boards
+    dims = facts.board_dims
+    vertices = facts.site_type == 'Vertex'
+    if facts.board_shape in ('square', 'rectangle') and dims:
+        rows, columns = dims[0], dims[1] if len(dims) > 1 else dims[0]
+        if vertices:
+            rows, columns = rows + 1, columns + 1
+        return {'NumRows': rows, 'NumColumns': columns, 'NumPlayableSitesOnBoard': rows * columns}
+    if facts.board_shape == 'hex' and len(dims) == 1 and not vertices:
+        return {'NumPlayableSitesOnBoard': 3 * dims[0] * (dims[0] - 1) + 1}
+    return {}
+
+
+@detector('NumComponentsType', 'NumComponentsTypePerPlayer')
+def _component_types(facts):
+    if facts.num_players is None:
+        return {}
+    players = max(facts.num_players, 1)
+    types = sum(players if owner == 'Each' else 1 for owner in facts.piece_owners)
+    return {'NumComponentsType': types, 'NumComponentsTypePerPlayer': types / players}
+
+
+@detector('NumContainers')
+def _num_containers(facts):
+    if facts.num_players is None:
+        return None
+    hands = sum(facts.num_players if owner == 'Each' else 1 for owner in facts.hand_owners)
+    return int(facts.board_shape is not None or facts.ludemes['boardless'] > 0) + hands
+
+
+@detector('NumPlayPhase')
+def _num_play_phases(facts):
+    return facts.ludemes['phase']
+
+
+@detector('FromToDecision')
+def _from_to_decision(facts):
+    return facts.from_to_decision
+
+
+@detector('Draw')
+def _draw(facts):
+    return (None, 'Draw') in facts.ends
+
+
+@detector('Misere')
+def _misere(facts):
+    return any((kind, 'Loss') in facts.ends for kind in ('Line', 'Connection', 'Loop', 'Pattern'))
+
+
+def _detect(name, facts):
+    # A detector returns a value, a {concept: value} dict shared by several concepts, or None when unknown
+    value = DETECTORS[name](facts)
+    if isinstance(value, dict):
+        value = value.get(name)
+    return None if value is None else float(value)
+
+
+def _stamp(concepts_path):
+    digest = hashlib.sha256()
+    with open(concepts_path, 'rb') as file:
+        digest.update(file.read())
+    digest.update(json.dumps(sorted(DETECTORS)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ConceptIndex:
+    """
+    Compiled mapping from the concepts of concepts.csv to values computed from a game's AST.
+
+    Each compile-time concept is either detected (a function in DETECTORS), derived from its
+    children in the taxonomy (1 if any boolean child is 1, 0 if all are known to be 0), or
+    unknown. Playout concepts (frequencies, durations, outcome statistics) need simulated
+    games and are always unknown; unknown values are NaN, which LightGBM treats as missing.
+    """
+
+    def __init__(self, concepts, stamp=None):
+        self.concepts = concepts
+        self.stamp = stamp
+        self.names = [concept['name'] for concept in concepts]
+        self.position = {name: i for i, name in enumerate(self.names)}
+        # Children are evaluated before their parents
+        self.order = sorted(range(len(concepts)), key=lambda i: -concepts[i]['taxonomy'].count('.'))
+        self.children = [[self.position[child] for child in concept['children']] for concept in concepts]
+        self._layouts = {}
+
+    @classmethod
+    def build(cls, concepts_path=DEFAULT_CONCEPTS_PATH):
+        """
+        Compiles the index from concepts.csv.
+
+        Parameters:
+            concepts_path (str): Path to concepts.csv.
+
+        Returns:
+            ConceptIndex: The index.
+        """
+        with open(concepts_path, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        by_taxonomy = {row['TaxonomyString']: row['Name'] for row in rows}
+        concepts = []
+        for row in rows:
+            parent_taxonomy = row['TaxonomyString'].rpartition('.')[0]
+            concepts.append({
+                'id': int(row['Id']),
+                'name': row['Name'],
+                'taxonomy': row['TaxonomyString'],
+                'parent': by_taxonomy.get(parent_taxonomy),
+                'leaf': row['LeafNode'] == '1',
+                'data_type': int(row['DataTypeId']),
+                'computation': int(row['ComputationTypeId']),
+                'children': [],
+            })
+        by_name = {concept['name']: concept for concept in concepts}
+        for concept in concepts:
+            parent = by_name.get(concept['parent'])
+            if parent is not None and concept['computation'] == COMPILE and concept['data_type'] == BOOLEAN:
+                parent['children'].append(concept['name'])
+        for concept in concepts:
+            if concept['computation'] != COMPILE:
+                concept['source'] = None
+            elif concept['name'] in DETECTORS:
+                concept['source'] = 'detector'
+            elif concept['children'] and concept['data_type'] == BOOLEAN:
+                concept['source'] = 'children'
+            else:
+                concept['source'] = None
+        return cls(concepts, _stamp(concepts_path))
+
+    def save(self, path):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump({'stamp': self.stamp, 'concepts': self.concepts}, file)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            data = json.load(file)
+        return cls(data['concepts'], data['stamp'])
+
+    def values(self, result):
+        """
+        Computes every concept for one parsed game.
+
+        Parameters:
+            result (ParseResult): Parser output, with the AST.
+
+        Returns:
+            np.ndarray: float32 vector in concepts.csv order (see self.names), NaN where unknown.
+        """
+        facts = GameFacts(result)
+        values = np.full(len(self.concepts), np.nan, dtype=np.float32)
+        for i in self.order:
+            source = self.concepts[i]['source']
+            if source == 'detector':
+                value = _detect(self.names[i], facts)
+                if value is not None:
+                    values[i] = value
+            elif source == 'children':
+                known = values[self.children[i]]
+                if (known == 1).any():
+                    values[i] = 1
+                elif not np.isnan(known).any():
+                    values[i] = 0
+        return values
+
+    def layout(self, columns):
+        """
+        Positions of a feature layout's columns in the concept vector.
+
+        Parameters:
+            columns (list): Feature column names, e.g. the 'feature_columns' of the dataloader cache.
+
+        Returns:
+            np.ndarray: Index array; columns that are not concepts point past the end (NaN).
+        """
+        key = tuple(columns)
+        if key not in self._layouts:
+            self._layouts[key] = np.array([self.position.get(column, len(self.concepts)) for column in columns],
+                                          dtype=np.intp)
+        return self._layouts[key]
+
+    def matrix(self, descriptions, columns):
+        """
+        Concept features of several games in a given column layout, without going through pandas.
+
+        Parameters:
+            descriptions (list): Ludii game descriptions.
+            columns (list): Feature column names, in the order the model was trained on.
+
+        Returns:
+            np.ndarray: float32 matrix, one row per description.
+        """
+        rows = np.full((len(descriptions), len(self.concepts) + 1), np.nan, dtype=np.float32)
+        for row, text in zip(rows, descriptions):
+            row[:-1] = self.values(ludii_parser.parse_text(text))
+        return rows[:, self.layout(columns)]
+
+
+@lru_cache(maxsize=None)
+def load_concept_index(concepts_path=DEFAULT_CONCEPTS_PATH, index_path=DEFAULT_INDEX_PATH):
+    """
+    Loads the serialized concept index, rebuilding it when concepts.csv or the detectors changed.
+
+    Parameters:
+        concepts_path (str): Path to concepts.csv.
+        index_path (str): Path to the serialized index.
+
+    Returns:
+        ConceptIndex: The index.
+    """
+    stamp = _stamp(concepts_path)
+    if os.path.exists(index_path):
+        index = ConceptIndex.load(index_path)
+        if index.stamp == stamp:
+            return index
+    index = ConceptIndex.build(concepts_path)
+    index.save(index_path)
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the concept index and print the concepts of a game.")
+    parser.add_argument("game", nargs="?", help="Ludii description to evaluate")
+    parser.add_argument("--concepts", default=DEFAULT_CONCEPTS_PATH)
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+    index = load_concept_index(args.concepts, args.index)
+    sources = [concept['source'] for concept in index.concepts]
+    print(f"{len(index.concepts)} concepts: {sources.count('detector')} detected, "
+          f"{sources.count('children')} derived from children, {sources.count(None)} unknown")
+    if args.game:
+        with open(args.game, 'r', encoding='utf-8') as file:
+            values = index.values(ludii_parser.parse_text(file.read()))
+        for name, value in zip(index.names, values):
+            if not math.isnan(value) and value:
+                print(f"    {name:40s} {value:g}")
@@ -1,35 +1,194 @@
-import pandas as pd
-import torch
+import json
+import os
 import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'utility_agent1'
+# Outcome columns of the Kaggle data: never features, whichever one is the target
+OUTCOME_COLUMNS = ['num_wins_agent1', 'num_draws_agent1', 'num_losses_agent1', 'utility_agent1']
+ID_COLUMNS = ['Id']
+
+
+def numeric_columns(csv_path, sample_rows=1000):
+    """
+    Returns the numeric columns of a CSV, judged from its first rows.
+
+    The cache builder coerces every value of these columns, so a non-numeric
+    value further down the file is read as NaN.
+
+    Parameters:
+        csv_path (str): Path to the CSV.
+        sample_rows (int): Rows read to infer dtypes.
+
+    Returns:
+        list: Column names, in file order.
+    """
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    return list(sample.select_dtypes(include='number').columns)
+
+
+def _source_stamp(csv_path):
+    stat = os.stat(csv_path)
+    return {'path': os.path.abspath(csv_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def _cached_meta(cache_dir, name, csv_path):
+    # Cache metadata for a split, or None if it is missing or was built from another version of the CSV
+    meta_path = os.path.join(cache_dir, f'{name}.json')
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as file:
+        meta = json.load(file)
+    return meta if meta.get('source') == _source_stamp(csv_path) else None
+
+
+class _NpyAppender:
+    """
+    A float32 .npy file filled block by block, for a row count known only at the end.
+
+    The file starts as an open_memmap of `capacity` rows and doubles when full.
+    NumPy pads the header of C-order arrays so the first axis can grow in place,
+    so growing rewrites the header and extends the file, and every row is
+    written once. It is built under a temporary name and renamed by close().
+    """
+
+    def __init__(self, path, row_shape, capacity):
+        self.path = path
+        self.row_shape = tuple(row_shape)
+        self.rows = 0
+        self.array = np.lib.format.open_memmap(path + '.tmp', mode='w+', dtype=np.float32,
+                                               shape=(max(capacity, 1),) + self.row_shape)
+        self.offset = self.array.offset
+
+    def append(self, block):
+        end = self.rows + len(block)
+        if end > len(self.array):
+            self._resize(max(end, 2 * len(self.array)))
+        self.array[self.rows:end] = block
+        self.rows = end
+
+    def close(self):
+        self._resize(self.rows, remap=False)
+        os.replace(self.path + '.tmp', self.path)
 
-def load_data(train_path='../data/train', test_path='../data/test'):
-    train_data = pd.read_csv(f'{train_path}/train.csv')
-    test_data = pd.read_csv(f'{test_path}/test.csv')
-
-    # Select only numeric columns that exist in both datasets
-    train_numeric = train_data.select_dtypes(include=['int64', 'float64']).columns
-    test_numeric = test_data.select_dtypes(include=['int64', 'float64']).columns
-    
-    # Get common columns between train and test
-    common_columns = list(set(train_numeric).intersection(set(test_numeric)))
-    
-    # Extract features (all common numeric columns except the last one which is target)
-    feature_columns = common_columns[:-1]  # Assuming last numeric column is target
-    target_column = common_columns[-1]
-    
-    X_train = train_data[feature_columns].astype(np.float32).values
-    y_train = train_data[target_column].astype(np.float32).values
-
-    X_test = test_data[feature_columns].astype(np.float32).values
-    y_test = test_data[target_column].astype(np.float32).values
+    def _resize(self, rows, remap=True):
+        self.array.flush()
+        self.array = None
+        shape = (rows,) + self.row_shape
+        header = {'descr': np.lib.format.dtype_to_descr(np.dtype(np.float32)), 'fortran_order': False, 'shape': shape}
+        with open(self.path + '.tmp', 'r+b') as file:
+            np.lib.format.write_array_header_1_0(file, header)
+            if file.tell() != self.offset:
+                raise RuntimeError(f"Cannot resize {self.path} in place: its .npy header changed length")
+            file.truncate(self.offset + rows * int(np.prod(self.row_shape, dtype=np.int64)) * 4)
+        if remap:
+            self.array = np.memmap(self.path + '.tmp', dtype=np.float32, mode='r+', offset=self.offset, shape=shape)
+
+
+def _write_cache(csv_path, feature_columns, target_column, features_path, target_path, chunksize):
+    # One chunked pass over the CSV, writing float32 rows straight into the .npy files
+    columns = feature_columns + ([target_column] if target_column else [])
+    features = _NpyAppender(features_path, (len(feature_columns),), chunksize)
+    target = _NpyAppender(target_path, (), chunksize) if target_column else None
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunksize):
+        # Column types were judged from a sample; anything non-numeric past it becomes NaN
+        text = [column for column in columns if not pd.api.types.is_numeric_dtype(chunk[column])]
+        if text:
+            chunk[text] = chunk[text].apply(pd.to_numeric, errors='coerce')
+        features.append(chunk[feature_columns].to_numpy(dtype=np.float32))
+        if target is not None:
+            target.append(chunk[target_column].to_numpy(dtype=np.float32))
+    features.close()
+    if target is not None:
+        target.close()
+    return features.rows
+
+
+def cache_split(csv_path, feature_columns, target_column, cache_dir, name, chunksize=50_000):
+    """
+    Loads one split from its columnar cache, building the cache from the CSV on first use.
+
+    The cache is a float32 .npy matrix of the feature columns (plus a vector of the target
+    if the CSV has it) and a JSON file recording the columns and the CSV's size and mtime;
+    it is rebuilt when either changes. Loads are memory-mapped, so they copy nothing.
+
+    Parameters:
+        csv_path (str): Path to the CSV.
+        feature_columns (list): Feature columns, in output order.
+        target_column (str): Target column; may be absent from the CSV (e.g. Kaggle's test.csv).
+        cache_dir (str): Directory for the cache files.
+        name (str): Cache file prefix ('train' or 'test').
+        chunksize (int): CSV rows parsed at a time.
+
+    Returns:
+        tuple: (X, y), read-only memory-mapped float32 arrays; y is None without a target.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    meta_path = os.path.join(cache_dir, f'{name}.json')
+    features_path = os.path.join(cache_dir, f'{name}.X.npy')
+    target_path = os.path.join(cache_dir, f'{name}.y.npy')
+    header = list(pd.read_csv(csv_path, nrows=0).columns)
+    has_target = target_column in header
+    meta = {
+        'source': _source_stamp(csv_path),
+        'feature_columns': list(feature_columns),
+        'target_column': target_column if has_target else None,
+    }
+
+    cached = _cached_meta(cache_dir, name, csv_path)
+    if cached is None or {key: cached.get(key) for key in meta} != meta:
+        rows = _write_cache(csv_path, list(feature_columns), meta['target_column'], features_path, target_path, chunksize)
+        with open(meta_path, 'w') as file:
+            json.dump({**meta, 'rows': rows}, file)
+
+    X = np.load(features_path, mmap_mode='r')
+    y = np.load(target_path, mmap_mode='r') if has_target else None
+    return X, y
+
+
+def load_data(train_path='../data/train', test_path='../data/test', target_column=TARGET_COLUMN,
+              cache_dir='../data/cache', chunksize=50_000):
+    """
+    Loads the training and test matrices for model training.
+
+    Features are the numeric columns present in both CSVs, minus ids and outcome
+    columns; only those columns and the target are parsed, as float32, in chunks.
+    The first call writes a memory-mapped cache that later calls start from.
+
+    Parameters:
+        train_path (str): Directory containing train.csv.
+        test_path (str): Directory containing test.csv.
+        target_column (str): Column to predict.
+        cache_dir (str): Directory for the columnar cache.
+        chunksize (int): CSV rows parsed at a time.
+
+    Returns:
+        tuple: X_train, y_train, X_test, y_test as float32 NumPy arrays (y_test is None
+            when test.csv has no target column, as with the Kaggle test set).
+    """
+    train_csv = f'{train_path}/train.csv'
+    test_csv = f'{test_path}/test.csv'
+    header = list(pd.read_csv(train_csv, nrows=0).columns)
+    if target_column not in header:
+        raise ValueError(f"Target column {target_column!r} not in {train_csv}")
+
+    train_meta = _cached_meta(cache_dir, 'train', train_csv)
+    test_meta = _cached_meta(cache_dir, 'test', test_csv)
+    if train_meta and test_meta and train_meta['target_column'] == target_column \
+            and train_meta['feature_columns'] == test_meta['feature_columns']:
+        # Warm start: both CSVs are unchanged, so neither needs sampling
+        feature_columns = train_meta['feature_columns']
+    else:
+        excluded = set(OUTCOME_COLUMNS + ID_COLUMNS + [target_column])
+        test_numeric = set(numeric_columns(test_csv))
+        feature_columns = [column for column in numeric_columns(train_csv)
+                           if column in test_numeric and column not in excluded]
+
+    X_train, y_train = cache_split(train_csv, feature_columns, target_column, cache_dir, 'train', chunksize)
+    X_test, y_test = cache_split(test_csv, feature_columns, target_column, cache_dir, 'test', chunksize)
 
     print(f"Feature columns being used: {feature_columns}")
     print(f"Target column: {target_column}")
     print(f"Number of features: {len(feature_columns)}")
 
-    features_tensor_train = torch.tensor(X_train, dtype=torch.float32)
-    features_tensor_test = torch.tensor(X_test, dtype=torch.float32)
-    target_tensor_train = torch.tensor(y_train, dtype=torch.float32)
-    target_tensor_test = torch.tensor(y_test, dtype=torch.float32)
-
-    return features_tensor_train, target_tensor_train, features_tensor_test, target_tensor_test
+    return X_train, y_train, X_test, y_test
@@ -1,6 +1,4 @@
-import pandas as pd
 import re
-import joblib
 from enum import Enum
 
 class SelectionStrategy(Enum):
@@ -33,6 +31,23 @@ def generate_all_strings():
                     all_strings.append(f"MCTS-{selection.value}-{exploration.value}-{playout.value}-{score.value}")
     return all_strings
 
+def report_best(ranking):
+    """
+    Prints the top agent string of a ranking and returns it.
+
+    Parameters:
+        ranking (list): (agent string, predicted utility) pairs, best first.
+
+    Returns:
+        str: The best agent string.
+    """
+    best_agent_string, best_utility = ranking[0]
+    predicted_utility = best_utility + 1
+    best_agent_string_col = "\033[1;31;40m" + best_agent_string + "\033[0m"
+    print(best_agent_string_col)
+    print(f"Predicted Utility: {predicted_utility}")
+    return best_agent_string
+
 def read_ludii_data(file_path):
     with open(file_path, 'r') as file:
         return file.read()
@@ -51,6 +66,7 @@ def parse_ludrules(ludrules):
     return parsed_data
 
 def extract_features(parsed_data):
+    import pandas as pd
     features = {}
     features['game_name'] = parsed_data['game']
     features['num_players'] = pd.to_numeric(parsed_data['players'], errors='coerce')
@@ -62,5 +78,3 @@ def extract_features(parsed_data):
     features['rule_complexity'] = len(re.findall(r'[<>=%]', parsed_data['rules'])) if parsed_data['rules'] else 0
     return features
 
-
-print(generate_all_strings())
@@ -1,6 +1,8 @@
 import pandas as pd
 import re
 import joblib
+from functools import lru_cache
+from helper import generate_all_strings, report_best
 
 
 # Function to parse Ludii data
@@ -15,8 +17,19 @@ def parse_ludii_data(file_path):
         dict: Parsed components of the game description.
     """
     with open(file_path, 'r') as file:
-        ludii_data = file.read()
+        return parse_ludii_text(file.read())
 
+
+def parse_ludii_text(ludii_data):
+    """
+    Parses a Ludii game description.
+
+    Parameters:
+        ludii_data (str): The game description.
+
+    Returns:
+        dict: Parsed components of the game description.
+    """
     patterns = {
         "game": r'\(game\s+"(.*?)"',
         "players": r'\(players\s+(\d+)\)',
@@ -45,7 +58,8 @@ def extract_ludii_features(parsed_data):
     features['game_name'] = parsed_data['game']
     features['num_players'] = pd.to_numeric(parsed_data['players'], errors='coerce')
     features['num_pieces'] = len(re.findall(r'\(piece', parsed_data['equipment'])) if parsed_data['equipment'] else 0
-    features['board_type'] = re.search(r'\(board \((.*?)\)', parsed_data['equipment']).group(1) if parsed_data['equipment'] and re.search(r'\(board \((.*?)\)', parsed_data['equipment']) else 'Unknown'
+    board = re.search(r'\(board \((.*?)\)', parsed_data['equipment']) if parsed_data['equipment'] else None
+    features['board_type'] = board.group(1) if board else 'Unknown'
     features['num_conditions'] = parsed_data['rules'].count('if') if parsed_data['rules'] else 0
     features['num_moves'] = parsed_data['rules'].count('move') if parsed_data['rules'] else 0
     features['num_triggers'] = parsed_data['rules'].count('trigger') if parsed_data['rules'] else 0
@@ -121,21 +135,122 @@ def run_inference(input_file, agent_string, model_path):
     prediction = loaded_model.predict(inference_data)
     return prediction[0]
 
-agent_strings = ['MCTS-UCB1-0.1-Random200-true', 'MCTS-UCB1-0.1-Random200-false', 'MCTS-UCB1-0.1-MAST-true', 'MCTS-UCB1-0.1-MAST-false', 'MCTS-UCB1-0.1-NST-true', 'MCTS-UCB1-0.1-NST-false', 'MCTS-UCB1-0.6-Random200-true', 'MCTS-UCB1-0.6-Random200-false', 'MCTS-UCB1-0.6-MAST-true', 'MCTS-UCB1-0.6-MAST-false', 'MCTS-UCB1-0.6-NST-true', 'MCTS-UCB1-0.6-NST-false', 'MCTS-UCB1-1.41421356237-Random200-true', 'MCTS-UCB1-1.41421356237-Random200-false', 'MCTS-UCB1-1.41421356237-MAST-true', 'MCTS-UCB1-1.41421356237-MAST-false', 'MCTS-UCB1-1.41421356237-NST-true', 'MCTS-UCB1-1.41421356237-NST-false', 'MCTS-UCB1GRAVE-0.1-Random200-true', 'MCTS-UCB1GRAVE-0.1-Random200-false', 'MCTS-UCB1GRAVE-0.1-MAST-true', 'MCTS-UCB1GRAVE-0.1-MAST-false', 'MCTS-UCB1GRAVE-0.1-NST-true', 'MCTS-UCB1GRAVE-0.1-NST-false', 'MCTS-UCB1GRAVE-0.6-Random200-true', 'MCTS-UCB1GRAVE-0.6-Random200-false', 'MCTS-UCB1GRAVE-0.6-MAST-true', 'MCTS-UCB1GRAVE-0.6-MAST-false', 'MCTS-UCB1GRAVE-0.6-NST-true', 'MCTS-UCB1GRAVE-0.6-NST-false', 'MCTS-UCB1GRAVE-1.41421356237-Random200-true', 'MCTS-UCB1GRAVE-1.41421356237-Random200-false', 'MCTS-UCB1GRAVE-1.41421356237-MAST-true', 'MCTS-UCB1GRAVE-1.41421356237-MAST-false', 'MCTS-UCB1GRAVE-1.41421356237-NST-true', 'MCTS-UCB1GRAVE-1.41421356237-NST-false', 'MCTS-ProgressiveHistory-0.1-Random200-true', 'MCTS-ProgressiveHistory-0.1-Random200-false', 'MCTS-ProgressiveHistory-0.1-MAST-true', 'MCTS-ProgressiveHistory-0.1-MAST-false', 'MCTS-ProgressiveHistory-0.1-NST-true', 'MCTS-ProgressiveHistory-0.1-NST-false', 'MCTS-ProgressiveHistory-0.6-Random200-true', 'MCTS-ProgressiveHistory-0.6-Random200-false', 'MCTS-ProgressiveHistory-0.6-MAST-true', 'MCTS-ProgressiveHistory-0.6-MAST-false', 'MCTS-ProgressiveHistory-0.6-NST-true', 'MCTS-ProgressiveHistory-0.6-NST-false', 'MCTS-ProgressiveHistory-1.41421356237-Random200-true', 'MCTS-ProgressiveHistory-1.41421356237-Random200-false', 'MCTS-ProgressiveHistory-1.41421356237-MAST-true', 'MCTS-ProgressiveHistory-1.41421356237-MAST-false', 'MCTS-ProgressiveHistory-1.41421356237-NST-true', 'MCTS-ProgressiveHistory-1.41421356237-NST-false', 'MCTS-UCB1Tuned-0.1-Random200-true', 'MCTS-UCB1Tuned-0.1-Random200-false', 'MCTS-UCB1Tuned-0.1-MAST-true', 'MCTS-UCB1Tuned-0.1-MAST-false', 'MCTS-UCB1Tuned-0.1-NST-true', 'MCTS-UCB1Tuned-0.1-NST-false', 'MCTS-UCB1Tuned-0.6-Random200-true', 'MCTS-UCB1Tuned-0.6-Random200-false', 'MCTS-UCB1Tuned-0.6-MAST-true', 'MCTS-UCB1Tuned-0.6-MAST-false', 'MCTS-UCB1Tuned-0.6-NST-true', 'MCTS-UCB1Tuned-0.6-NST-false', 'MCTS-UCB1Tuned-1.41421356237-Random200-true', 'MCTS-UCB1Tuned-1.41421356237-Random200-false', 'MCTS-UCB1Tuned-1.41421356237-MAST-true', 'MCTS-UCB1Tuned-1.41421356237-MAST-false', 'MCTS-UCB1Tuned-1.41421356237-NST-true', 'MCTS-UCB1Tuned-1.41421356237-NST-false', 'MCTS-ProgressiveWidening-0.1-Random200-true', 'MCTS-ProgressiveWidening-0.1-Random200-false', 'MCTS-ProgressiveWidening-0.1-MAST-true', 'MCTS-ProgressiveWidening-0.1-MAST-false', 'MCTS-ProgressiveWidening-0.1-NST-true', 'MCTS-ProgressiveWidening-0.1-NST-false', 'MCTS-ProgressiveWidening-0.6-Random200-true', 'MCTS-ProgressiveWidening-0.6-Random200-false', 'MCTS-ProgressiveWidening-0.6-MAST-true', 'MCTS-ProgressiveWidening-0.6-MAST-false', 'MCTS-ProgressiveWidening-0.6-NST-true', 'MCTS-ProgressiveWidening-0.6-NST-false', 'MCTS-ProgressiveWidening-1.41421356237-Random200-true', 'MCTS-ProgressiveWidening-1.41421356237-Random200-false', 'MCTS-ProgressiveWidening-1.41421356237-MAST-true', 'MCTS-ProgressiveWidening-1.41421356237-MAST-false', 'MCTS-ProgressiveWidening-1.41421356237-NST-true', 'MCTS-ProgressiveWidening-1.41421356237-NST-false']
+agent_strings = generate_all_strings()
+
+REQUIRED_COLUMNS = [
+    'game_name', 'num_players', 'num_pieces', 'board_type',
+    'num_conditions', 'num_moves', 'num_triggers', 'rule_complexity',
+    'selection', 'exploration_const', 'playout', 'score_bounds'
+]
+
+
+@lru_cache(maxsize=None)
+def load_model(model_path):
+    """
+    Loads a pickled model once per path and keeps it for later calls.
+
+    Parameters:
+        model_path (str): Path to the pre-trained model.
+
+    Returns:
+        The unpickled model.
+    """
+    return joblib.load(model_path)
+
+
+def build_feature_frame(ludii_features, candidates):
+    """
+    Builds one feature row per agent string for a single game.
+
+    Parameters:
+        ludii_features (dict): Features of the game, from extract_ludii_features.
+        candidates (list): Agent strings to score.
+
+    Returns:
+        pd.DataFrame: One row per agent string, with the columns the model was trained on.
+    """
+    rows = [{**ludii_features, **parse_agent(agent_string)} for agent_string in candidates]
+    return pd.DataFrame(rows, columns=REQUIRED_COLUMNS)
+
+
+def rank_agent_strings(input_file, model_path, candidates=None):
+    """
+    Scores every agent string for a game with a single predict call.
+
+    Parameters:
+        input_file (str): Path to the input.txt file containing the game description.
+        model_path (str): Path to the pre-trained model.
+        candidates (list): Agent strings to score (defaults to all 90).
+
+    Returns:
+        list: (agent string, predicted utility) pairs, best first.
+    """
+    with open(input_file, 'r') as file:
+        return rank_agent_strings_for_text(file.read(), model_path, candidates)
+
+
+def rank_agent_strings_for_text(ludii_data, model_path, candidates=None):
+    """
+    Same as rank_agent_strings, for a game description already in memory.
+
+    Parameters:
+        ludii_data (str): The game description.
+        model_path (str): Path to the pre-trained model.
+        candidates (list): Agent strings to score (defaults to all 90).
+
+    Returns:
+        list: (agent string, predicted utility) pairs, best first.
+    """
+    return rank_agent_strings_for_texts([ludii_data], model_path, candidates)[0]
+
+
+def rank_agent_strings_for_texts(descriptions, model_path, candidates=None):
+    """
+    Ranks agent strings for several games with a single predict call.
+
+    Parameters:
+        descriptions (list): Ludii game descriptions.
+        model_path (str): Path to the pre-trained model.
+        candidates (list): Agent strings to score (defaults to all 90).
+
+    Returns:
+        list: One ranking per description, each a list of (agent string, predicted utility) pairs, best first.
+    """
+    if candidates is None:
+        candidates = agent_strings
+    frame = pd.concat(
+        [build_feature_frame(extract_ludii_features(parse_ludii_text(text)), candidates) for text in descriptions],
+        ignore_index=True,
+    )
+    predictions = load_model(model_path).predict(frame)
+    rankings = []
+    for start in range(0, len(predictions), len(candidates)):
+        scores = predictions[start:start + len(candidates)]
+        ranked = sorted(zip(candidates, scores), key=lambda pair: pair[1], reverse=True)
+        rankings.append([(agent_string, float(utility)) for agent_string, utility in ranked])
+    return rankings
+
+
+def concept_feature_matrix(descriptions, feature_columns):
+    """
+    Builds concept-feature rows for models trained on the concept columns of the Kaggle data
+    (train.py with dataloader.load_data), in one parse per game and without pandas.
+
+    Parameters:
+        descriptions (list): Ludii game descriptions.
+        feature_columns (list): The model's feature columns, in training order
+            (the 'feature_columns' of the dataloader cache metadata).
+
+    Returns:
+        np.ndarray: float32 matrix, one row per description; NaN where a column is not
+            computable from the description (playout concepts, undetected concepts).
+    """
+    from concept_index import load_concept_index
+    return load_concept_index().matrix(descriptions, feature_columns)
+
+
 def get_best_string():
     input_file_path = "./input/input.txt"
     model_path = "./models/lightgbm_model.pkl"
-    best_agent_string = ""
-    best_utility = -float('inf')
-    for agent_string in agent_strings:
-        # Run inference
-        curr_utility = run_inference(input_file_path, best_agent_string, model_path)
-        if curr_utility > best_utility:
-            best_utility = curr_utility
-            best_agent_string = agent_string
-
-    predicted_utility = run_inference(input_file_path, best_agent_string, model_path) + 1
-    best_agent_string_col = "\033[1;31;40m" + best_agent_string + "\033[0m"
-    print(best_agent_string_col)
-    print(f"Predicted Utility: {predicted_utility}")
-    return best_agent_string
\ No newline at end of file
+    return report_best(rank_agent_strings(input_file_path, model_path))
+
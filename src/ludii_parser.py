@@ -0,0 +1,343 @@
+"""
+Streaming tokenizer and S-expression parser for Ludii game descriptions.
+
+A description is read in chunks and parsed in a single pass. The same pass
+builds the AST (optional) and computes:
+
+- structural counts keyed by the concept names of concepts.csv (Players,
+  Equipment, Container, Component, Rules, Meta, Start, Play, End), i.e. the
+  number of ludemes in each part of the description;
+- ludeme frequencies, leading-atom forms such as "is Line" or "result Mover Win",
+  atom arguments, tree size and depth.
+
+The 8 features the strategy model was trained on stay with the regex
+extractor in src/inference.py (extract_ludii_features), which is faster on
+descriptions of a few hundred bytes.
+
+Usage:
+    python ludii_parser.py GAME.lud [DIRECTORY ...] [--jsonl OUT] [--workers N]
+"""
+import argparse
+import io
+import json
+import os
+import re
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+# Whitespace and comments, then a bracket, a string literal or an atom. The empty match at
+# the end of the input takes up trailing whitespace; any other character is an error.
+TOKEN = re.compile(r'(\s*(?://[^\n]*(?![^\n])\s*)*)(?:([(){}])|("[^"]*")|((?!//)[^\s(){}"]+)|(\S)|\Z)')
+
+# Ludemes whose subtree is counted under a concepts.csv category
+SECTION_CONCEPTS = {
+    'players': 'Players',
+    'equipment': 'Equipment',
+    'rules': 'Rules',
+    'meta': 'Meta',
+    'start': 'Start',
+    'play': 'Play',
+    'phases': 'Play',
+    'end': 'End',
+}
+CONTAINER_LUDEMES = {'board', 'hand', 'deck', 'boardless', 'track', 'regions', 'map', 'dice'}
+COMPONENT_LUDEMES = {'piece', 'tile', 'card', 'domino', 'die'}
+CONCEPTS = ['Players', 'Equipment', 'Container', 'Component', 'Rules', 'Meta', 'Start', 'Play', 'End']
+
+
+class LudiiParseError(ValueError):
+    pass
+
+
+class Node:
+    """A parenthesised ludeme ``(head child ...)`` or, with head None, a ``{ ... }`` array.
+
+    Children are Nodes or strings: atoms as written, string literals with their quotes.
+    """
+    __slots__ = ('head', 'children')
+
+    def __init__(self, head, children=None):
+        self.head = head
+        self.children = children if children is not None else []
+
+    @property
+    def is_array(self):
+        return self.head is None
+
+    def walk(self):
+        """Yield this node and every descendant Node, depth first."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed([child for child in node.children if isinstance(child, Node)]))
+
+    def to_text(self):
+        parts = [child.to_text() if isinstance(child, Node) else child for child in self.children]
+        if self.head is None:
+            return '{' + ' '.join(parts) + '}'
+        return '(' + ' '.join([self.head] + parts) + ')'
+
+    def __repr__(self):
+        return f"Node({self.head!r}, {len(self.children)} children)"
+
+
+class ParseResult:
+    """Everything one pass over a description produces."""
+
+    def __init__(self, tree, concept_counts, ludemes, stats, forms=None, atoms=None):
+        self.tree = tree
+        self.concept_counts = concept_counts
+        self.ludemes = ludemes
+        self.stats = stats
+        self.forms = forms if forms is not None else Counter()  # 'head atom' and 'head atom atom' prefixes
+        self.atoms = atoms if atoms is not None else Counter()  # Atom arguments, e.g. 'Orthogonal'
+
+    def row(self):
+        """Flat dict of concept counts and tree stats (e.g. one JSONL line)."""
+        return {
+            **{f"concept_{name}": count for name, count in self.concept_counts.items()},
+            **self.stats,
+        }
+
+
+def token_batches(stream, chunk_size=1 << 16):
+    """
+    Splits a Ludii description into tokens, reading the stream in chunks.
+
+    Parameters:
+        stream: Text file object (or anything with read(size)).
+        chunk_size (int): Characters read per chunk.
+
+    Yields:
+        list: One list per chunk of (gap, bracket, string, atom, error) tuples, where
+            exactly one of bracket, string and atom is non-empty (all are empty for the
+            end-of-input match) and gap is the whitespace and comments before the token.
+    """
+    buffer = ''
+    eof = False
+    findall = TOKEN.findall
+    while not eof:
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        limit = len(buffer) if eof else _safe_limit(buffer)
+        if limit == 0:
+            continue
+        batch = findall(buffer, 0, limit)
+        if any(map(_ERROR, batch)):
+            if eof:
+                bad = next(token[4] for token in batch if token[4])
+                raise LudiiParseError(f"Unexpected {bad!r} (unterminated string?)")
+            continue  # A string literal runs past the limit; read on
+        buffer = buffer[limit:]
+        # Whitespace at the end of the segment belongs to the next token
+        while not eof and batch and not any(batch[-1][1:4]):
+            buffer = batch.pop()[0] + buffer
+        yield batch
+
+
+def tokenize(stream, chunk_size=1 << 16):
+    """
+    Yields (kind, text, gap) per token, kind being '(', ')', '{', '}', 'string' or 'atom'.
+    """
+    for batch in token_batches(stream, chunk_size):
+        for gap, bracket, string, atom, _ in batch:
+            if bracket:
+                yield bracket, bracket, gap
+            elif string:
+                yield 'string', string, gap
+            elif atom:
+                yield 'atom', atom, gap
+
+
+_ERROR = itemgetter(4)
+
+
+def _safe_limit(buffer):
+    # Tokens are only matched up to a point the next chunk cannot change: the last line
+    # break, or the last blank if the unfinished line holds no comment
+    line_start = buffer.rfind('\n') + 1
+    if '//' in buffer[line_start:]:
+        return line_start
+    return max(buffer.rfind(' ', line_start), buffer.rfind('\t', line_start), line_start - 1) + 1
+
+
+def parse(stream, build_tree=True, chunk_size=1 << 16):
+    """
+    Parses a Ludii description in one pass over its tokens.
+
+    Parameters:
+        stream: Text file object.
+        build_tree (bool): Keep the AST; bulk counting can skip it.
+        chunk_size (int): Characters read per chunk.
+
+    Returns:
+        ParseResult: AST (list of top-level nodes, or None), concept counts, ludeme frequencies, leading-atom forms and tree stats.
+    """
+    tree = [] if build_tree else None
+    ludemes = Counter()
+    forms = Counter()
+    atoms = Counter()
+    concept_counts = dict.fromkeys(CONCEPTS, 0)
+    sections = []  # Concepts whose subtree we are inside
+
+    # Open brackets: [head ('{' for arrays), child count, first child atom, Node, concept]
+    stack = []
+    tokens = nodes = arrays = max_depth = 0
+
+    for batch in token_batches(stream, chunk_size):
+        tokens += len(batch)
+        for _, bracket, string, atom, _ in batch:
+            if atom or string:
+                text = atom or string
+                if not stack:
+                    raise LudiiParseError(f"Token {text!r} outside any ludeme")
+                frame = stack[-1]
+                if frame[0] is None and atom:
+                    # First atom after '(' names the ludeme
+                    frame[0] = atom
+                    nodes += 1
+                    ludemes[atom] += 1
+                    if frame[3] is not None:
+                        frame[3].head = atom
+                    concept = SECTION_CONCEPTS.get(atom)
+                    if concept is not None:
+                        frame[4] = concept
+                        sections.append(concept)
+                    for active in sections:
+                        concept_counts[active] += 1
+                    if 'Equipment' in sections:
+                        if atom in CONTAINER_LUDEMES:
+                            concept_counts['Container'] += 1
+                        elif atom in COMPONENT_LUDEMES:
+                            concept_counts['Component'] += 1
+                else:
+                    if frame[0] is None:
+                        frame[0] = ''  # Headless list such as '("a" "b")'
+                        if frame[3] is not None:
+                            frame[3].head = ''
+                    if atom:
+                        atoms[atom] += 1
+                        if frame[0] and frame[0] != '{':
+                            # Leading atom arguments select a ludeme's variant: (is Line 3), (result Mover Win)
+                            if frame[1] == 0:
+                                forms[frame[0] + ' ' + atom] += 1
+                            elif frame[1] == 1 and frame[2]:
+                                forms[frame[0] + ' ' + frame[2] + ' ' + atom] += 1
+                    if frame[1] == 0:
+                        frame[2] = atom
+                    frame[1] += 1
+                    if frame[3] is not None:
+                        frame[3].children.append(text)
+
+            elif bracket == '(' or bracket == '{':
+                if stack:
+                    stack[-1][1] += 1
+                node = None
+                if build_tree:
+                    node = Node(None)
+                    (stack[-1][3].children if stack else tree).append(node)
+                if bracket == '(':
+                    stack.append([None, 0, None, node, None])
+                else:
+                    stack.append(['{', 0, None, node, None])
+                    arrays += 1
+                if len(stack) > max_depth:
+                    max_depth = len(stack)
+
+            elif bracket:
+                if not stack or (bracket == ')') == (stack[-1][0] == '{'):
+                    raise LudiiParseError(f"Unbalanced {bracket!r} at token {tokens}")
+                if stack.pop()[4] is not None:
+                    sections.pop()
+
+            else:
+                tokens -= 1  # End-of-input match
+
+    if stack:
+        raise LudiiParseError(f"{len(stack)} unclosed bracket(s) at end of input")
+
+    stats = {'num_tokens': tokens, 'num_ludemes': nodes, 'num_arrays': arrays,
+             'num_distinct_ludemes': len(ludemes), 'max_depth': max_depth}
+    return ParseResult(tree, concept_counts, ludemes, stats, forms, atoms)
+
+
+def parse_text(text, build_tree=True):
+    return parse(io.StringIO(text), build_tree)
+
+
+def parse_file(path, build_tree=False, chunk_size=1 << 16):
+    with open(path, 'r', encoding='utf-8') as file:
+        return parse(file, build_tree, chunk_size)
+
+
+def find_games(paths, extensions=('.lud', '.txt')):
+    """Expand files and directories (recursively) into a sorted list of game files."""
+    games = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                games.extend(os.path.join(root, name) for name in files if name.endswith(extensions))
+        else:
+            games.append(path)
+    return sorted(games)
+
+
+def _parse_for_bulk(path):
+    start = time.perf_counter()
+    try:
+        size = os.path.getsize(path)
+        result = parse_file(path)
+    except (OSError, LudiiParseError, UnicodeDecodeError) as error:
+        return path, None, str(error), 0, time.perf_counter() - start
+    return path, result.row(), None, size, time.perf_counter() - start
+
+
+def parse_many(paths, workers=1):
+    """
+    Parses many game files, in parallel when workers > 1.
+
+    Parameters:
+        paths (list): Game files.
+        workers (int): Worker processes.
+
+    Yields:
+        tuple: (path, row or None, error message or None, bytes, seconds).
+    """
+    if workers <= 1:
+        yield from map(_parse_for_bulk, paths)
+        return
+    with ProcessPoolExecutor(workers) as pool:
+        yield from pool.map(_parse_for_bulk, paths, chunksize=16)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse Ludii game files and report structural counts and throughput.")
+    parser.add_argument("paths", nargs="+", help="game files or directories of them")
+    parser.add_argument("--jsonl", default=None, help="write one row per game to this file")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    games = find_games(args.paths)
+    output = open(args.jsonl, 'w') if args.jsonl else None
+    total_bytes = total_tokens = failures = 0
+    start = time.perf_counter()
+    for path, row, error, size, _ in parse_many(games, args.workers):
+        total_bytes += size
+        if error is not None:
+            failures += 1
+            print(f"{path}: {error}")
+            continue
+        total_tokens += row['num_tokens']
+        if output is not None:
+            output.write(json.dumps({'path': path, **row}) + '\n')
+        elif len(games) == 1:
+            print(json.dumps(row, indent=2))
+    elapsed = time.perf_counter() - start
+    if output is not None:
+        output.close()
+    print(f"Parsed {len(games) - failures}/{len(games)} games, {total_bytes / 1e6:.2f} MB, {total_tokens} tokens "
+          f"in {elapsed:.2f}s: {total_bytes / 1e6 / elapsed:.2f} MB/s, {len(games) / elapsed:.0f} games/s")
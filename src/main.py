@@ -1,22 +1,27 @@
+import argparse
 import time
-import numpy as np
-import random
-from math import sqrt, log
 from models.mcts import MCTS
+from models.profiler import SearchProfiler
 from mnk import MNKGame
-from inference import get_best_string
-from pipeline import generate_ludii_mnk_game
+from opening_book import load_opening_book
 
-def test(m, n, k):
+def test(m, n, k, strategy_server=None, strategy=None, profile=False, early_stop=False):
     total_time = 0
     mcts_moves_played = 0
     game = MNKGame(m, n, k, 'X')
-    generate_ludii_mnk_game(m, n, k)
     # if m == 4:
-    optimal_strat = get_best_string()
+    if strategy is not None:
+        optimal_strat = strategy
+    else:
+        # Only pulled in when a prediction is needed; inference (pandas, joblib, sklearn) loads on a cache miss
+        from strategy_cache import get_best_string_cached
+        optimal_strat = get_best_string_cached(m, n, k, server_address=strategy_server)
     # else:
     #     optimal_strat = "MCTS-UCB1-1.41421356237-Random200-true"
     mcts = MCTS(game, optimal_strat)
+    mcts.book = load_opening_book()
+    if profile:
+        mcts.profiler = SearchProfiler()
 
     print("=== Simulation Start ===")
     print("Player X: MCTS Agent")
@@ -27,10 +32,16 @@ def test(m, n, k):
         if game.current_player == 'X':
             # calculate total time taken for MCTS to make a move
             start_time = time.time()
-            move = mcts.search(game, iterations=1000)  
+            move = mcts.search(game, iterations=1000, early_stop=early_stop)  
             end_time = time.time()
             total_time += end_time - start_time
             print("Time taken for MCTS to make a move:", end_time - start_time)
+            if mcts.last_from_book:
+                print("Opening book move")
+            if mcts.reuse_stats["reused"]:
+                print(f"Reused search tree: {mcts.reuse_stats['nodes']} nodes (~{mcts.reuse_stats['bytes'] / 1024:.0f} KiB)")
+            if profile and not mcts.last_from_book:
+                print(mcts.profiler.last.summary())
             mcts_moves_played += 1
             print("MCTS Agent (X) chooses:", move)
         else:
@@ -52,7 +63,18 @@ def test(m, n, k):
     print("=== Simulation End ===")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--strategy-server", nargs="?", const="/tmp/mnk-strategy.sock", default=None,
+                        help="ask a running strategy_server.py (at this socket) instead of loading the model in-process")
+    parser.add_argument("--strategy", default=None,
+                        help="play with this agent string (e.g. MCTS-UCB1-1.41421356237-Random200-true) and skip strategy prediction")
+    parser.add_argument("--profile", action="store_true",
+                        help="print where each MCTS move's time went (per-phase times, tree shape, rollout lengths)")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="end each MCTS move's search once the best move can no longer be overtaken")
+    args = parser.parse_args()
     # take m, n, k as input
     m, n, k = map(int, input("Enter m, n, k (space separated): ").split())
     print("Test Case [m: {}, n: {}, k: {}]".format(m, n, k))
-    test(m, n, k)
+    test(m, n, k, strategy_server=args.strategy_server, strategy=args.strategy, profile=args.profile,
+         early_stop=args.early_stop)
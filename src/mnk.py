@@ -1,16 +1,216 @@
 import numpy as np
 import json
+import random
+from functools import lru_cache
+
+class _BoardTables:
+    """Per-(m, n, k) lookup tables shared by every game of that shape.
+
+    Cell (row, col) is bit ``row * n + col`` of a player's bitboard. For each
+    cell we keep the masks of every k-long window through it, so a win check
+    after a move only tests those windows instead of rescanning the board.
+    Zobrist keys are seeded from the board size so hashes are stable across
+    processes and runs. ``symmetries[t][cell]`` is where the t-th dihedral
+    symmetry of the board (8 on square boards, 4 otherwise) sends a cell, and
+    ``symmetry_zobrist[t]`` holds the keys of the transformed cells, so the
+    hash of the transformed board is the XOR of those keys over the stones.
+    ``window_masks`` lists every window once and ``cell_windows[cell]`` the
+    indices of the windows through a cell, for the ThreatTracker.
+    """
+    def __init__(self, m, n, k):
+        self.cells = [(i, j) for i in range(m) for j in range(n)]
+        self.full = (1 << (m * n)) - 1
+        self.windows = [[] for _ in range(m * n)]
+        self.window_masks = []
+        self.cell_windows = [[] for _ in range(m * n)]
+        for dx, dy in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            for r in range(m):
+                for c in range(n):
+                    end_r, end_c = r + (k - 1) * dx, c + (k - 1) * dy
+                    if not (0 <= end_r < m and 0 <= end_c < n):
+                        continue
+                    mask = 0
+                    for step in range(k):
+                        mask |= 1 << ((r + step * dx) * n + c + step * dy)
+                    for step in range(k):
+                        self.windows[(r + step * dx) * n + c + step * dy].append(mask)
+                        self.cell_windows[(r + step * dx) * n + c + step * dy].append(len(self.window_masks))
+                    self.window_masks.append(mask)
+        zobrist_rng = random.Random(f"zobrist-{m}x{n}")
+        self.zobrist = {player: [zobrist_rng.getrandbits(64) for _ in range(m * n)] for player in ('X', 'O')}
+        transforms = [
+            lambda r, c: (r, c),
+            lambda r, c: (m - 1 - r, n - 1 - c),
+            lambda r, c: (m - 1 - r, c),
+            lambda r, c: (r, n - 1 - c),
+        ]
+        if m == n:
+            transforms += [
+                lambda r, c: (c, r),
+                lambda r, c: (n - 1 - c, m - 1 - r),
+                lambda r, c: (c, m - 1 - r),
+                lambda r, c: (n - 1 - c, r),
+            ]
+        self.symmetries = []
+        self.inverse_symmetries = []
+        for transform in transforms:
+            perm = [0] * (m * n)
+            for r, c in self.cells:
+                image_r, image_c = transform(r, c)
+                perm[r * n + c] = image_r * n + image_c
+            inverse = [0] * (m * n)
+            for cell, image in enumerate(perm):
+                inverse[image] = cell
+            self.symmetries.append(perm)
+            self.inverse_symmetries.append(inverse)
+        self.symmetry_zobrist = [
+            {player: [keys[image] for image in perm] for player, keys in self.zobrist.items()}
+            for perm in self.symmetries
+        ]
+        self.shape = (m, n, k)
+
+    def __reduce__(self):
+        # Pickle as a lookup so worker processes rebuild (or reuse) their own tables
+        return (_board_tables, self.shape)
+
+@lru_cache(maxsize=None)
+def _board_tables(m, n, k):
+    return _BoardTables(m, n, k)
+
+class ThreatTracker:
+    """Open lines and threat cells of one game, kept up to date by MNKGame.apply/undo.
+
+    ``stones[player][w]`` counts the player's stones in window ``w``. A window
+    holding only one player's stones and lacking one of them makes its empty
+    cell a win cell of that player (playing there wins); lacking two makes both
+    empty cells four cells (playing there creates a win cell). ``wins`` and
+    ``fours`` count, per player and cell, the windows that do so, and
+    ``win_bits`` / ``four_bits`` are bitboards of the cells with a nonzero
+    count. A move only revisits the windows through its cell, and immediate
+    wins, forced blocks and double threats are bitboard tests.
+    """
+    def __init__(self, game):
+        tables = game._tables
+        self.k = game.k
+        self.masks = tables.window_masks
+        self.cell_windows = tables.cell_windows
+        size = game.m * game.n
+        self.stones = {player: [(mask & game.bits[player]).bit_count() for mask in self.masks] for player in ('X', 'O')}
+        self.wins = {player: [0] * size for player in ('X', 'O')}
+        self.fours = {player: [0] * size for player in ('X', 'O')}
+        self.win_bits = {'X': 0, 'O': 0}
+        self.four_bits = {'X': 0, 'O': 0}
+        empty = tables.full ^ (game.bits['X'] | game.bits['O'])
+        for window in range(len(self.masks)):
+            self._mark(window, 1, empty)
+
+    def copy(self):
+        new = ThreatTracker.__new__(ThreatTracker)
+        new.__dict__.update(self.__dict__)
+        new.stones = {player: list(counts) for player, counts in self.stones.items()}
+        new.wins = {player: list(counts) for player, counts in self.wins.items()}
+        new.fours = {player: list(counts) for player, counts in self.fours.items()}
+        new.win_bits = dict(self.win_bits)
+        new.four_bits = dict(self.four_bits)
+        return new
+
+    def _mark(self, window, sign, empty):
+        # Add (sign 1) or remove (sign -1) the threat cells window contributes given the empty cells
+        x, o = self.stones['X'][window], self.stones['O'][window]
+        for player, mine, theirs in (('X', x, o), ('O', o, x)):
+            missing = self.k - mine
+            if theirs or missing > 2:
+                continue
+            if missing == 1:
+                counts, bits = self.wins[player], self.win_bits
+            elif missing == 2:
+                counts, bits = self.fours[player], self.four_bits
+            else:
+                continue  # Complete: the game is over
+            cells = self.masks[window] & empty
+            while cells:
+                low = cells & -cells
+                cells ^= low
+                cell = low.bit_length() - 1
+                counts[cell] += sign
+                if counts[cell] == 0:
+                    bits[player] &= ~low
+                elif sign > 0 and counts[cell] == 1:
+                    bits[player] |= low
+
+    def move(self, cell, player, empty, sign):
+        """Account for a stone of player placed on (sign 1) or removed from (sign -1) cell; empty is the board before."""
+        after = empty & ~(1 << cell) if sign > 0 else empty | (1 << cell)
+        mine = self.stones[player]
+        theirs = self.stones['O' if player == 'X' else 'X']
+        k = self.k
+        for window in self.cell_windows[cell]:
+            before, blocked = mine[window], theirs[window]
+            # Only windows within two stones of complete, for either player, can change threat cells
+            if not ((not blocked and k - before <= 3) or ((before == 0 or before + sign == 0) and k - blocked <= 2)):
+                mine[window] += sign
+                continue
+            self._mark(window, -1, empty)
+            mine[window] += sign
+            self._mark(window, 1, after)
 
 class MNKGame:
     def __init__(self, m, n, k, my_player):
         self.m = m  # Number of rows
         self.n = n  # Number of columns
         self.k = k  # Number of consecutive marks needed to win
-        self.board = np.full((m, n), ' ')  # Empty board
         self.current_player = 'X'  # Player X starts
         self.my_player = my_player
         self.winner = None  # To store the winner
         self.last_move = None  # To store the last move
+        self._tables = _board_tables(m, n, k)
+        self.bits = {'X': 0, 'O': 0}  # One bitboard per player
+        self.empty_count = m * n
+        self.history = []  # Undo stack for apply()/undo()
+        self.hash = 0  # Zobrist hash of the stones on the board
+        self.threats = None  # ThreatTracker, once track_threats() is called
+
+    @property
+    def board(self):
+        """
+        The board as an (m, n) array of ' '/'X'/'O', built from the bitboards.
+
+        The array is a read-only snapshot: writing to a cell raises instead of being
+        silently lost. Play moves with apply()/make_move(), or assign a whole board.
+        """
+        board = np.full((self.m, self.n), ' ')
+        for player, bits in self.bits.items():
+            for i, j in self._cells_of(bits):
+                board[i, j] = player
+        board.flags.writeable = False
+        return board
+
+    @board.setter
+    def board(self, board):
+        self.bits = {'X': 0, 'O': 0}
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell in self.bits:
+                    self.bits[cell] |= 1 << (i * self.n + j)
+        self.hash = 0
+        for player, bits in self.bits.items():
+            keys = self._tables.zobrist[player]
+            while bits:
+                low = bits & -bits
+                self.hash ^= keys[low.bit_length() - 1]
+                bits ^= low
+        self.empty_count = self.m * self.n - (self.bits['X'] | self.bits['O']).bit_count()
+        if getattr(self, 'threats', None) is not None:
+            self.threats = ThreatTracker(self)
+
+    def _cells_of(self, bits):
+        cells = self._tables.cells
+        moves = []
+        while bits:
+            low = bits & -bits
+            moves.append(cells[low.bit_length() - 1])
+            bits ^= low
+        return moves
 
     def display_board(self):
         print("\n=== Current Board ===")
@@ -23,24 +223,112 @@ class MNKGame:
         print(f"Next Player: {self.current_player}\n")
 
     def get_legal_moves(self):
-        return [(i, j) for i in range(self.m) for j in range(self.n) if self.board[i, j] == ' ']
+        return self._cells_of(self._tables.full ^ (self.bits['X'] | self.bits['O']))
+
+    def track_threats(self):
+        """Start keeping a ThreatTracker up to date (no-op if already tracking) and return it."""
+        if self.threats is None:
+            self.threats = ThreatTracker(self)
+        return self.threats
+
+    def forced_moves(self):
+        """
+        Moves the player to move is restricted to, from the threat tracker.
+
+        Returns:
+            list: One immediate win if there is one, else the blocks of every
+            opponent win cell (more than one means the game is lost), else []
+            when the move is free.
+        """
+        threats = self.track_threats()
+        player = self.current_player
+        wins = threats.win_bits[player]
+        if wins:
+            return self._cells_of(wins & -wins)
+        return self._cells_of(threats.win_bits['O' if player == 'X' else 'X'])
 
     def make_move(self, move):
-        row, col = move
-        if self.board[row, col] != ' ':
-            raise ValueError("Invalid move: Cell is already occupied.")
+        """Return a new game with the move played, leaving this one untouched."""
         new_game = self.copy()
-        new_game.board[row, col] = self.current_player
-        new_game.last_move = move
-        new_game.current_player = 'O' if self.current_player == 'X' else 'X'
-        new_game.check_winner(row, col)
+        new_game.apply(move)
         return new_game
 
+    def apply(self, move):
+        """Play a move in place. It can be reverted with undo()."""
+        row, col = move
+        bit = 1 << (row * self.n + col)
+        if (self.bits['X'] | self.bits['O']) & bit:
+            raise ValueError("Invalid move: Cell is already occupied.")
+        player = self.current_player
+        self.history.append((move, self.last_move, self.winner, player))
+        if self.threats is not None:
+            self.threats.move(row * self.n + col, player, self._tables.full ^ (self.bits['X'] | self.bits['O']), 1)
+        self.bits[player] |= bit
+        self.hash ^= self._tables.zobrist[player][row * self.n + col]
+        self.empty_count -= 1
+        self.last_move = move
+        self.current_player = 'O' if player == 'X' else 'X'
+        self.check_winner(row, col)
+
+    def undo(self):
+        """Revert the most recent apply()."""
+        move, self.last_move, self.winner, player = self.history.pop()
+        cell = move[0] * self.n + move[1]
+        self.bits[player] ^= 1 << cell
+        if self.threats is not None:
+            self.threats.move(cell, player, self._tables.full ^ (self.bits['X'] | self.bits['O']) ^ (1 << cell), -1)
+        self.hash ^= self._tables.zobrist[player][cell]
+        self.empty_count += 1
+        self.current_player = player
+
+    def hash_after(self, move):
+        """Zobrist hash of the position after the current player plays move."""
+        return self.hash ^ self._tables.zobrist[self.current_player][move[0] * self.n + move[1]]
+
+    def symmetry_hashes(self):
+        """Hash of the board under each symmetry; index 0 (identity) equals self.hash."""
+        hashes = []
+        for keys in self._tables.symmetry_zobrist:
+            value = 0
+            for player, bits in self.bits.items():
+                player_keys = keys[player]
+                while bits:
+                    low = bits & -bits
+                    value ^= player_keys[low.bit_length() - 1]
+                    bits ^= low
+            hashes.append(value)
+        return hashes
+
+    def symmetry_hashes_after(self, hashes, move):
+        """Update symmetry_hashes() for the current player playing move, without playing it."""
+        cell = move[0] * self.n + move[1]
+        player = self.current_player
+        return [value ^ keys[player][cell] for value, keys in zip(hashes, self._tables.symmetry_zobrist)]
+
+    def canonical(self, hashes=None):
+        """Return (canonical hash, symmetry index) for the position.
+
+        The canonical orientation is the symmetry with the smallest hash, so
+        all symmetric positions share the same canonical hash.
+        """
+        if hashes is None:
+            hashes = self.symmetry_hashes()
+        index = min(range(len(hashes)), key=hashes.__getitem__)
+        return hashes[index], index
+
+    def to_canonical(self, move, symmetry):
+        """Map a move on this board into the orientation given by symmetry."""
+        return self._tables.cells[self._tables.symmetries[symmetry][move[0] * self.n + move[1]]]
+
+    def from_canonical(self, move, symmetry):
+        """Map a move in the orientation given by symmetry back onto this board."""
+        return self._tables.cells[self._tables.inverse_symmetries[symmetry][move[0] * self.n + move[1]]]
+
     def is_terminal(self):
         """Check if the game is over."""
         if self.winner is not None:
             return True  # Someone has won
-        return all(cell != ' ' for row in self.board for cell in row)  # Draw
+        return self.empty_count == 0  # Draw
 
     def get_reward(self):
         """Return the reward for the current state."""
@@ -53,35 +341,38 @@ class MNKGame:
 
     def check_winner(self, row, col):
         """Check if the last move resulted in a win."""
-        player = self.board[row, col]
-        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
-        for dx, dy in directions:
-            if self.check_direction(row, col, dx, dy, player):
-                self.winner = player
-                return
+        cell = row * self.n + col
+        for player, bits in self.bits.items():
+            if bits >> cell & 1:
+                for window in self._tables.windows[cell]:
+                    if bits & window == window:
+                        self.winner = player
+                        return
         self.winner = None
 
     def check_direction(self, row, col, dx, dy, player):
         count = 0
+        bits = self.bits.get(player, 0)
         for step in range(-self.k + 1, self.k):
             r, c = row + step * dx, col + step * dy
-            if 0 <= r < self.m and 0 <= c < self.n and self.board[r, c] == player:
+            if 0 <= r < self.m and 0 <= c < self.n and bits >> (r * self.n + c) & 1:
                 count += 1
                 if count == self.k:
                     return True
             else:
                 count = 0
         return False
-    
+
     def get_last_move(self):
         return self.last_move
 
     def copy(self):
-        new_game = MNKGame(self.m, self.n, self.k, self.my_player)
-        new_game.board = self.board.copy()
-        new_game.current_player = self.current_player
-        new_game.last_move = self.last_move
-        new_game.winner = self.winner
+        new_game = MNKGame.__new__(MNKGame)
+        new_game.__dict__.update(self.__dict__)
+        new_game.bits = dict(self.bits)
+        new_game.history = []
+        if self.threats is not None:
+            new_game.threats = self.threats.copy()
         return new_game
 
     def save_state(self, filename):
@@ -101,17 +392,24 @@ class MNKGame:
     def load_state(self, filename):
         with open(filename, "r") as f:
             state = json.load(f)
-        self.board = np.array(state["board"])
-        self.current_player = state["current_player"]
         self.m = state["m"]
         self.n = state["n"]
         self.k = state["k"]
+        self._tables = _board_tables(self.m, self.n, self.k)
+        self.board = np.array(state["board"])
+        self.current_player = state["current_player"]
         self.winner = state["winner"]
-        self.last_move = tuple(state["last_move"])
+        self.last_move = tuple(state["last_move"]) if state["last_move"] is not None else None
+        self.history = []
+        self.threats = None
         print(f"Game state loaded from {filename}.")
 
     def reset_game(self):
-        self.board = np.full((self.m, self.n), ' ')
+        self.bits = {'X': 0, 'O': 0}
+        self.hash = 0
+        self.empty_count = self.m * self.n
         self.current_player = 'X'
         self.winner = None
         self.last_move = None
+        self.history = []
+        self.threats = None
@@ -0,0 +1,264 @@
+import heapq
+import numpy as np
+from models.mcts import MCTS, ScoreBounds, SelectionStrategy, ucb_scores
+
+class NodePool:
+    """Preallocated struct-of-arrays storage for an MCTS tree.
+
+    Node ``i`` is described by ``parent[i]``, ``move[i]`` (the cell index of
+    the move that led to it), ``visits[i]``, ``wins[i]`` and its children,
+    which always occupy the contiguous block
+    ``first_child[i] : first_child[i] + child_count[i]``. ``child_count`` is
+    -1 for a node that has not been expanded yet. Node 0 is the root.
+    """
+    def __init__(self, capacity=1_000_000):
+        self.capacity = capacity
+        self.parent = np.empty(capacity, dtype=np.int32)
+        self.first_child = np.empty(capacity, dtype=np.int32)
+        self.child_count = np.empty(capacity, dtype=np.int32)
+        self.move = np.empty(capacity, dtype=np.int32)
+        self.visits = np.empty(capacity, dtype=np.int32)
+        self.wins = np.empty(capacity, dtype=np.float64)
+        self.recycles = 0
+        self.reset()
+
+    def reset(self):
+        self.size = 0
+        self.allocate(1)
+        self.parent[0] = -1
+        self.move[0] = -1
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (self.parent, self.first_child, self.child_count, self.move, self.visits, self.wins))
+
+    def allocate(self, count):
+        """Reserve count consecutive fresh nodes and return the first index, or -1 if the pool is full."""
+        if self.size + count > self.capacity:
+            return -1
+        start = self.size
+        self.size += count
+        block = slice(start, self.size)
+        self.first_child[block] = -1
+        self.child_count[block] = -1
+        self.visits[block] = 0
+        self.wins[block] = 0
+        return start
+
+    def children(self, node):
+        start = self.first_child[node]
+        return slice(start, start + max(self.child_count[node], 0))
+
+    def moves_to(self, node):
+        """Cell indices of the moves from the root down to node."""
+        moves = []
+        while node > 0:
+            moves.append(int(self.move[node]))
+            node = self.parent[node]
+        return moves[::-1]
+
+    def recycle(self, keep_fraction=0.5):
+        """Compact the tree into at most keep_fraction of the pool, dropping the least visited subtrees.
+
+        Child blocks are copied in order of decreasing visits until the budget
+        is used up, except the root's own block, which is always kept; nodes
+        whose block does not fit keep their own statistics but become
+        unexpanded leaves again. Returns an array mapping old node indices to
+        new ones (-1 for dropped nodes).
+        """
+        budget = max(1, int(self.capacity * keep_fraction))
+        mapping = np.full(self.size, -1, dtype=np.int64)
+        mapping[0] = 0
+        old_first, old_count = self.first_child.copy(), self.child_count.copy()
+        old_move, old_visits, old_wins = self.move.copy(), self.visits.copy(), self.wins.copy()
+        self.size = 0
+        self.allocate(1)
+        self.parent[0] = -1
+        self.move[0] = -1
+        self.visits[0] = old_visits[0]
+        self.wins[0] = old_wins[0]
+        heap = [(-int(old_visits[0]), 0, 0)]
+        while heap:
+            _, source, target = heapq.heappop(heap)
+            count = old_count[source]
+            # The root's block is always kept, so the search still has moves to choose from
+            if count < 0 or (count > 0 and source != 0 and self.size + count > budget):
+                continue
+            start = self.allocate(count) if count > 0 else self.size
+            self.first_child[target] = start
+            self.child_count[target] = count
+            for offset in range(count):
+                child = old_first[source] + offset
+                self.parent[start + offset] = target
+                self.move[start + offset] = old_move[child]
+                self.visits[start + offset] = old_visits[child]
+                self.wins[start + offset] = old_wins[child]
+                mapping[child] = start + offset
+                heapq.heappush(heap, (-int(old_visits[child]), child, start + offset))
+        self.recycles += 1
+        return mapping
+
+class ArrayMCTS(MCTS):
+    """MCTS over a NodePool instead of per-node Python objects.
+
+    No game state is stored in the tree: every iteration replays the moves
+    from the root on the scratch state as it descends. When the pool is full,
+    ``on_full="stop"`` leaves nodes unexpanded (they are still rolled out) and
+    ``on_full="recycle"`` compacts the tree down to half the pool by
+    discarding the least visited subtrees, then carries on expanding. Only
+    the single-process serial and batched search modes are supported.
+    """
+    def __init__(self, game, strategy="MCTS-UCB1-0.1-Random200-true", seed=None, capacity=1_000_000, on_full="stop"):
+        super().__init__(game, strategy, seed=seed, tt_capacity=0, reuse_tree=False)
+        self.threat_search_nodes = 0  # Proven values need Node objects; only the rollouts and expansion use tactics
+        if on_full not in ("stop", "recycle"):
+            raise ValueError(f"Unknown pool exhaustion behaviour: {on_full}")
+        self.pool = NodePool(capacity)
+        self.on_full = on_full
+        self.root_state = None
+        self._mapping = None  # Old -> new node indices from the last recycle
+
+    def search(self, state, iterations=None, batch_size=1, workers=1, parallel="root", time_budget_ms=None, early_stop=False):
+        if workers > 1:
+            raise ValueError("ArrayMCTS only supports single-process search")
+        return super().search(state, iterations, batch_size, 1, parallel, time_budget_ms, early_stop)
+
+    def _set_root(self, state, reuse=True):
+        # Without room for the root's children the search could never return a move
+        if self.pool.capacity < 1 + state.empty_count:
+            raise ValueError(f"A pool of {self.pool.capacity} nodes cannot hold the root and its "
+                             f"{state.empty_count} children; use a capacity of at least {1 + state.empty_count}")
+        self.pool.reset()
+        self.root = 0
+        self.root_state = state
+
+    def _select(self, node, state):
+        self._mapping = None
+        pool = self.pool
+        cells = state._tables.cells
+        path = [node]
+        while not state.is_terminal():
+            if pool.child_count[node] < 0 and not self._expand(node, state):
+                if self._mapping is not None:
+                    path = self._remap(path)
+                break
+            start = pool.first_child[node]
+            node = start + self._choose_child(node, state)
+            state.apply(cells[pool.move[node]])
+            path.append(node)
+            if pool.visits[node] == 0:
+                break
+        return path
+
+    def _choose_child(self, node, state):
+        pool = self.pool
+        block = pool.children(node)
+        scores = ucb_scores(pool.visits[node], pool.visits[block], pool.wins[block], self.exploration_const.value,
+                            grave_adjustment=self.selection == SelectionStrategy.UCB1GRAVE,
+                            tuned=self.selection == SelectionStrategy.UCB1Tuned)
+        return int(np.argmax(scores))
+
+    def _expand(self, node, state):
+        legal_moves = self._legal_moves(state)
+        start = self.pool.allocate(len(legal_moves))
+        if start < 0 and self.on_full == "recycle":
+            # Nodes are renumbered; the caller remaps its path and rolls out from here
+            self._mapping = self.pool.recycle()
+            return False
+        if start < 0:
+            return False
+        pool = self.pool
+        pool.parent[start:start + len(legal_moves)] = node
+        pool.move[start:start + len(legal_moves)] = [row * state.n + col for row, col in legal_moves]
+        # Published last, so a concurrent best_move() never sees the block before its moves
+        pool.first_child[node] = start
+        pool.child_count[node] = len(legal_moves)
+        return True
+
+    def _movers(self, path):
+        # Player who moved into each node of the path (None for the root)
+        first = self.root_state.current_player
+        second = 'O' if first == 'X' else 'X'
+        return [None] + [first if depth % 2 else second for depth in range(1, len(path))]
+
+    def _backpropagate(self, path, reward, rollout=None):
+        my_player = self.root_state.my_player
+        pool = self.pool
+        for node, mover in zip(path, self._movers(path)):
+            pool.visits[node] += 1
+            node_reward = reward if mover == my_player else -reward
+            if self.score_bounds == ScoreBounds.TRUE:
+                pool.wins[node] += node_reward
+            else:
+                pool.wins[node] += node_reward / pool.visits[node]
+        if rollout is not None:
+            self.policy.update(*rollout, reward if my_player == 'X' else -reward)
+
+    def _add_virtual_loss(self, path, sign):
+        self.pool.visits[path] += sign
+        self.pool.wins[path] -= sign
+
+    def _remap(self, path):
+        # Translate a path through the last recycle, cutting it at the first dropped node
+        remapped = []
+        for node in path:
+            node = int(self._mapping[node]) if node < len(self._mapping) else -1
+            if node < 0:
+                break
+            remapped.append(node)
+        return remapped
+
+    def _collect_leaves(self, scratch, count):
+        # Paths already collected carry virtual loss; if a recycle renumbers the pool they are remapped too
+        leaves, leaf_states = [], []
+        for _ in range(count):
+            path = self._select(self.root, scratch)
+            if self._mapping is not None:
+                leaves = [self._remap(pending) for pending in leaves]
+            self._add_virtual_loss(path, 1)
+            leaves.append(path)
+            leaf_states.append(self._leaf_state(scratch))
+            while scratch.history:
+                scratch.undo()
+        return leaves, leaf_states
+
+    def _is_decided(self, remaining):
+        visits = np.sort(self.pool.visits[self.pool.children(0)])
+        if visits.size == 0:
+            return False
+        second = visits[-2] if visits.size > 1 else 0
+        return visits[-1] > 0 and visits[-1] - second > remaining
+
+    def best_move(self):
+        if self.root_state is None or self.pool.child_count[0] <= 0:
+            return None
+        block = self.pool.children(0)
+        # Most visited child, ties broken on wins
+        best = np.lexsort((self.pool.wins[block], self.pool.visits[block]))[-1]
+        return self.root_moves()[best]
+
+    def root_moves(self):
+        cells = self.root_state._tables.cells
+        return [cells[move] for move in self.pool.move[self.pool.children(0)]]
+
+    def state_of(self, node):
+        """Rebuild the game at node by replaying its moves from the root."""
+        state = self.root_state.copy()
+        cells = state._tables.cells
+        for move in self.pool.moves_to(node):
+            state.apply(cells[move])
+        return state
+
+    def tree_stats(self):
+        return {"nodes": int(self.pool.size), "bytes": self.pool.nbytes}
+
+    def depth_histogram(self):
+        pool = self.pool
+        counts = []
+        level = np.zeros(1, dtype=np.int64)
+        while level.size:
+            counts.append(int(level.size))
+            expanded = level[pool.child_count[level] > 0]
+            level = np.concatenate([np.arange(pool.first_child[node], pool.first_child[node] + pool.child_count[node])
+                                    for node in expanded]) if expanded.size else expanded
+        return counts
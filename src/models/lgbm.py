@@ -3,6 +3,7 @@ import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error
 import numpy as np
+from models.tree_predictor import TreeArrayPredictor
 
 class LGBMModel:
     def __init__(self, n_estimators=1000, learning_rate=0.01, objective='regression', metric='rmse'):
@@ -64,3 +65,18 @@ class LGBMModel:
         - Predicted values
         """
         return self.model.predict(features)
+
+    def export(self, path=None):
+        """
+        Export the trained booster as a standalone TreeArrayPredictor.
+
+        Parameters:
+        - path: Where to save the predictor (.npz); not saved if None
+
+        Returns:
+        - The TreeArrayPredictor
+        """
+        predictor = TreeArrayPredictor.from_booster(self.model.booster_)
+        if path is not None:
+            predictor.save(path)
+        return predictor
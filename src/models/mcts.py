@@ -1,37 +1,83 @@
 import numpy as np
 import random
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
+from models.playout import BatchPlayout, PlayoutPolicy, center_order, center_weights
+from models.tactics import threat_search
+from models.transposition import TranspositionTable
+
+def ucb_scores(parent_visits, visits, wins, exploration_weight, grave_adjustment=False, tuned=False):
+    """UCB value of every child at once from arrays of child visits and wins."""
+    exploitation = wins / (visits + 1e-10)
+    exploration = exploration_weight * np.sqrt(np.log(parent_visits + 1) / (visits + 1e-10))
+    if tuned:
+        exploration = exploration * np.sqrt(np.var(np.where(visits > 0, wins / np.maximum(visits, 1), 0)))
+    if grave_adjustment:
+        exploitation = exploitation + 0.1 * wins / (visits + 1e-10)
+    return exploitation + exploration
 
 class Node:
-    def __init__(self, state, parent=None):
-        self.state = state
-        self.parent = parent
+    def __init__(self, state=None, parent=None, player=None, key=None):
+        self.state = state  # Only the root keeps a game; the rest are replayed on a scratch state
+        self.parent = parent  # First parent; transposed nodes can be reached from several
+        self.player = player  # Player who moved into this position
+        self.key = key  # Canonical hash of the position
         self.children = []
+        self.moves = []  # moves[i] leads to children[i], in this position's canonical orientation
+        self.num_legal = None  # Set the first time the node is expanded
         self.visits = 0
         self.wins = 0
+        # child_visits[i] / child_wins[i] mirror children[i].visits / .wins so selection is one vector expression
+        self.child_visits = np.zeros(0)
+        self.child_wins = np.zeros(0)
+        self.proven = 0  # 1 or -1 once the position is a proven win or loss for player
+        self.child_proven = np.zeros(0)
+        self.parents = []  # (parent, index) pairs whose child arrays mirror this node
     
     def print_state(self):
         self.state.display_board()
 
     def is_fully_expanded(self):
-        return len(self.children) == len(self.state.get_legal_moves())
+        return self.num_legal is not None and len(self.children) == self.num_legal
 
     def best_child(self, exploration_weight=1.41, grave_adjustment=False, tuned=False):
-        choices_weights = []
-        for child in self.children:
-            exploitation = child.wins / (child.visits + 1e-10)
-            exploration = exploration_weight * np.sqrt(np.log(self.visits + 1) / (child.visits + 1e-10))
-            
-            if tuned:
-                variance = np.var([c.wins / c.visits if c.visits > 0 else 0 for c in self.children])
-                exploration *= np.sqrt(variance)
-            
-            if grave_adjustment:
-                exploitation += self.compute_grave_adjustment(child)
-            
-            choices_weights.append(exploitation + exploration)
-
-        return self.children[np.argmax(choices_weights)]
+        return self.children[self.best_child_index(exploration_weight, grave_adjustment, tuned)]
+
+    def best_child_index(self, exploration_weight=1.41, grave_adjustment=False, tuned=False):
+        scores = ucb_scores(self.visits, self.child_visits, self.child_wins, exploration_weight, grave_adjustment, tuned)
+        if self.child_proven.any():
+            # Proven wins for the player choosing are always taken and proven losses never
+            scores = np.where(self.child_proven > 0, np.inf, np.where(self.child_proven < 0, -np.inf, scores))
+        return int(np.argmax(scores))
+
+    def add_children(self, moves, children):
+        offset = len(self.children)
+        # Moves first: a concurrent best_move() (anytime search) may read children at any point,
+        # and every child it sees must already have its move
+        self.moves.extend(moves)
+        self.children.extend(children)
+        self.child_visits = np.concatenate([self.child_visits, [child.visits for child in children]])
+        self.child_wins = np.concatenate([self.child_wins, [child.wins for child in children]])
+        self.child_proven = np.concatenate([self.child_proven, [child.proven for child in children]])
+        for index, child in enumerate(children, offset):
+            child.parents.append((self, index))
+
+    def update(self, visits, wins):
+        """Add to this node's statistics and mirror them into every parent's child arrays."""
+        self.visits += visits
+        self.wins += wins
+        for parent, index in self.parents:
+            parent.child_visits[index] = self.visits
+            parent.child_wins[index] = self.wins
+
+    def prove(self, value):
+        """Mark the position a proven win (1) or loss (-1) for player, in every parent's child arrays too."""
+        self.proven = value
+        for parent, index in self.parents:
+            parent.child_proven[index] = value
 
     def compute_grave_adjustment(self, child):
         return 0.1 * child.wins / (child.visits + 1e-10)
@@ -58,10 +104,33 @@ class ScoreBounds(Enum):
     FALSE = "false"
 
 class MCTS:
-    def __init__(self, game, strategy="MCTS-UCB1-0.1-Random200-true"):
+    def __init__(self, game, strategy="MCTS-UCB1-0.1-Random200-true", seed=None, tt_capacity=200_000, tt_policy="lru", reuse_tree=True):
         self.game = game
         self.strategy = strategy
+        self.selection, self.exploration_const, self.playout, self.score_bounds = self.decode_strategy()
+        self.playout_steps = 200 if self.playout == PlayoutStrategy.Random200 else 100
+        self.policy = None  # MAST/NST statistics of the board being searched, kept across searches
+        # With score bounds, rollouts play immediate wins and forced blocks and the tree keeps proven values
+        self.tactics = self.score_bounds == ScoreBounds.TRUE
+        self.threat_search_nodes = 1000  # Proof-number budget of the threat search at the root (0 to skip it)
+        self.book = None  # OpeningBook consulted before searching, if any
+        self.last_from_book = False
+        self.profiler = None  # SearchProfiler instrumenting each search, if any
+        self.last_rollout_length = 0  # Moves played by the latest scalar rollout
         self.root = None
+        self.reuse_tree = reuse_tree
+        self.reuse_stats = {"reused": False, "nodes": 0, "bytes": 0}  # What the last search started from
+        self.tt = TranspositionTable(tt_capacity, tt_policy)  # Position hash -> Node, so the tree is a DAG
+        self.rng = random.Random(seed)
+        self.batch_rng = np.random.default_rng(seed)
+        self.worker_iterations = []  # Iterations (or rollouts) each worker ran in the last search
+        self._pool = None
+        self._pool_size = 0
+        self.check_interval = 16  # Iterations between clock/stop checks
+        self.last_iterations = 0
+        self.last_search_ms = 0.0
+        self._stop_requested = threading.Event()
+        self._thread = None
 
     def decode_strategy(self):
         strategy = self.strategy.split("-")
@@ -71,71 +140,569 @@ class MCTS:
         score_bounds = ScoreBounds(strategy[4])
         return selection, exploration_const, playout, score_bounds
 
-    def _backpropagate(self, node, reward):
-        _, _, _, score_bounds = self.decode_strategy()
-        while node is not None:
-            node.visits += 1
-            if score_bounds == ScoreBounds.TRUE:
-                node.wins += reward
+    def _backpropagate(self, path, reward, rollout=None):
+        # reward is from my_player's point of view; each node scores it for the player who moved into it
+        my_player = self.root.state.my_player
+        leaf = path[-1]
+        if leaf.proven:
+            # A proven leaf scores its exact result, whatever the rollout said
+            reward = leaf.proven if leaf.player == my_player else -leaf.proven
+            rollout = None
+        for node in path:
+            node_reward = reward if node.player == my_player else -reward
+            if self.score_bounds == ScoreBounds.TRUE:
+                node.update(1, node_reward)
+            else:
+                node.update(1, node_reward / (node.visits + 1))
+        if rollout is not None:
+            self.policy.update(*rollout, reward if my_player == 'X' else -reward)
+        if self.tactics:
+            self._propagate_proof(path)
+
+    def _propagate_proof(self, path):
+        # MCTS-Solver: a child the mover wins with proves the parent lost for the player who moved
+        # into it, and a fully expanded parent whose children all lose proves it won
+        for index in range(len(path) - 1, 0, -1):
+            child, parent = path[index], path[index - 1]
+            if child.proven > 0:
+                parent.prove(-1)
+            elif child.proven < 0 and parent.is_fully_expanded() and (parent.child_proven < 0).all():
+                parent.prove(1)
             else:
-                node.wins += reward / node.visits
-            node = node.parent
+                break
 
-    def _select(self, node):
-        selection, exploration_const, _, _ = self.decode_strategy()
-        if not node.is_fully_expanded():
-            self._expand(node)
+    def _check_proven(self, node, state):
+        # Bounds read off the threat tracker: the game is won, the player to move wins at once,
+        # or the player to move faces two win cells and can block only one
+        if node.proven or node.player is None:
+            return
+        threats = state.threats
+        if state.winner is not None:
+            node.prove(1 if state.winner == node.player else -1)
+        elif threats.win_bits[state.current_player]:
+            node.prove(-1)
+        elif threats.win_bits[node.player] & (threats.win_bits[node.player] - 1):
+            node.prove(1)
+
+    def _legal_moves(self, state):
+        # With tactics, a forced win or block is the only move worth a child
+        if self.tactics:
+            forced = state.forced_moves()
+            if forced:
+                return forced
+        return state.get_legal_moves()
+
+    def _select(self, node, state):
+        """Walk down from node, applying each chosen move to state, and return the path to a new, terminal or proven node."""
+        path = [node]
+        hashes = self._root_hashes
+        while not state.is_terminal():
+            _, symmetry = state.canonical(hashes)
+            if not node.is_fully_expanded():
+                self._expand(node, state, hashes)
+            index = self._choose_child(node, state)
+            move = state.from_canonical(node.moves[index], symmetry)
+            hashes = state.symmetry_hashes_after(hashes, move)
+            state.apply(move)
+            node = node.children[index]
+            path.append(node)
+            if node.visits == 0 or node.proven:
+                break
+        if self.tactics:
+            self._check_proven(path[-1], state)
+        return path
+
+    def _choose_child(self, node, state):
+        selection, exploration_const = self.selection, self.exploration_const
         if selection == SelectionStrategy.UCB1:
-            return node.best_child(exploration_const.value)
+            return node.best_child_index(exploration_const.value)
         elif selection == SelectionStrategy.UCB1GRAVE:
-            return node.best_child(exploration_const.value, grave_adjustment=True)
+            return node.best_child_index(exploration_const.value, grave_adjustment=True)
         elif selection == SelectionStrategy.ProgressiveHistory:
-            return node.best_child(exploration_const.value)
+            return node.best_child_index(exploration_const.value)
         elif selection == SelectionStrategy.UCB1Tuned:
-            return node.best_child(exploration_const.value, tuned=True)
+            return node.best_child_index(exploration_const.value, tuned=True)
         elif selection == SelectionStrategy.ProgressiveWidening:
-            self._apply_progressive_widening(node)
-            return node.best_child(exploration_const.value)
+            self._apply_progressive_widening(node, state)
+            return node.best_child_index(exploration_const.value)
         else:
-            return random.choice(node.children)
+            return self.rng.randrange(len(node.children))
+
+    def _apply_progressive_widening(self, node, state):
+        # Only while untried moves remain: re-expanding a full node rescans every move and adds nothing
+        if node.visits > len(node.children) and not node.is_fully_expanded():
+            self._expand(node, state)
 
-    def _apply_progressive_widening(self, node):
-        if node.visits > len(node.children):
-            self._expand(node)
+    def _playout_policy(self, state):
+        # MAST/NST statistics carry over between searches on the same board and restart on another one
+        if self.playout == PlayoutStrategy.Random200:
+            return None
+        if self.policy is None or self.policy.shape != (state.m, state.n):
+            self.policy = PlayoutPolicy(state.m, state.n, nst=self.playout == PlayoutStrategy.NST)
+        return self.policy
 
     def _simulate(self, state):
-        _, _, playout, _ = self.decode_strategy()
-        steps = 200 if playout == PlayoutStrategy.Random200 else 100
+        """Play a rollout on state in place, undo it, and return the reward and the rollout for _backpropagate.
+
+        The rollout is None for Random200; for MAST and NST it is the
+        ``_rollout_record`` of the moves from the root to the end of the game.
+        """
+        steps = self.playout_steps
+        policy = self._playout_policy(state)
+        threats = state.threats if self.tactics else None
+        played = 0
+        order = center_order(state.m, state.n)
+        cells = state._tables.cells
+        previous = None if state.last_move is None else state.last_move[0] * state.n + state.last_move[1]
 
         while not state.is_terminal() and steps > 0:
             steps -= 1
-            legal_moves = state.get_legal_moves()
-            center = (state.m // 2, state.n // 2)
-            legal_moves.sort(key=lambda move: (move[0] - center[0]) ** 2 + (move[1] - center[1]) ** 2)
-            # give more weight to earlier moves in random choice (make up probabilities that are higher towards the start) (towards center)
-            probabilities = [1 / (i + 1) for i in range(len(legal_moves))]
-            probabilities = [p / sum(probabilities) for p in probabilities]
-            move = random.choices(legal_moves, weights=probabilities)[0]
-            # move = random.choice(legal_moves)
-            state = state.make_move(move)
-
-        return state.get_reward()
-
-    def search(self, state, iterations=1000):
-        self.root = Node(state)
-
-        for _ in range(iterations):
-            node = self._select(self.root)
-            reward = self._simulate(node.state)
-            self._backpropagate(node, reward)
-        # Select the child with the highest number of wins
-        best_child = max(self.root.children, key=lambda child: child.wins)
-        return best_child.state.get_last_move()
-
-    def _expand(self, node):
-        legal_moves = node.state.get_legal_moves()
-        for move in legal_moves:
-            new_state = node.state.make_move(move)
-            if not any(child.state == new_state for child in node.children):
-                child_node = Node(new_state, parent=node)
-                node.children.append(child_node)
\ No newline at end of file
+            if threats is not None:
+                # Win at once if possible, else block the opponent's win cell: decided rollouts end in a move or two
+                player = state.current_player
+                forced = threats.win_bits[player] or threats.win_bits['O' if player == 'X' else 'X']
+                if forced:
+                    previous = (forced & -forced).bit_length() - 1
+                    state.apply(cells[previous])
+                    played += 1
+                    continue
+            occupied = state.bits['X'] | state.bits['O']
+            legal_cells = [cell for cell in order if not occupied >> cell & 1]
+            if policy is None:
+                # give more weight to earlier moves in random choice (weight 1 / (i + 1), towards center)
+                previous = self.rng.choices(legal_cells, cum_weights=center_weights(len(legal_cells)))[0]
+            else:
+                previous = policy.choose(state.current_player, previous, legal_cells, self.rng)
+            state.apply(cells[previous])
+            played += 1
+
+        reward = state.get_reward()
+        rollout = None if policy is None else _rollout_record(state)
+        self.last_rollout_length = played
+        for _ in range(played):
+            state.undo()
+        return reward, rollout
+
+    def _add_virtual_loss(self, path, sign):
+        # Count a pending rollout as a loss so the next selections in a batch spread out
+        for node in path:
+            node.update(sign, -sign)
+
+    def _search_serial(self, scratch, budget, early_stop):
+        while not self._should_stop(budget, early_stop):
+            for _ in range(min(self.check_interval, budget.iterations - budget.done)):
+                path = self._select(self.root, scratch)
+                reward, rollout = self._simulate(scratch)
+                self._backpropagate(path, reward, rollout)
+                while scratch.history:
+                    scratch.undo()
+                budget.done += 1
+        self.worker_iterations = [budget.done]
+
+    def _collect_leaves(self, scratch, count):
+        # Select count leaves, marking each path with a virtual loss until its result is backed up
+        leaves, leaf_states = [], []
+        for _ in range(count):
+            path = self._select(self.root, scratch)
+            self._add_virtual_loss(path, 1)
+            leaves.append(path)
+            leaf_states.append(self._leaf_state(scratch))
+            while scratch.history:
+                scratch.undo()
+        return leaves, leaf_states
+
+    @staticmethod
+    def _leaf_state(scratch):
+        # A copy of the selected leaf that keeps the moves below the root in its history, for the MAST/NST update
+        leaf = scratch.copy()
+        leaf.history = list(scratch.history)
+        return leaf
+
+    def _search_batched(self, scratch, budget, batch_size, early_stop):
+        """Collect leaves in mini-batches under virtual loss and play them all out in one BatchPlayout call."""
+        engine = BatchPlayout(scratch.m, scratch.n, scratch.k, self.batch_rng)
+        policy = self._playout_policy(scratch)
+        while not self._should_stop(budget, early_stop):
+            leaves, leaf_states = self._collect_leaves(scratch, min(batch_size, budget.iterations - budget.done))
+            if policy is None:
+                rewards, rollouts = engine.run(leaf_states, self.playout_steps), [None] * len(leaves)
+            else:
+                rewards, moves = engine.run(leaf_states, self.playout_steps, policy, return_moves=True)
+                rollouts = [_rollout_record(leaf, cells.tolist()) for leaf, cells in zip(leaf_states, moves)]
+            for path, reward, rollout in zip(leaves, rewards, rollouts):
+                self._add_virtual_loss(path, -1)
+                self._backpropagate(path, int(reward), rollout)
+            budget.done += len(leaves)
+        self.worker_iterations = [budget.done]
+
+    def _get_pool(self, workers):
+        if self._pool is None or self._pool_size != workers:
+            self.close()
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+            self._pool_size = workers
+        return self._pool
+
+    def close(self):
+        """Shut down the worker pool used by parallel searches, if any."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+            self._pool_size = 0
+
+    def _search_root_parallel(self, state, budget, batch_size, workers, time_budget_ms):
+        """Build one independent tree per worker, sum their root child statistics and keep any child a worker proved."""
+        iterations = budget.iterations
+        shares = [iterations // workers + (i < iterations % workers) for i in range(workers)]
+        seeds = [self.rng.getrandbits(32) for _ in range(workers)]
+        jobs = [(state, self.strategy, share, seed, batch_size, time_budget_ms) for share, seed in zip(shares, seeds) if share > 0]
+        merged = {}
+        self.worker_iterations = []
+        for stats, done in self._get_pool(workers).map(_root_search, jobs):
+            for move, player, visits, wins, proven in stats:
+                if move not in merged:
+                    merged[move] = Node(parent=self.root, player=player, key=state.canonical(state.symmetry_hashes_after(self._root_hashes, move))[0])
+                merged[move].visits += visits
+                merged[move].wins += wins
+                # Proofs are exact, so whichever worker found one speaks for all of them
+                merged[move].proven = merged[move].proven or proven
+                self.root.visits += visits
+            self.worker_iterations.append(done)
+        self.root.add_children([state.to_canonical(move, self._root_symmetry) for move in merged], list(merged.values()))
+        if self.root.child_proven.max(initial=0) > 0:
+            self.root.prove(-1)
+        budget.done = sum(self.worker_iterations)
+
+    def _search_leaf_parallel(self, scratch, budget, batch_size, workers, early_stop):
+        """Select leaves under virtual loss in this process and farm their rollouts out to the workers."""
+        batch_size = max(batch_size, workers)
+        pool = self._get_pool(workers)
+        policy = self._playout_policy(scratch)
+        # The MAST/NST tables go to shared memory once per search; workers read them in place while
+        # a batch runs, and their rollouts are learned from here between batches
+        handle = None if policy is None else policy.share()
+        self.worker_iterations = [0] * workers
+        try:
+            while not self._should_stop(budget, early_stop):
+                leaves, leaf_states = self._collect_leaves(scratch, min(batch_size, budget.iterations - budget.done))
+                chunks = [leaf_states[i::workers] for i in range(workers)]
+                jobs = [(chunk, self.strategy, self.rng.getrandbits(32), handle) for chunk in chunks]
+                results = [None] * len(leaves)
+                for i, chunk_results in enumerate(pool.map(_rollouts, jobs)):
+                    results[i::workers] = chunk_results
+                    self.worker_iterations[i] += len(chunk_results)
+                for path, (reward, rollout) in zip(leaves, results):
+                    self._add_virtual_loss(path, -1)
+                    self._backpropagate(path, reward, rollout)
+                budget.done += len(leaves)
+        finally:
+            if policy is not None:
+                policy.unshare()
+
+    def _should_stop(self, budget, early_stop):
+        if budget.done >= budget.iterations or self._stop_requested.is_set():
+            return True
+        now = time.perf_counter()
+        if budget.deadline is not None and now >= budget.deadline:
+            return True
+        return early_stop and self._is_decided(budget.remaining(now))
+
+    def _is_decided(self, remaining):
+        # True once a root move is a proven win, or the most visited root child stays ahead even if
+        # every remaining iteration goes to the runner-up
+        if self.root.child_proven.max(initial=0) > 0:
+            return True
+        first = second = 0
+        for child in self.root.children:
+            if child.visits > first:
+                first, second = child.visits, first
+            elif child.visits > second:
+                second = child.visits
+        return first > 0 and first - second > remaining
+
+    def search(self, state, iterations=None, batch_size=1, workers=1, parallel="root", time_budget_ms=None, early_stop=False):
+        """Run MCTS from state and return the chosen move.
+
+        The search runs for ``iterations`` iterations (1000 by default) or,
+        with ``time_budget_ms``, until the deadline (capped by
+        ``iterations`` if that is also given). With ``early_stop`` (off by
+        default, so a budget is spent in full) it ends as soon as no other
+        root child can catch up with the best one in the remaining budget.
+
+        With workers > 1 the search runs in a process pool, either as
+        ``parallel="root"`` (independent trees whose root statistics are
+        merged) or ``parallel="leaf"`` (one tree, rollouts run by the
+        workers). Results are reproducible when the MCTS was given a seed
+        and no time budget.
+
+        With score bounds on (a "-true" strategy), a forced win found by the
+        threat search at the root is returned without searching, and tree
+        moves proven to win or lose are always or never chosen.
+
+        With an opening ``book`` set, a position found in it is answered
+        from the book without searching (``last_from_book`` is then True).
+
+        With a ``profiler`` (models.profiler.SearchProfiler) set, the search
+        records time and calls per phase, tree shape and rollout lengths.
+        """
+        book_move = self._book_move(state)
+        if book_move is not None:
+            return book_move
+        self._set_root(state, reuse=self.reuse_tree and workers == 1)
+        self._stop_requested.clear()
+        self._run(state, iterations, batch_size, workers, parallel, time_budget_ms, early_stop)
+        return self.best_move()
+
+    def _book_move(self, state):
+        self.last_from_book = False
+        if self.book is None:
+            return None
+        started = time.perf_counter()
+        move = self.book.lookup(state)
+        if move is not None:
+            # No tree is built; the next search starts from a fresh root
+            self.last_from_book = True
+            self.root = None
+            self.reuse_stats = {"reused": False, "nodes": 0, "bytes": 0}
+            self.last_iterations = 0
+            self.last_search_ms = (time.perf_counter() - started) * 1000
+        return move
+
+    def _run(self, state, iterations, batch_size, workers, parallel, time_budget_ms, early_stop):
+        if iterations is None:
+            iterations = 1000 if time_budget_ms is None else sys.maxsize
+        budget = _Budget(iterations, time_budget_ms)
+        scratch = state.copy()  # The one state every iteration plays on and unwinds
+        if self.tactics:
+            scratch.track_threats()
+        # Profiling swaps in timed methods for this search only; without a profiler nothing changes
+        profiler = self.profiler
+        profile = None if profiler is None else profiler.begin(self)
+
+        try:
+            if self.tactics and self._solve_root(scratch):
+                self.worker_iterations = [0]
+            elif workers > 1 and parallel == "root":
+                self._search_root_parallel(state, budget, batch_size, workers, time_budget_ms)
+            elif workers > 1 and parallel == "leaf":
+                self._search_leaf_parallel(scratch, budget, batch_size, workers, early_stop)
+            elif workers > 1:
+                raise ValueError(f"Unknown parallel mode: {parallel}")
+            elif batch_size > 1:
+                self._search_batched(scratch, budget, batch_size, early_stop)
+            else:
+                self._search_serial(scratch, budget, early_stop)
+        finally:
+            self.last_iterations = budget.done
+            self.last_search_ms = (time.perf_counter() - budget.started) * 1000
+            if profile is not None:
+                profiler.end(self, profile)
+
+    def _solve_root(self, state):
+        """Look for a forced win by threats at the root; if found, prove its child and report True."""
+        if not self.threat_search_nodes:
+            return False
+        if self.root.child_proven.max(initial=0) > 0:
+            return True
+        move = threat_search(state, self.threat_search_nodes)
+        if move is None:
+            return False
+        if not self.root.is_fully_expanded():
+            self._expand(self.root, state, self._root_hashes)
+        key, _ = state.canonical(state.symmetry_hashes_after(self._root_hashes, move))
+        for child in self.root.children:
+            if child.key == key:
+                child.prove(1)
+        self.root.prove(-1)
+        return True
+
+    def start(self, state, **kwargs):
+        """Start an anytime search in a background thread; poll best_move() and end it with stop().
+
+        Takes the same keyword arguments as search(). Without iterations or
+        time_budget_ms it runs until stop() is called or, with early_stop, the
+        result is decided.
+        """
+        if kwargs.get("iterations") is None and kwargs.get("time_budget_ms") is None:
+            kwargs["iterations"] = sys.maxsize
+        self._set_root(state, reuse=self.reuse_tree and kwargs.get("workers", 1) == 1)
+        self._stop_requested.clear()
+        options = {"iterations": None, "batch_size": 1, "workers": 1, "parallel": "root", "time_budget_ms": None,
+                   "early_stop": False, **kwargs}
+        self._thread = threading.Thread(target=self._run, args=(state,), kwargs=options, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop a search started with start() and return its best move."""
+        self._stop_requested.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.best_move()
+
+    def best_move(self):
+        """Best move found so far at the root, or None before any child has been expanded."""
+        children = list(self.root.children) if self.root is not None else []
+        if not children:
+            return None
+        # Select a proven win if there is one, else the most visited child not proven lost, breaking ties on wins
+        best = max(range(len(children)), key=lambda i: (children[i].proven, children[i].visits, children[i].wins))
+        return self.root_moves()[best]
+
+    def _set_root(self, state, reuse=True):
+        """Point the root at state, keeping the subtree already searched below it when there is one."""
+        self._root_hashes = state.symmetry_hashes()
+        root_key, self._root_symmetry = state.canonical(self._root_hashes)
+        node = self._find_node(state, root_key) if reuse else None
+        if node is None:
+            self.root = Node(state, key=root_key)
+            self.tt.clear()
+            self.tt.put(root_key, self.root)
+            self.reuse_stats = {"reused": False, **self.tree_stats()}
+            return
+        node.state = state
+        node.parent = None
+        node.parents = []
+        self.root = node
+        # Rebuild the table and parent links from the nodes still reachable; everything else is freed
+        self.tt.clear()
+        self.tt.put(root_key, node)
+        seen = {id(node)}
+        stack = [(node, 0)]
+        while stack:
+            parent, depth = stack.pop()
+            for index, child in enumerate(parent.children):
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    child.parent = parent
+                    child.parents = []
+                    self.tt.put(child.key, child, depth + 1)
+                    stack.append((child, depth + 1))
+                child.parents.append((parent, index))
+        self.reuse_stats = {"reused": True, **self.tree_stats()}
+
+    def _find_node(self, state, key):
+        # The position must come from the same game and be at most our move plus the reply below the old root
+        old = self.root
+        if old is None or old.state is None:
+            return None
+        if (old.state.m, old.state.n, old.state.k, old.state.my_player) != (state.m, state.n, state.k, state.my_player):
+            return None
+        if old.key == key:
+            return old
+        for child in old.children:
+            if child.key == key:
+                return child
+            for grandchild in child.children:
+                if grandchild.key == key:
+                    return grandchild
+        return None
+
+    def tree_stats(self):
+        """Number of nodes under the root and their approximate memory footprint in bytes."""
+        seen = {id(self.root)}
+        stack = [self.root]
+        size = 0
+        while stack:
+            node = stack.pop()
+            size += sys.getsizeof(node) + sys.getsizeof(node.__dict__) + sys.getsizeof(node.children) + sys.getsizeof(node.moves)
+            size += sys.getsizeof(node.child_visits) + sys.getsizeof(node.child_wins) + sys.getsizeof(node.parents)
+            for child in node.children:
+                if id(child) not in seen:
+                    seen.add(id(child))
+                    stack.append(child)
+        return {"nodes": len(seen), "bytes": size}
+
+    def depth_histogram(self):
+        """Number of nodes under the root at each depth (a transposition counts at its shallowest)."""
+        if self.root is None:
+            return []
+        counts = []
+        seen = {id(self.root)}
+        level = [self.root]
+        while level:
+            counts.append(len(level))
+            next_level = []
+            for node in level:
+                for child in node.children:
+                    if id(child) not in seen:
+                        seen.add(id(child))
+                        next_level.append(child)
+            level = next_level
+        return counts
+
+    def root_moves(self):
+        """Moves of the root's children, on the board that was searched."""
+        return [self.root.state.from_canonical(move, self._root_symmetry) for move in self.root.moves]
+
+    def _expand(self, node, state, hashes=None):
+        # Children are keyed by canonical hash: moves leading to symmetric positions
+        # collapse into one child, and positions reached by another move order are shared
+        if hashes is None:
+            hashes = state.symmetry_hashes()
+        _, symmetry = state.canonical(hashes)
+        known = set(node.moves)
+        seen = set()
+        new_moves, new_children = [], []
+        depth = len(state.history) + 1
+        for move in self._legal_moves(state):
+            key, _ = state.canonical(state.symmetry_hashes_after(hashes, move))
+            if key in seen:
+                continue
+            seen.add(key)
+            canonical_move = state.to_canonical(move, symmetry)
+            if canonical_move in known:
+                continue
+            child_node = self.tt.get(key)
+            if child_node is None:
+                child_node = Node(parent=node, player=state.current_player, key=key)
+                self.tt.put(key, child_node, depth)
+            new_children.append(child_node)
+            new_moves.append(canonical_move)
+        node.add_children(new_moves, new_children)
+        node.num_legal = len(seen)
+
+class _Budget:
+    # Iteration cap and optional deadline for one search
+    def __init__(self, iterations, time_budget_ms=None):
+        self.iterations = iterations
+        self.started = time.perf_counter()
+        self.deadline = None if time_budget_ms is None else self.started + time_budget_ms / 1000
+        self.done = 0
+
+    def remaining(self, now):
+        remaining = self.iterations - self.done
+        if self.deadline is not None and self.done:
+            rate = self.done / max(now - self.started, 1e-9)
+            remaining = min(remaining, rate * (self.deadline - now))
+        return remaining
+
+def _root_search(job):
+    # Runs in a worker process: search one private tree and report its root children
+    state, strategy, iterations, seed, batch_size, time_budget_ms = job
+    mcts = MCTS(state, strategy, seed=seed)
+    mcts.search(state, iterations=iterations, batch_size=batch_size, time_budget_ms=time_budget_ms, early_stop=False)
+    stats = [(move, child.player, child.visits, child.wins, child.proven)
+             for move, child in zip(mcts.root_moves(), mcts.root.children)]
+    return stats, mcts.last_iterations
+
+def _rollout_record(state, playout=()):
+    """(first mover, cell played before it or None, cells) of the game simulated from the root.
+
+    The cells are the moves in state.history (the tree moves, when state is
+    the scratch or a leaf copy) followed by the playout cells.
+    """
+    n = state.n
+    if state.history:
+        first, previous = state.history[0][3], state.history[0][1]
+    else:
+        first, previous = state.current_player, state.last_move
+    cells = [row * n + col for (row, col), *_ in state.history]
+    cells.extend(playout)
+    return first, None if previous is None else previous[0] * n + previous[1], cells
+
+def _rollouts(job):
+    # Runs in a worker process: one scalar rollout per state, as (reward, rollout) pairs
+    states, strategy, seed, handle = job
+    mcts = MCTS(None, strategy, seed=seed)
+    mcts.policy = None if handle is None else PlayoutPolicy.attach(handle)
+    return [mcts._simulate(state) for state in states]
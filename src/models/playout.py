@@ -0,0 +1,296 @@
+import numpy as np
+from functools import lru_cache
+from itertools import accumulate
+from multiprocessing import shared_memory
+
+@lru_cache(maxsize=None)
+def center_order(m, n):
+    """Row-major cell indices sorted by squared distance to the center (ties keep row-major order)."""
+    center = (m // 2, n // 2)
+    return tuple(sorted(range(m * n), key=lambda cell: (cell // n - center[0]) ** 2 + (cell % n - center[1]) ** 2))
+
+@lru_cache(maxsize=None)
+def center_weights(size):
+    """Cumulative 1/(i+1) weights for picking among `size` center-ordered moves with random.choices."""
+    return list(accumulate(1 / (i + 1) for i in range(size)))
+
+@lru_cache(maxsize=None)
+def _window_index(m, n, k):
+    """(m*n, W, k) array of the cells of every k-window through each cell, padded with the sentinel m*n."""
+    per_cell = [[] for _ in range(m * n)]
+    for dx, dy in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+        for r in range(m):
+            for c in range(n):
+                end_r, end_c = r + (k - 1) * dx, c + (k - 1) * dy
+                if not (0 <= end_r < m and 0 <= end_c < n):
+                    continue
+                window = [(r + step * dx) * n + c + step * dy for step in range(k)]
+                for cell in window:
+                    per_cell[cell].append(window)
+    width = max(1, max(len(windows) for windows in per_cell))
+    index = np.full((m * n, width, k), m * n, dtype=np.intp)
+    for cell, windows in enumerate(per_cell):
+        if windows:
+            index[cell, :len(windows)] = windows
+    return index
+
+# Policy a worker process has attached to: the latest handle, its view and shared memory blocks
+_attached = {}
+
+class PlayoutPolicy:
+    """Move statistics of MAST or NST rollouts, shared by every rollout of a search.
+
+    MAST keeps the mean reward, for the player who made it, of each (player,
+    cell) move over all simulated games it appeared in, and samples rollout
+    moves with probability proportional to the center prior of
+    ``center_order`` times ``exp(value / temperature)``. That product is kept
+    in ``weights`` and refreshed only for the cells an update touches, so a
+    rollout step is a lookup and a cumulative sum.
+
+    NST also keeps 2-grams: the mean reward of a cell played in reply to the
+    opponent's previous cell (``none`` stands for "no previous move"). Moves
+    are chosen epsilon-greedily: with probability ``epsilon`` a center-biased
+    random move, otherwise the best average of the move's 1-gram value and,
+    once it has been seen ``min_visits`` times, its 2-gram value. Ties go to
+    the most central cell.
+
+    Tables are float32 arrays indexed by cell, player 0 being X; an update
+    costs O(moves of the game).
+    """
+    def __init__(self, m, n, nst=False, temperature=0.25, epsilon=0.1, min_visits=3):
+        self.shape = (m, n)
+        self.nst = nst
+        self.temperature = temperature
+        self.epsilon = epsilon
+        self.min_visits = min_visits
+        size = m * n
+        self.none = size
+        self.prior = np.empty(size, dtype=np.float32)
+        self.prior[list(center_order(m, n))] = 1 / np.arange(1, size + 1)
+        self.counts = np.zeros((2, size), dtype=np.float32)
+        self.values = np.zeros((2, size), dtype=np.float32)
+        if nst:
+            self.pair_counts = np.zeros((2, size + 1, size), dtype=np.float32)
+            self.pair_values = np.zeros((2, size + 1, size), dtype=np.float32)
+        else:
+            self.weights = np.tile(self.prior, (2, 1))
+
+    @property
+    def tables(self):
+        """Names of the array attributes that hold the statistics."""
+        learned = ('pair_counts', 'pair_values') if self.nst else ('weights',)
+        return ('prior', 'counts', 'values') + learned
+
+    def share(self):
+        """
+        Move the tables into shared memory, for worker processes to read in place.
+
+        Updates keep working and are seen by every process attached to the
+        tables, so a parallel search sends the small handle instead of
+        pickling the tables into every batch of jobs. Call unshare() when done.
+
+        Returns:
+            tuple: Picklable handle for PlayoutPolicy.attach.
+        """
+        self._shared = []
+        arrays = []
+        for name in self.tables:
+            array = getattr(self, name)
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+            shared[...] = array
+            setattr(self, name, shared)
+            self._shared.append(block)
+            arrays.append((name, block.name, array.shape, array.dtype.str))
+        settings = (self.shape, self.nst, self.temperature, self.epsilon, self.min_visits)
+        return settings, tuple(arrays)
+
+    def unshare(self):
+        """Copy the tables back into private arrays and free the shared memory made by share()."""
+        for name in self.tables:
+            setattr(self, name, getattr(self, name).copy())
+        for block in getattr(self, '_shared', ()):
+            block.close()
+            block.unlink()
+        self._shared = []
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        A read-only view of a policy shared by another process.
+
+        The view of the latest handle is kept, so every batch of a search
+        maps the tables once per worker process.
+
+        Parameters:
+            handle (tuple): Return value of share().
+
+        Returns:
+            PlayoutPolicy: Policy over the shared tables.
+        """
+        if _attached.get('handle') != handle:
+            for block in _attached.get('blocks', ()):
+                block.close()
+            settings, arrays = handle
+            (m, n), nst, temperature, epsilon, min_visits = settings
+            policy = cls.__new__(cls)
+            policy.shape, policy.nst, policy.none = (m, n), nst, m * n
+            policy.temperature, policy.epsilon, policy.min_visits = temperature, epsilon, min_visits
+            blocks = []
+            for name, block_name, shape, dtype in arrays:
+                block = shared_memory.SharedMemory(name=block_name)
+                table = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+                table.flags.writeable = False
+                setattr(policy, name, table)
+                blocks.append(block)
+            _attached.update(handle=handle, policy=policy, blocks=blocks)
+        return _attached['policy']
+
+    def choose(self, player, previous, legal, rng):
+        """Pick one of the legal cells (in center order) for player ('X' or 'O') to play after the previous cell."""
+        side = int(player == 'O')
+        if self.nst and rng.random() < self.epsilon:
+            return rng.choices(legal, cum_weights=center_weights(len(legal)))[0]
+        cells = np.array(legal)
+        if not self.nst:
+            cumulative = self.weights[side][cells].cumsum()
+            index = int(cumulative.searchsorted(rng.random() * cumulative[-1], side='right'))
+            return legal[min(index, len(legal) - 1)]
+        previous = self.none if previous is None else previous
+        values = self.values[side][cells]
+        known = self.pair_counts[side, previous][cells] >= self.min_visits
+        scores = np.where(known, (values + self.pair_values[side, previous][cells]) / 2, values)
+        return legal[int(scores.argmax())]
+
+    def update(self, first_player, previous, cells, x_reward):
+        """
+        Add one simulated game to the statistics.
+
+        Parameters:
+            first_player (str): Player who made the first move in cells.
+            previous (int): Cell played just before cells[0], or None.
+            cells (list): Cells of the game's moves, in order; players alternate.
+            x_reward (float): Result for X (1 win, 0 draw, -1 loss).
+        """
+        if not cells:
+            return
+        cells = np.asarray(cells, dtype=np.intp)
+        sides = (np.arange(len(cells)) + (first_player == 'O')) % 2
+        rewards = np.where(sides == 0, x_reward, -x_reward).astype(np.float32)
+        # A cell is played at most once per game, so fancy-indexed updates never collide
+        self._add(self.counts, self.values, (sides, cells), rewards)
+        if self.nst:
+            before = np.empty_like(cells)
+            before[0] = self.none if previous is None else previous
+            before[1:] = cells[:-1]
+            self._add(self.pair_counts, self.pair_values, (sides, before, cells), rewards)
+        else:
+            self.weights[sides, cells] = self.prior[cells] * np.exp(self.values[sides, cells] / self.temperature)
+
+    @staticmethod
+    def _add(counts, values, index, rewards):
+        counts[index] += 1
+        values[index] += (rewards - values[index]) / counts[index]
+
+class BatchPlayout:
+    """Plays many center-biased random rollouts of one (m, n, k) game at once.
+
+    Boards are held as an (N, m*n + 1) int8 array (1 for X, -1 for O, 0 for
+    empty) whose columns follow ``center_order``; the extra column is an
+    always-empty sentinel used to pad the window index. Each step samples one
+    move per unfinished game with the Gumbel-max trick, using the same 1/rank
+    center weighting as ``MCTS._simulate``, and checks only the k-windows
+    through the new stone. Given a ``PlayoutPolicy``, moves follow its MAST
+    weights or NST scores instead, read from the tables as they were when the
+    batch started.
+    """
+    def __init__(self, m, n, k, rng=None):
+        self.m, self.n, self.k = m, n, k
+        self.order = np.array(center_order(m, n), dtype=np.intp)
+        # Window cells translated to column positions in the center-ordered layout
+        position = np.empty(m * n + 1, dtype=np.intp)
+        position[self.order] = np.arange(m * n)
+        position[m * n] = m * n
+        self.windows = position[_window_index(m, n, k)[self.order]]
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def encode(self, states):
+        """Pack MNKGame states into the batch board layout."""
+        size = self.m * self.n
+        boards = np.zeros((len(states), size + 1), dtype=np.int8)
+        for row, state in enumerate(states):
+            for player, value in (('X', 1), ('O', -1)):
+                bits = state.bits[player]
+                if bits:
+                    cells = np.frombuffer(bits.to_bytes((size + 7) // 8, 'little'), dtype=np.uint8)
+                    occupied = np.unpackbits(cells, bitorder='little')[:size].astype(bool)
+                    boards[row, :size][occupied[self.order]] = value
+        return boards
+
+    def run(self, states, max_steps, policy=None, return_moves=False):
+        """
+        Play every state out for at most max_steps moves.
+
+        Parameters:
+            states (list): MNKGame states of this board.
+            max_steps (int): Move cap per rollout.
+            policy (PlayoutPolicy): MAST/NST statistics to play by; center-biased random if None.
+            return_moves (bool): Also return the cells each rollout played.
+
+        Returns:
+            array: Each state's get_reward() at the end of its rollout, and with
+            return_moves a list of per-state int arrays of played cells.
+        """
+        boards = self.encode(states)
+        to_move = np.array([1 if state.current_player == 'X' else -1 for state in states], dtype=np.int8)
+        empties = np.array([state.empty_count for state in states])
+        winners = np.array([{'X': 1, 'O': -1}.get(state.winner, 0) for state in states], dtype=np.int8)
+        active = (winners == 0) & (empties > 0)
+        played = np.full((len(states), max_steps), -1, dtype=np.intp)
+        if policy is not None and policy.nst:
+            # Policy tables with the cell axis in column order; previous moves stay cell indices
+            values = policy.values[:, self.order]
+            pair_values = policy.pair_values[:, :, self.order]
+            known = policy.pair_counts[:, :, self.order] >= policy.min_visits
+            previous = np.array([policy.none if state.last_move is None else state.last_move[0] * self.n + state.last_move[1]
+                                 for state in states])
+        elif policy is not None:
+            log_weights = np.log(policy.weights[:, self.order])
+
+        for step in range(max_steps):
+            rows = np.flatnonzero(active)
+            if rows.size == 0:
+                break
+            players = to_move[rows]
+            sides = (players == -1).astype(np.intp)
+            empty = boards[rows, :-1] == 0
+            rank = np.cumsum(empty, axis=1)
+            gumbel = self.rng.gumbel(size=empty.shape)
+            if policy is None:
+                scores = gumbel - np.log(np.maximum(rank, 1))
+            elif not policy.nst:
+                scores = gumbel + log_weights[sides]
+            else:
+                before = previous[rows]
+                greedy = np.where(known[sides, before], (values[sides] + pair_values[sides, before]) / 2, values[sides])
+                # Greedy ties go to the first (most central) column, as in PlayoutPolicy.choose
+                explore = self.rng.random(rows.size) < policy.epsilon
+                scores = np.where(explore[:, None], gumbel - np.log(np.maximum(rank, 1)), greedy)
+            cells = np.argmax(np.where(empty, scores, -np.inf), axis=1)
+            played[rows, step] = self.order[cells]
+            if policy is not None and policy.nst:
+                previous[rows] = self.order[cells]
+
+            boards[rows, cells] = players
+            lines = boards[rows[:, None, None], self.windows[cells]]
+            won = (lines == players[:, None, None]).all(axis=2).any(axis=1)
+            winners[rows[won]] = players[won]
+            empties[rows] -= 1
+            to_move[rows] = -players
+            active[rows] = ~won & (empties[rows] > 0)
+
+        mine = np.array([1 if state.my_player == 'X' else -1 for state in states], dtype=np.int8)
+        rewards = np.where(winners == 0, 0, np.where(winners == mine, 1, -1))
+        if return_moves:
+            return rewards, [row[row >= 0] for row in played]
+        return rewards
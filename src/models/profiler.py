@@ -0,0 +1,170 @@
+import time
+from collections import Counter
+
+PHASES = ("select", "expand", "simulate", "backprop")
+
+
+class SearchProfile:
+    """Instrumentation of one MCTS search.
+
+    ``seconds`` and ``calls`` are per phase: select is the tree walk without the
+    expansions made during it, expand is child creation (with its duplicate and
+    transposition checks), simulate the scalar rollouts and backprop the
+    backups. ``other_seconds`` is the rest of the search: clock and stop checks,
+    the root threat search, and the rollouts of batched (BatchPlayout) and
+    parallel searches, which run outside the instrumented methods.
+    Histograms are Counters: ``node_depths`` counts the tree's nodes by depth
+    at the end of the search, ``leaf_depths`` the depth of each selected leaf
+    and ``rollout_lengths`` the moves played by each scalar rollout.
+    """
+
+    def __init__(self, nodes_before):
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.leaf_depths = Counter()
+        self.rollout_lengths = Counter()
+        self.node_depths = Counter()
+        self.nodes_before = nodes_before
+        self.nodes_after = nodes_before
+        self.iterations = 0
+        self.search_seconds = 0.0
+
+    @property
+    def nodes_allocated(self):
+        # Nothing is freed during a search, so growth is allocation
+        return self.nodes_after - self.nodes_before
+
+    @property
+    def other_seconds(self):
+        return max(self.search_seconds - sum(self.seconds.values()), 0.0)
+
+    def as_dict(self):
+        """Plain-data form of the profile, e.g. for a JSON lines log."""
+        return {
+            "iterations": self.iterations,
+            "search_ms": self.search_seconds * 1000,
+            "phase_ms": {phase: seconds * 1000 for phase, seconds in self.seconds.items()},
+            "phase_calls": dict(self.calls),
+            "other_ms": self.other_seconds * 1000,
+            "nodes": self.nodes_after,
+            "nodes_allocated": self.nodes_allocated,
+            "node_depths": _histogram(self.node_depths),
+            "leaf_depths": _histogram(self.leaf_depths),
+            "rollout_lengths": _histogram(self.rollout_lengths),
+        }
+
+    def summary(self):
+        """A few lines for the console: time per phase, tree shape and rollout lengths."""
+        total = max(self.search_seconds, 1e-12)
+        lines = [f"{'phase':9s} {'ms':>9s} {'calls':>8s} {'us/call':>8s} {'share':>6s}"]
+        for phase in PHASES:
+            seconds, calls = self.seconds[phase], self.calls[phase]
+            per_call = seconds / calls * 1e6 if calls else 0.0
+            lines.append(f"{phase:9s} {seconds * 1000:9.2f} {calls:8d} {per_call:8.1f} {seconds / total:6.1%}")
+        lines.append(f"{'other':9s} {self.other_seconds * 1000:9.2f} {'':8s} {'':8s} {self.other_seconds / total:6.1%}")
+        lines.append(f"{self.iterations} iterations in {self.search_seconds * 1000:.1f} ms; tree {self.nodes_after} nodes "
+                     f"({self.nodes_allocated} new), nodes by depth {_histogram(self.node_depths)}")
+        if self.leaf_depths:
+            lines.append(f"selected leaf depth: {_describe(self.leaf_depths)}")
+        if self.rollout_lengths:
+            lines.append(f"rollout length: {_describe(self.rollout_lengths)}")
+        return "\n".join(lines)
+
+
+def _histogram(counter):
+    # Counts for 0..max, so depth d is index d
+    return [counter.get(value, 0) for value in range(max(counter, default=-1) + 1)]
+
+
+def _describe(counter):
+    count = sum(counter.values())
+    values = sorted(counter)
+    mean = sum(value * times for value, times in counter.items()) / count
+    seen, median = 0, values[-1]
+    for value in values:
+        seen += counter[value]
+        if seen * 2 >= count:
+            median = value
+            break
+    return f"mean {mean:.1f}, median {median}, max {values[-1]} over {count}"
+
+
+class SearchProfiler:
+    """Opt-in per-phase instrumentation of MCTS searches.
+
+    Set ``mcts.profiler = SearchProfiler()``. Each search then shadows the
+    instance's _select, _expand, _simulate and _backpropagate with timed
+    wrappers, and restores the originals when it ends. A search without a
+    profiler runs the plain methods, so disabled profiling costs one check per
+    search. ``last`` is the profile of the latest search, ``seconds`` and
+    ``calls`` accumulate over all of them, and every hook is called with each
+    finished SearchProfile.
+    """
+
+    def __init__(self, hooks=()):
+        self.hooks = list(hooks)
+        self.last = None
+        self.searches = 0
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+
+    def add_hook(self, hook):
+        """Call hook(profile) after every profiled search."""
+        self.hooks.append(hook)
+
+    def begin(self, mcts):
+        """Instrument mcts for the search that is starting and return its profile."""
+        profile = SearchProfile(mcts.tree_stats()["nodes"])
+        seconds, calls = profile.seconds, profile.calls
+        clock = time.perf_counter
+        select, expand, simulate, backpropagate = mcts._select, mcts._expand, mcts._simulate, mcts._backpropagate
+
+        def timed_select(node, state):
+            start, expanding = clock(), seconds["expand"]
+            path = select(node, state)
+            # Expansions are timed on their own
+            seconds["select"] += clock() - start - (seconds["expand"] - expanding)
+            calls["select"] += 1
+            profile.leaf_depths[len(path) - 1] += 1
+            return path
+
+        def timed_expand(*args):
+            start = clock()
+            result = expand(*args)
+            seconds["expand"] += clock() - start
+            calls["expand"] += 1
+            return result
+
+        def timed_simulate(state):
+            start = clock()
+            result = simulate(state)
+            seconds["simulate"] += clock() - start
+            calls["simulate"] += 1
+            profile.rollout_lengths[mcts.last_rollout_length] += 1
+            return result
+
+        def timed_backpropagate(*args):
+            start = clock()
+            backpropagate(*args)
+            seconds["backprop"] += clock() - start
+            calls["backprop"] += 1
+
+        mcts._select, mcts._expand = timed_select, timed_expand
+        mcts._simulate, mcts._backpropagate = timed_simulate, timed_backpropagate
+        return profile
+
+    def end(self, mcts, profile):
+        """Remove the instrumentation, complete the profile and pass it to the hooks."""
+        for name in ("_select", "_expand", "_simulate", "_backpropagate"):
+            del mcts.__dict__[name]
+        profile.iterations = mcts.last_iterations
+        profile.search_seconds = mcts.last_search_ms / 1000
+        profile.node_depths = Counter(dict(enumerate(mcts.depth_histogram())))
+        profile.nodes_after = sum(profile.node_depths.values())
+        for phase in PHASES:
+            self.seconds[phase] += profile.seconds[phase]
+            self.calls[phase] += profile.calls[phase]
+        self.searches += 1
+        self.last = profile
+        for hook in self.hooks:
+            hook(profile)
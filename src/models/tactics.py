@@ -0,0 +1,117 @@
+INFINITY = 1 << 30  # Proof/disproof number of a settled node
+
+
+class _PNNode:
+    __slots__ = ('cell', 'parent', 'children', 'attacker_to_move', 'pn', 'dn')
+
+    def __init__(self, cell, parent, attacker_to_move):
+        self.cell = cell  # Cell played to reach this node
+        self.parent = parent
+        self.children = []
+        self.attacker_to_move = attacker_to_move  # OR node if True, AND node otherwise
+        self.pn = 1
+        self.dn = 1
+
+
+def _cells(bits):
+    cells = []
+    while bits:
+        low = bits & -bits
+        cells.append(low.bit_length() - 1)
+        bits ^= low
+    return cells
+
+
+def _expand(node, state, attacker, defender):
+    # Settle node from the threat tracker, or give it its children
+    threats = state.threats
+    if node.attacker_to_move:
+        if threats.win_bits[attacker]:
+            node.pn, node.dn = 0, INFINITY
+            return
+        if state.is_terminal():
+            node.pn, node.dn = INFINITY, 0
+            return
+        blocks = threats.win_bits[defender]
+        if blocks & (blocks - 1):
+            node.pn, node.dn = INFINITY, 0
+            return
+        # A defender threat must be blocked first; otherwise every move that makes a win threat
+        cells = _cells(blocks) if blocks else _cells(threats.four_bits[attacker])
+    else:
+        if state.winner is not None:
+            node.pn, node.dn = 0, INFINITY
+            return
+        if state.is_terminal() or threats.win_bits[defender]:
+            node.pn, node.dn = INFINITY, 0
+            return
+        wins = threats.win_bits[attacker]
+        if wins & (wins - 1):
+            node.pn, node.dn = 0, INFINITY
+            return
+        # No threat to answer means the attacker lost the initiative
+        cells = _cells(wins)
+    if not cells:
+        node.pn, node.dn = INFINITY, 0
+        return
+    node.children = [_PNNode(cell, node, not node.attacker_to_move) for cell in cells]
+    _set_numbers(node)
+
+
+def _set_numbers(node):
+    if node.attacker_to_move:
+        node.pn = min(child.pn for child in node.children)
+        node.dn = min(INFINITY, sum(child.dn for child in node.children))
+    else:
+        node.pn = min(INFINITY, sum(child.pn for child in node.children))
+        node.dn = min(child.dn for child in node.children)
+
+
+def threat_search(state, max_nodes=1000):
+    """
+    Proof-number search for a forced win of the player to move by continuous threats.
+
+    The attacker only plays moves that create a win cell (or the block of a defender
+    win cell, when it has to), and the defender only the block of the attacker's win
+    cell, so most nodes have one child. A line is proven when the attacker can win at
+    once or holds two win cells, and disproven when the defender wins or threatens
+    first, or the attacker runs out of threats. Threats are read from the game's
+    ThreatTracker, which is started if needed.
+
+    Parameters:
+        state (MNKGame): Position to search; it is played on and restored.
+        max_nodes (int): Node expansions allowed before giving up.
+
+    Returns:
+        tuple: The attacker's first move (row, col) of a proven win, or None.
+    """
+    threats = state.track_threats()
+    attacker = state.current_player
+    defender = 'O' if attacker == 'X' else 'X'
+    cells = state._tables.cells
+    wins = threats.win_bits[attacker]
+    if wins:
+        return cells[(wins & -wins).bit_length() - 1]
+    root = _PNNode(None, None, True)
+    expanded = 0
+    while root.pn and root.dn and expanded < max_nodes:
+        # Walk down to the most-proving node
+        node, depth = root, 0
+        while node.children:
+            if node.attacker_to_move:
+                node = min(node.children, key=lambda child: child.pn)
+            else:
+                node = min(node.children, key=lambda child: child.dn)
+            state.apply(cells[node.cell])
+            depth += 1
+        _expand(node, state, attacker, defender)
+        expanded += 1
+        for _ in range(depth):
+            state.undo()
+        node = node.parent
+        while node is not None:
+            _set_numbers(node)
+            node = node.parent
+    if root.pn:
+        return None
+    return cells[next(child.cell for child in root.children if child.pn == 0)]
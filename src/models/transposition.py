@@ -0,0 +1,85 @@
+from collections import OrderedDict
+
+class TranspositionTable:
+    """Bounded map from position hash to search node.
+
+    ``policy="lru"`` evicts the least recently used entry once ``capacity`` is
+    reached. ``policy="depth"`` is a fixed array of ``capacity`` slots indexed
+    by ``key % capacity`` where a colliding entry only replaces the resident
+    one if it is at least as shallow, so nodes near the root (which carry the
+    most visits) survive. Evicted nodes stay in the tree; they just stop
+    being shared with other move orders.
+    """
+    def __init__(self, capacity=200_000, policy="lru"):
+        if policy not in ("lru", "depth"):
+            raise ValueError(f"Unknown replacement policy: {policy}")
+        self.capacity = capacity
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        self._entries = OrderedDict() if self.policy == "lru" else [None] * self.capacity
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def get(self, key):
+        if self.capacity <= 0:
+            node = None
+        elif self.policy == "lru":
+            node = self._entries.get(key)
+            if node is not None:
+                self._entries.move_to_end(key)
+        else:
+            slot = self._entries[key % self.capacity]
+            node = slot[1] if slot is not None and slot[0] == key else None
+        if node is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return node
+
+    def put(self, key, node, depth=0):
+        if self.capacity <= 0:
+            return
+        if self.policy == "lru":
+            if key not in self._entries and self._size >= self.capacity:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+                self._size -= 1
+            if key not in self._entries:
+                self._size += 1
+            self._entries[key] = node
+            self.stores += 1
+            return
+        index = key % self.capacity
+        slot = self._entries[index]
+        if slot is None:
+            self._size += 1
+        elif slot[0] != key:
+            if depth > slot[2]:
+                return
+            self.evictions += 1
+        self._entries[index] = (key, node, depth)
+        self.stores += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "size": self._size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
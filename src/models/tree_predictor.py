@@ -0,0 +1,226 @@
+import numpy as np
+
+# LightGBM's missing_type codes and the threshold below which a value counts as zero
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+MISSING_TYPES = {'None': MISSING_NONE, 'Zero': MISSING_ZERO, 'NaN': MISSING_NAN}
+ZERO_THRESHOLD = 1e-35
+ALL_LEAVES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class TreeArrayPredictor:
+    """
+    Standalone evaluator for a LightGBM regression booster, stored as flat NumPy arrays.
+
+    Internal nodes of all trees share one set of arrays (split feature, threshold,
+    missing-value handling, children), tree after tree in preorder; a child index below
+    zero is a leaf, ~child indexing leaf_value. Prediction needs only NumPy.
+
+    When no tree has more than 64 leaves, a batch is scored QuickScorer-style: every
+    split is tested for every row at once, each false test clears the leaves of its
+    left subtree from the tree's 64-bit leaf mask, and the exit leaf is the lowest bit
+    left. That is a fixed handful of array operations whatever the depth. Larger trees
+    are walked level by level instead.
+
+    The work grows with rows x splits, so it beats LightGBM's own predict on small
+    models and batches (the strategy model's 90 rows), but large forests scored on
+    many rows are faster through Booster.predict when LightGBM is available.
+    """
+
+    ARRAYS = ('feature', 'threshold', 'missing_type', 'default_left', 'left', 'right', 'leaf_value', 'roots')
+
+    def __init__(self, feature, threshold, missing_type, default_left, left, right, leaf_value, roots,
+                 max_depth, num_features):
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_type = missing_type
+        self.default_left = default_left
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.num_features = int(num_features)
+        # float32 inputs compare exactly against the largest float32 not above each threshold
+        with np.errstate(over='ignore'):
+            threshold32 = threshold.astype(np.float32)
+        above = threshold32.astype(np.float64) > threshold
+        threshold32[above] = np.nextafter(threshold32[above], np.float32(-np.inf))
+        self.threshold32 = threshold32
+        self.has_zero_splits = bool((missing_type == MISSING_ZERO).any())
+        self.nan_splits = np.flatnonzero(missing_type == MISSING_NAN)
+        self.zero_splits = np.flatnonzero(missing_type == MISSING_ZERO)
+        self._build_leaf_masks()
+
+    def _build_leaf_masks(self):
+        # Single-leaf trees are constants; the others get a leaf mask per split
+        self.bias = float(sum(self.leaf_value[~root] for root in self.roots if root < 0))
+        split_roots = [int(root) for root in self.roots if root >= 0]
+        first_leaves = [self._extreme_leaf(root, self.left) for root in split_roots]
+        leaf_counts = [self._extreme_leaf(root, self.right) + 1 - first for root, first in zip(split_roots, first_leaves)]
+        self.quick_scorer = all(count <= 64 for count in leaf_counts)
+        self.tree_starts = np.array(split_roots, dtype=np.intp)
+        self.leaf_offsets = np.array(first_leaves, dtype=np.intp)
+        self.leaf_masks = np.zeros(len(self.feature), dtype=np.uint64)
+        if not self.quick_scorer:
+            return
+        for root, first in zip(split_roots, first_leaves):
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                left, right = int(self.left[node]), int(self.right[node])
+                # Leaves are numbered left to right, so the left subtree's run up to the right subtree's first
+                low = self._extreme_leaf(left, self.left) - first
+                high = self._extreme_leaf(right, self.left) - first
+                self.leaf_masks[node] = ~np.uint64(((1 << high) - 1) ^ ((1 << low) - 1))
+                stack.extend(child for child in (left, right) if child >= 0)
+
+    @staticmethod
+    def _extreme_leaf(node, children):
+        # Leftmost (children=left) or rightmost (children=right) leaf of a subtree
+        while node >= 0:
+            node = int(children[node])
+        return ~node
+
+    def _go_left(self, value, nodes, float32):
+        # LightGBM's numerical decision, with NaN and zero routing only when they can occur
+        threshold = (self.threshold32 if float32 else self.threshold)[nodes]
+        go_left = value <= threshold
+        is_nan = np.isnan(value)
+        if not (self.has_zero_splits or is_nan.any()):
+            return go_left
+        missing_type = self.missing_type[nodes]
+        # NaN counts as 0.0 unless the split routes NaN itself
+        value = np.where(is_nan & (missing_type != MISSING_NAN), 0, value)
+        use_default = ((missing_type == MISSING_ZERO) & (np.abs(value) <= ZERO_THRESHOLD)) \
+            | ((missing_type == MISSING_NAN) & is_nan)
+        return np.where(use_default, self.default_left[nodes], value <= threshold)
+
+    @classmethod
+    def from_booster(cls, booster):
+        """
+        Flatten a trained lgb.Booster (numerical splits, identity objective).
+
+        Parameters:
+        - booster: The lgb.Booster, e.g. LGBMRegressor.booster_
+
+        Returns:
+        - The TreeArrayPredictor
+        """
+        dump = booster.dump_model()
+        # Parameters after the name change the output transform (e.g. 'regression sqrt' squares it)
+        objective, *parameters = dump['objective'].split()
+        if dump['num_tree_per_iteration'] != 1 or parameters \
+                or objective not in ('regression', 'regression_l1', 'huber', 'fair', 'quantile'):
+            raise ValueError(f"Only single-output regression boosters with an identity output can be exported, "
+                             f"not {dump['objective']!r}")
+        nodes = {name: [] for name in cls.ARRAYS if name not in ('leaf_value', 'roots')}
+        leaf_value, roots = [], []
+        max_depth = 0
+
+        def flatten(node, depth):
+            nonlocal max_depth
+            if 'split_feature' not in node:
+                leaf_value.append(node.get('leaf_value', 0.0))
+                max_depth = max(max_depth, depth)
+                return ~(len(leaf_value) - 1)
+            if node['decision_type'] != '<=':
+                raise ValueError("Categorical splits are not supported; one-hot encode categorical features")
+            index = len(nodes['feature'])
+            nodes['feature'].append(node['split_feature'])
+            nodes['threshold'].append(node['threshold'])
+            nodes['missing_type'].append(MISSING_TYPES[node['missing_type']])
+            nodes['default_left'].append(node['default_left'])
+            nodes['left'].append(0)
+            nodes['right'].append(0)
+            nodes['left'][index] = flatten(node['left_child'], depth + 1)
+            nodes['right'][index] = flatten(node['right_child'], depth + 1)
+            return index
+
+        for tree in dump['tree_info']:
+            if tree.get('is_linear'):
+                raise ValueError("Linear trees are not supported")
+            roots.append(flatten(tree['tree_structure'], 0))
+        scale = 1.0 / len(roots) if dump.get('average_output') else 1.0
+        return cls(
+            np.array(nodes['feature'], dtype=np.int32),
+            np.array(nodes['threshold'], dtype=np.float64),
+            np.array(nodes['missing_type'], dtype=np.int8),
+            np.array(nodes['default_left'], dtype=bool),
+            np.array(nodes['left'], dtype=np.int32),
+            np.array(nodes['right'], dtype=np.int32),
+            np.array(leaf_value, dtype=np.float64) * scale,
+            np.array(roots, dtype=np.int32),
+            max_depth,
+            dump['max_feature_idx'] + 1,
+        )
+
+    def save(self, path):
+        np.savez(path, max_depth=self.max_depth, num_features=self.num_features,
+                 **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(*(data[name] for name in cls.ARRAYS), data['max_depth'], data['num_features'])
+
+    def predict(self, features):
+        """
+        Predict target values, as the booster would.
+
+        Parameters:
+        - features: Array of shape (rows, num_features) or (num_features,); float32 is
+          compared in float32, anything else in float64 (LightGBM's thresholds are doubles)
+
+        Returns:
+        - float64 array of predictions, one per row
+        """
+        X = np.asarray(features)
+        float32 = X.dtype == np.float32
+        if not float32:
+            X = X.astype(np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.num_features:
+            raise ValueError(f"Expected {self.num_features} features, got {X.shape[1]}")
+        if not self.quick_scorer:
+            return self._predict_by_levels(X, float32)
+        if len(self.tree_starts) == 0:
+            return np.full(len(X), self.bias)
+        # NaN counts as 0.0 except at splits that route NaN, which are patched after the comparison
+        is_nan = np.isnan(X)
+        has_nan = is_nan.any()
+        X_zeroed = np.where(is_nan, 0, X) if has_nan else X
+        go_left = X_zeroed[:, self.feature] <= (self.threshold32 if float32 else self.threshold)
+        if has_nan and len(self.nan_splits):
+            splits = self.nan_splits
+            go_left[:, splits] = np.where(is_nan[:, self.feature[splits]], self.default_left[splits], go_left[:, splits])
+        if len(self.zero_splits):
+            splits = self.zero_splits
+            is_zero = np.abs(X_zeroed[:, self.feature[splits]]) <= ZERO_THRESHOLD
+            go_left[:, splits] = np.where(is_zero, self.default_left[splits], go_left[:, splits])
+        masks = np.where(go_left, ALL_LEAVES, self.leaf_masks)
+        masks = np.bitwise_and.reduceat(masks, self.tree_starts, axis=1)
+        # The exit leaf is the lowest bit left; powers of two convert to float exactly
+        lowest = masks & (~masks + np.uint64(1))
+        leaves = self.leaf_offsets + np.log2(lowest).astype(np.intp)
+        return self.leaf_value[leaves].sum(axis=1) + self.bias
+
+    def _predict_by_levels(self, X, float32):
+        # Descend all (row, tree) pairs one level per step, dropping pairs that reach a leaf
+        rows, trees = len(X), len(self.roots)
+        flat = X.ravel()
+        node = np.tile(self.roots, rows)
+        pair = np.arange(rows * trees)
+        offset = np.repeat(np.arange(rows) * X.shape[1], trees)
+        leaves = np.empty(rows * trees, dtype=np.intp)
+        while True:
+            done = node < 0
+            leaves[pair[done]] = ~node[done]
+            if done.all():
+                break
+            active = ~done
+            node, pair, offset = node[active], pair[active], offset[active]
+            go_left = self._go_left(flat[offset + self.feature[node]], node, float32)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.leaf_value[leaves].reshape(rows, trees).sum(axis=1)
+
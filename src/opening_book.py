@@ -0,0 +1,229 @@
+import argparse
+import mmap
+import os
+import random
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from mnk import MNKGame
+from models.mcts import MCTS
+
+DEFAULT_BOOK_PATH = "./cache/opening_book.bin"
+DEFAULT_BOOK_STRATEGY = "MCTS-UCB1-1.41421356237-Random200-true"
+MAGIC = b"MNKBOOK1"
+HEADER = struct.Struct("<8sII")  # Magic, slot count, entry count
+SLOT = struct.Struct("<QHhI")  # Position key, canonical cell, value x 1000, visits
+
+
+@lru_cache(maxsize=None)
+def _board_salt(m, n, k):
+    # Zobrist hashes only depend on (m, n), so the key also carries k
+    return random.Random(f"book-{m}x{n}x{k}").getrandbits(64)
+
+
+def book_key(state):
+    """
+    Key of a position in the book, shared by all its symmetric variants.
+
+    Returns:
+        tuple: (key, symmetry index of the canonical orientation)
+    """
+    hash_value, symmetry = state.canonical()
+    return (hash_value ^ _board_salt(state.m, state.n, state.k)) or 1, symmetry
+
+
+class OpeningBook:
+    """
+    Read-only opening book of searched positions and their best moves, memory-mapped.
+
+    The file is a header (magic, slot count, entry count) followed by an open-addressing
+    hash table of 16-byte slots: position key (see book_key, 0 for an empty slot), best
+    move as a cell index in the canonical orientation, its value for the player to move
+    in thousandths, and the visits behind it. The slot count is a power of two, at least
+    twice the entries, so a lookup is one canonical() call and a probe or two.
+    """
+
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        self.path = path
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slots, self.entries = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not an opening book")
+        self._mask = self.slots - 1
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.entries
+
+    def entry(self, key):
+        """(canonical cell, value, visits) stored under key, or None."""
+        slot = key & self._mask
+        while True:
+            stored, cell, value, visits = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+            if stored == key:
+                return cell, value / 1000, visits
+            if stored == 0:
+                return None
+            slot = (slot + 1) & self._mask
+
+    def items(self):
+        """All (key, (canonical cell, value, visits)) pairs of the book."""
+        for slot in range(self.slots):
+            stored, cell, value, visits = SLOT.unpack_from(self._map, HEADER.size + slot * SLOT.size)
+            if stored:
+                yield stored, (cell, value / 1000, visits)
+
+    def lookup(self, state):
+        """
+        Book move for a position.
+
+        Parameters:
+            state (MNKGame): Position, with the player to move to play the answer.
+
+        Returns:
+            tuple: (row, col) on state's own board, or None when the position is not in the book.
+        """
+        key, symmetry = book_key(state)
+        found = self.entry(key)
+        if found is None:
+            return None
+        move = state.from_canonical(divmod(found[0], state.n), symmetry)
+        # An occupied cell can only come from a key collision
+        if (state.bits['X'] | state.bits['O']) >> (move[0] * state.n + move[1]) & 1:
+            return None
+        return move
+
+
+def load_opening_book(path=DEFAULT_BOOK_PATH):
+    """Opens the book at path, or returns None if there is none."""
+    return OpeningBook(path) if os.path.exists(path) else None
+
+
+def write_book(path, entries):
+    """
+    Writes an opening book file.
+
+    Parameters:
+        path (str): Book file; replaced atomically.
+        entries (dict): Position key -> (canonical cell, value, visits).
+    """
+    slots = 1
+    while slots < 2 * len(entries):
+        slots *= 2
+    table = bytearray(HEADER.size + slots * SLOT.size)
+    HEADER.pack_into(table, 0, MAGIC, slots, len(entries))
+    for key, (cell, value, visits) in sorted(entries.items()):
+        slot = key & (slots - 1)
+        while SLOT.unpack_from(table, HEADER.size + slot * SLOT.size)[0]:
+            slot = (slot + 1) & (slots - 1)
+        SLOT.pack_into(table, HEADER.size + slot * SLOT.size, key, cell, round(value * 1000), min(visits, 0xFFFFFFFF))
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as file:
+        file.write(table)
+    os.replace(path + '.tmp', path)
+
+
+def _replay(board, moves):
+    m, n, k = board
+    state = MNKGame(m, n, k, 'X')
+    for move in moves:
+        state.apply(move)
+    state.my_player = state.current_player
+    return state
+
+
+def search_position(task):
+    """
+    Searches one book position (runs in a worker process).
+
+    Returns:
+        tuple: (key, (canonical cell, value, visits), the moves of the best children to expand next)
+    """
+    board, moves, strategy, iterations, seed, width = task
+    state = _replay(board, moves)
+    key, symmetry = book_key(state)
+    mcts = MCTS(state, strategy, seed=seed)
+    best = mcts.search(state, iterations=iterations)
+    # Proven wins first, then the most visited
+    ranked = sorted(zip(mcts.root_moves(), mcts.root.children),
+                    key=lambda pair: (pair[1].proven, pair[1].visits, pair[1].wins), reverse=True)
+    child = next(child for move, child in ranked if move == best)
+    value = child.proven if child.proven else child.wins / max(child.visits, 1)
+    follow = [move for move, _ in (ranked[:width] if width else ranked)]
+    row, col = state.to_canonical(best, symmetry)
+    return key, (row * state.n + col, value, child.visits), follow
+
+
+def build_book(boards, plies=4, width=3, iterations=20_000, strategy=DEFAULT_BOOK_STRATEGY, seed=0, workers=None,
+               path=DEFAULT_BOOK_PATH):
+    """
+    Searches the first plies of each board and adds their best moves to the book.
+
+    From the empty board, each searched position is followed through its `width` best
+    replies, so both sides' likely lines are covered; symmetric positions are searched once.
+
+    Parameters:
+        boards (list): (m, n, k) tuples.
+        plies (int): Depth of the book in moves from the empty board.
+        width (int): Replies followed per position (0 for all of them).
+        iterations (int): Search iterations per position.
+        strategy (str): Agent string of the searches.
+        seed (int): Base seed; each position's seed derives from it and the position.
+        workers (int): Worker processes (defaults to the CPU count).
+        path (str): Book file; entries of other positions already in it are kept.
+
+    Returns:
+        dict: Position key -> (canonical cell, value, visits) of the whole book.
+    """
+    book = load_opening_book(path)
+    entries = dict(book.items()) if book is not None else {}
+    if book is not None:
+        book.close()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for board in boards:
+            frontier, seen = [()], set()
+            for ply in range(plies):
+                start = time.perf_counter()
+                tasks = []
+                for moves in frontier:
+                    state = _replay(board, moves)
+                    key, _ = book_key(state)
+                    if state.is_terminal() or key in seen:
+                        continue
+                    seen.add(key)
+                    tasks.append((board, moves, strategy, iterations, random.Random(f"{seed}:{key}").getrandbits(32), width))
+                frontier = []
+                for (_, moves, *_), (key, entry, follow) in zip(tasks, executor.map(search_position, tasks)):
+                    entries[key] = entry
+                    frontier.extend(moves + (move,) for move in follow)
+                print(f"{'x'.join(map(str, board))} ply {ply}: {len(tasks)} positions, {time.perf_counter() - start:.1f}s")
+    write_book(path, entries)
+    print(f"{len(entries)} positions -> {path} ({os.path.getsize(path) / 1024:.0f} KiB)")
+    return entries
+
+
+if __name__ == "__main__":
+    from tournament import parse_board
+    parser = argparse.ArgumentParser(description="Build an opening book of deep MCTS searches for m,n,k boards.")
+    parser.add_argument("--boards", nargs="+", default=["3x3x3", "7x7x4", "15x15x5"], type=parse_board, help="boards as MxNxK")
+    parser.add_argument("--plies", type=int, default=4)
+    parser.add_argument("--width", type=int, default=3, help="replies followed per position (0 for all)")
+    parser.add_argument("--iterations", type=int, default=20_000)
+    parser.add_argument("--strategy", default=DEFAULT_BOOK_STRATEGY)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--book", default=DEFAULT_BOOK_PATH)
+    args = parser.parse_args()
+    build_book(args.boards, args.plies, args.width, args.iterations, args.strategy, args.seed, args.workers, args.book)
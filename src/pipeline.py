@@ -1,4 +1,4 @@
-def generate_ludii_mnk_game(m, n, k):
+def ludii_mnk_description(m, n, k):
     game_description = f"""
     (game "MNK Game"
         (players 2)
@@ -17,5 +17,8 @@ def generate_ludii_mnk_game(m, n, k):
         )
     )
     """
+    return game_description.strip()
+
+def generate_ludii_mnk_game(m, n, k):
     with open("input/input.txt", "w") as f:
-        f.write(game_description.strip())
\ No newline at end of file
+        f.write(ludii_mnk_description(m, n, k))
\ No newline at end of file
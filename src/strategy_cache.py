@@ -0,0 +1,208 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from helper import report_best
+from pipeline import ludii_mnk_description
+
+DEFAULT_CACHE_PATH = "./cache/strategy_cache.sqlite"
+DEFAULT_MODEL_PATH = "./models/lightgbm_model.pkl"
+
+
+def file_hash(path):
+    """
+    Returns the SHA-256 of a file's contents.
+
+    Parameters:
+        path (str): Path to the file.
+
+    Returns:
+        str: Hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StrategyCache:
+    """
+    On-disk SQLite cache of strategy rankings.
+
+    Rows are keyed by the SHA-256 of the Ludii game description and of the
+    model file, so an answer is only reused for the exact game and model that
+    produced it. Opening the cache drops rows computed with any other model
+    file, and the table is capped at max_entries rows, evicting the least
+    recently used ones.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, model_path=DEFAULT_MODEL_PATH, max_entries=10_000):
+        self.path = path
+        self.model_path = model_path
+        self.max_entries = max_entries
+        self.model_hash = file_hash(model_path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS rankings ("
+            "description_hash TEXT NOT NULL, model_hash TEXT NOT NULL, "
+            "ranking TEXT NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (description_hash, model_hash))"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS rankings_last_used ON rankings (last_used)")
+        self.connection.execute("DELETE FROM rankings WHERE model_hash != ?", (self.model_hash,))
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM rankings").fetchone()[0]
+
+    @staticmethod
+    def description_hash(description):
+        return hashlib.sha256(description.encode('utf-8')).hexdigest()
+
+    def get(self, description):
+        """
+        Looks up the ranking for a game description.
+
+        Parameters:
+            description (str): Ludii game description.
+
+        Returns:
+            list or None: (agent string, predicted utility) pairs, best first, or None on a miss.
+        """
+        key = (self.description_hash(description), self.model_hash)
+        row = self.connection.execute(
+            "SELECT ranking FROM rankings WHERE description_hash = ? AND model_hash = ?", key
+        ).fetchone()
+        if row is None:
+            return None
+        self.connection.execute(
+            "UPDATE rankings SET last_used = ? WHERE description_hash = ? AND model_hash = ?", (time.time(), *key)
+        )
+        self.connection.commit()
+        return [tuple(pair) for pair in json.loads(row[0])]
+
+    def put(self, description, ranking):
+        """
+        Stores the ranking for a game description, evicting the least recently used rows over the cap.
+
+        Parameters:
+            description (str): Ludii game description.
+            ranking (list): (agent string, predicted utility) pairs, best first.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO rankings VALUES (?, ?, ?, ?)",
+            (self.description_hash(description), self.model_hash, json.dumps(ranking), time.time()),
+        )
+        self.connection.execute(
+            "DELETE FROM rankings WHERE rowid IN ("
+            "SELECT rowid FROM rankings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self.connection.commit()
+
+    def ranking(self, description, ranker=None):
+        """
+        Returns the ranking for a game description, running inference only on a miss.
+
+        Parameters:
+            description (str): Ludii game description.
+            ranker (callable): Computes a ranking from a description on a miss
+                (defaults to in-process inference with this cache's model).
+
+        Returns:
+            list: (agent string, predicted utility) pairs, best first.
+        """
+        ranking = self.get(description)
+        if ranking is None:
+            if ranker is None:
+                from inference import rank_agent_strings_for_text
+                ranking = rank_agent_strings_for_text(description, self.model_path)
+            else:
+                ranking = ranker(description)
+            self.put(description, ranking)
+        return ranking
+
+    def prewarm(self, sizes, batch_size=256):
+        """
+        Fills the cache for a list of (m, n, k) boards.
+
+        Boards missing from the cache are ranked batch_size at a time, each
+        batch with a single predict call.
+
+        Parameters:
+            sizes (iterable): (m, n, k) tuples.
+            batch_size (int): Boards per predict call.
+
+        Returns:
+            int: Number of boards that had to be computed.
+        """
+        missing = [description for description in dict.fromkeys(ludii_mnk_description(m, n, k) for m, n, k in sizes)
+                   if self.get(description) is None]
+        if missing:
+            from inference import rank_agent_strings_for_texts
+            for start in range(0, len(missing), batch_size):
+                batch = missing[start:start + batch_size]
+                for description, ranking in zip(batch, rank_agent_strings_for_texts(batch, self.model_path)):
+                    self.put(description, ranking)
+        return len(missing)
+
+
+def get_best_string_cached(m, n, k, cache_path=DEFAULT_CACHE_PATH, model_path=DEFAULT_MODEL_PATH, server_address=None):
+    """
+    Cached equivalent of generating the Ludii file and calling inference.get_best_string.
+
+    Parameters:
+        m, n, k (int): Board size and line length.
+        cache_path (str): Path to the SQLite cache.
+        model_path (str): Path to the pre-trained model.
+        server_address (str): Socket of a running strategy_server to ask on a cache miss;
+            inference runs in-process when this is None or no server is listening.
+
+    Returns:
+        str: The best agent string.
+    """
+    with StrategyCache(cache_path, model_path) as cache:
+        ranker = None
+        if server_address is not None:
+            from strategy_server import rank_description
+            # Only a ranking from the model this cache is keyed by may be stored under its hash
+            ranker = lambda description: rank_description(description, server_address, model_path, cache.model_hash)
+        ranking = cache.ranking(ludii_mnk_description(m, n, k), ranker)
+    return report_best(ranking)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-warm the strategy cache for a grid of m,n,k boards.")
+    parser.add_argument("--m", type=int, nargs=2, default=[3, 15], metavar=("MIN", "MAX"))
+    parser.add_argument("--n", type=int, nargs=2, default=[3, 15], metavar=("MIN", "MAX"))
+    parser.add_argument("--k", type=int, nargs=2, default=[3, 6], metavar=("MIN", "MAX"))
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--max-entries", type=int, default=10_000)
+    args = parser.parse_args()
+
+    sizes = [
+        (m, n, k)
+        for m in range(args.m[0], args.m[1] + 1)
+        for n in range(args.n[0], args.n[1] + 1)
+        for k in range(args.k[0], args.k[1] + 1)
+        if k <= max(m, n)
+    ]
+    start = time.time()
+    with StrategyCache(args.cache, args.model, args.max_entries) as cache:
+        computed = cache.prewarm(sizes)
+        print(f"Pre-warmed {len(sizes)} boards ({computed} computed) in {time.time() - start:.1f}s; {len(cache)} cached")
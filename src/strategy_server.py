@@ -0,0 +1,241 @@
+import argparse
+import os
+import queue
+import secrets
+import signal
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+DEFAULT_ADDRESS = "/tmp/mnk-strategy.sock"
+DEFAULT_MODEL_PATH = "./models/lightgbm_model.pkl"
+
+
+def key_path(address):
+    # The shared secret lives next to the socket, readable by the server's user only
+    return address + ".key"
+
+
+def read_authkey(address):
+    with open(key_path(address), 'rb') as file:
+        return file.read()
+
+
+def is_listening(address):
+    """True if a server accepts connections on the socket at address (a leftover socket file does not)."""
+    probe = socket.socket(socket.AF_UNIX)
+    try:
+        probe.connect(address)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class StrategyServer:
+    """
+    Long-lived strategy prediction service on a Unix socket.
+
+    The model is loaded once at start-up. Each client connection is served by
+    its own thread; requests from all connections go through one queue, and a
+    batching thread gathers whatever arrives within batch_window_ms (up to
+    max_batch requests) into a single predict call.
+
+    Protocol: the client sends {"description": <Ludii text>} and receives
+    {"ranking": [(agent string, utility), ...], "model_hash": <SHA-256 of the
+    model file loaded>} or {"error": <message>}. The socket and the authkey
+    file next to it are only accessible to the user running the server, and
+    connections that fail the authkey handshake are dropped.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS, model_path=DEFAULT_MODEL_PATH, batch_window_ms=5, max_batch=32):
+        self.address = address
+        self.model_path = model_path
+        self.batch_window_ms = batch_window_ms
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._listener = None
+        self._socket_inode = None  # Identifies our socket file, so close() never removes another server's
+        self._closed = threading.Event()
+
+    def serve_forever(self):
+        from inference import load_model
+        from strategy_cache import file_hash
+        load_model(self.model_path)
+        self.model_hash = file_hash(self.model_path)
+        if os.path.exists(self.address):
+            if is_listening(self.address):
+                raise RuntimeError(f"Another strategy server is already listening on {self.address}")
+            os.unlink(self.address)  # Left behind by a server that did not shut down cleanly
+        authkey = secrets.token_bytes(32)
+        # Owner-only permissions from creation: no window in which another user can open either file
+        previous_umask = os.umask(0o177)
+        try:
+            with open(key_path(self.address), 'wb') as file:
+                file.write(authkey)
+            self._listener = Listener(self.address, family='AF_UNIX', authkey=authkey)
+        finally:
+            os.umask(previous_umask)
+        self._socket_inode = os.stat(self.address).st_ino
+        threading.Thread(target=self._batch_loop, daemon=True).start()
+        print(f"Strategy server listening on {self.address}")
+        try:
+            while not self._closed.is_set():
+                try:
+                    connection = self._listener.accept()
+                except (AuthenticationError, EOFError, ConnectionError):
+                    continue  # A client without the key, or one gone mid-handshake (a listening probe)
+                except OSError:
+                    break
+                threading.Thread(target=self._serve_connection, args=(connection,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self._closed.set()
+        if self._listener is not None:
+            # Closing the listener unlinks the socket; the key is ours to remove if the socket still is
+            self._listener.close()
+            self._listener = None
+        if self._socket_inode is not None:
+            try:
+                owned = not os.path.exists(self.address) or os.stat(self.address).st_ino == self._socket_inode
+                if owned and os.path.exists(key_path(self.address)):
+                    os.unlink(key_path(self.address))
+                if owned and os.path.exists(self.address):
+                    os.unlink(self.address)
+            except OSError:
+                pass
+            self._socket_inode = None
+
+    def _serve_connection(self, connection):
+        with connection:
+            while True:
+                try:
+                    request = connection.recv()
+                except (EOFError, OSError):
+                    return
+                if not isinstance(request, dict) or not isinstance(request.get("description"), str):
+                    connection.send({"error": "Expected a request of the form {'description': <Ludii text>}"})
+                    continue
+                result = Future()
+                self._queue.put((request["description"], result))
+                try:
+                    connection.send({"ranking": result.result(), "model_hash": self.model_hash})
+                except Exception as error:
+                    connection.send({"error": str(error)})
+
+    def _batch_loop(self):
+        from inference import rank_agent_strings_for_texts
+        while not self._closed.is_set():
+            batch = [self._queue.get()]
+            deadline = time.perf_counter() + self.batch_window_ms / 1000
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                rankings = rank_agent_strings_for_texts([description for description, _ in batch], self.model_path)
+            except Exception as error:
+                for _, result in batch:
+                    result.set_exception(error)
+                continue
+            for (_, result), ranking in zip(batch, rankings):
+                result.set_result(ranking)
+            self.batches += 1
+            self.requests += len(batch)
+
+
+class StrategyClient:
+    """
+    Client for StrategyServer that keeps one connection open.
+    """
+
+    def __init__(self, address=DEFAULT_ADDRESS):
+        self.connection = Client(address, family='AF_UNIX', authkey=read_authkey(address))
+        self.model_hash = None  # Of the model behind the last reply
+
+    def rank(self, description):
+        """
+        Asks the server to rank the agent strings for a game.
+
+        Parameters:
+            description (str): Ludii game description.
+
+        Returns:
+            list: (agent string, predicted utility) pairs, best first; model_hash
+                is set to the hash of the model that ranked them.
+        """
+        self.connection.send({"description": description})
+        reply = self.connection.recv()
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        self.model_hash = reply["model_hash"]
+        return [tuple(pair) for pair in reply["ranking"]]
+
+    def close(self):
+        self.connection.close()
+
+
+def rank_description(description, address=DEFAULT_ADDRESS, model_path=DEFAULT_MODEL_PATH, model_hash=None):
+    """
+    Ranks agent strings through the server, falling back to in-process inference when it is not running
+    or fails mid-request. inference (pandas, joblib, sklearn) is only imported for the fallback.
+
+    Parameters:
+        description (str): Ludii game description.
+        address (str): Server socket path.
+        model_path (str): Model used for the in-process fallback.
+        model_hash (str): If given, a ranking from a server holding any other model
+            is discarded and computed in-process instead.
+
+    Returns:
+        list: (agent string, predicted utility) pairs, best first.
+    """
+    try:
+        client = StrategyClient(address)
+    except (OSError, AuthenticationError, EOFError):
+        from inference import rank_agent_strings_for_text
+        return rank_agent_strings_for_text(description, model_path)
+    try:
+        ranking = client.rank(description)
+    except (OSError, EOFError):
+        # The server went away mid-request (ConnectionError is an OSError)
+        from inference import rank_agent_strings_for_text
+        print(f"Strategy server at {address} dropped the connection; ranking in-process", file=sys.stderr)
+        return rank_agent_strings_for_text(description, model_path)
+    finally:
+        client.close()
+    if model_hash is not None and client.model_hash != model_hash:
+        from inference import rank_agent_strings_for_text
+        print(f"Strategy server at {address} holds another model; ranking in-process", file=sys.stderr)
+        return rank_agent_strings_for_text(description, model_path)
+    return ranking
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve strategy predictions from a warm model.")
+    parser.add_argument("--socket", default=DEFAULT_ADDRESS)
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--batch-window-ms", type=float, default=5)
+    parser.add_argument("--max-batch", type=int, default=32)
+    args = parser.parse_args()
+    server = StrategyServer(args.socket, args.model, args.batch_window_ms, args.max_batch)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+    finally:
+        print(f"Served {server.requests} requests in {server.batches} batches")
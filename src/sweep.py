@@ -0,0 +1,277 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import joblib
+import lightgbm as lgb
+from sklearn.model_selection import train_test_split
+from dataloader import load_data
+
+DEFAULT_SWEEP_DIR = "./cache/sweep"
+DEFAULT_TRAIN_DIR = "../data/train"
+DEFAULT_TEST_DIR = "../data/test"
+DEFAULT_DATA_CACHE_DIR = "../data/cache"
+DATASET_FILES = ('train.bin', 'valid.bin')
+
+# Trial 0 is the configuration train.py trains, so the sweep never reports worse than the baseline
+BASELINE_PARAMS = {'learning_rate': 0.01, 'num_leaves': 31, 'min_data_in_leaf': 20,
+                   'feature_fraction': 1.0, 'bagging_fraction': 1.0, 'lambda_l2': 0.0}
+FIXED_PARAMS = {'objective': 'regression', 'metric': 'rmse', 'verbose': -1, 'bagging_freq': 1}
+
+
+def sample_params(rng):
+    """
+    Draws one configuration from the search space.
+
+    Parameters:
+        rng (random.Random): Seeded generator.
+
+    Returns:
+        dict: LightGBM training parameters (dataset parameters are fixed by the shared binary).
+    """
+    return {
+        'learning_rate': round(math.exp(rng.uniform(math.log(0.01), math.log(0.2))), 5),
+        'num_leaves': rng.choice([15, 31, 63, 127, 255]),
+        'min_data_in_leaf': rng.choice([10, 20, 50, 100]),
+        'feature_fraction': round(rng.uniform(0.5, 1.0), 3),
+        'bagging_fraction': round(rng.uniform(0.6, 1.0), 3),
+        'lambda_l2': round(math.exp(rng.uniform(math.log(1e-3), math.log(10.0))), 5),
+    }
+
+
+def rungs(min_rounds, max_rounds, eta):
+    """Boosting rounds at which trials are compared: min_rounds, min_rounds * eta, ... below max_rounds."""
+    points = []
+    rounds = min_rounds
+    while rounds < max_rounds:
+        points.append(rounds)
+        rounds *= eta
+    return points
+
+
+class Journal:
+    """
+    Append-only JSONL record of a sweep, shared by the workers.
+
+    The first line describes the sweep; after it come 'rung' events (a trial's validation
+    RMSE at a rung) and 'done' events (a finished or pruned trial). Each event is one
+    short write to a file opened in append mode, so concurrent workers do not interleave.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def events(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as file:
+            # A line cut short by an interrupted sweep is dropped
+            return [json.loads(line) for line in file if line.endswith('\n')]
+
+    def append(self, event):
+        with open(self.path, 'a') as file:
+            file.write(json.dumps(event) + '\n')
+
+    def rung_scores(self, rounds):
+        # Latest RMSE per trial at a rung
+        return {event['trial']: event['rmse'] for event in self.events()
+                if event['event'] == 'rung' and event['rounds'] == rounds}
+
+    def finished(self):
+        return {event['trial']: event for event in self.events() if event['event'] == 'done'}
+
+
+def build_datasets(sweep_dir, train_dir=DEFAULT_TRAIN_DIR, test_dir=DEFAULT_TEST_DIR, cache_dir=DEFAULT_DATA_CACHE_DIR,
+                   test_size=0.2, seed=42):
+    """
+    Bins the training data once and saves it as LightGBM binaries that every trial loads.
+
+    Parameters:
+        sweep_dir (str): Sweep directory.
+        train_dir (str): Directory containing train.csv.
+        test_dir (str): Directory containing test.csv.
+        cache_dir (str): dataloader's columnar cache directory.
+        test_size (float): Share of train held out for validation when test.csv has no target.
+        seed (int): Split seed.
+
+    Returns:
+        dict: Row and feature counts, recorded in the journal header.
+    """
+    X_train, y_train, X_valid, y_valid = load_data(train_dir, test_dir, cache_dir=cache_dir)
+    if y_valid is None:
+        X_train, X_valid, y_train, y_valid = train_test_split(X_train, y_train, test_size=test_size, random_state=seed)
+    # feature_pre_filter off, so trials may use any min_data_in_leaf with the same bins
+    train_set = lgb.Dataset(X_train, y_train, params={'feature_pre_filter': False, 'verbose': -1})
+    valid_set = lgb.Dataset(X_valid, y_valid, reference=train_set, params=train_set.params)
+    for dataset, name in zip((train_set, valid_set), DATASET_FILES):
+        path = os.path.join(sweep_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+        dataset.save_binary(path)
+    return {'train_rows': len(y_train), 'valid_rows': len(y_valid), 'features': X_train.shape[1]}
+
+
+def run_trial(sweep_dir, trial, params, num_threads, rung_rounds, eta, max_rounds, early_stopping_rounds):
+    """
+    Trains one configuration, reporting at each rung and stopping early if it falls behind.
+
+    A trial continues past a rung only if its RMSE there is in the best 1/eta of the
+    RMSEs recorded at that rung so far (asynchronous successive halving).
+
+    Returns:
+        dict: The 'done' event of the trial.
+    """
+    start = time.perf_counter()
+    journal = Journal(os.path.join(sweep_dir, 'journal.jsonl'))
+    train_set = lgb.Dataset(os.path.join(sweep_dir, 'train.bin'), params={'verbose': -1})
+    valid_set = lgb.Dataset(os.path.join(sweep_dir, 'valid.bin'), reference=train_set)
+    pruned_at = []
+    trained = [0]
+
+    def prune(env):
+        rounds = env.iteration + 1
+        trained[0] = rounds
+        if rounds not in rung_rounds:
+            return
+        rmse = env.evaluation_result_list[0][2]
+        journal.append({'event': 'rung', 'trial': trial, 'rounds': rounds, 'rmse': rmse})
+        scores = sorted(journal.rung_scores(rounds).values())
+        keep = max(1, len(scores) // eta)
+        if len(scores) >= eta and rmse > scores[keep - 1]:
+            pruned_at.append(rounds)
+            raise lgb.callback.EarlyStopException(env.iteration, env.evaluation_result_list)
+
+    booster = lgb.train(
+        {**FIXED_PARAMS, **params, 'num_threads': num_threads, 'seed': trial},
+        train_set,
+        num_boost_round=max_rounds,
+        valid_sets=[valid_set],
+        callbacks=[lgb.early_stopping(early_stopping_rounds, verbose=False), prune],
+    )
+    event = {
+        'event': 'done',
+        'trial': trial,
+        'params': params,
+        'rmse': booster.best_score['valid_0']['rmse'],
+        'best_iteration': booster.best_iteration,
+        'rounds': trained[0],
+        'pruned_at': pruned_at[0] if pruned_at else None,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+    if not pruned_at:
+        booster.save_model(os.path.join(sweep_dir, 'trials', f'{trial}.txt'), num_iteration=booster.best_iteration)
+    journal.append(event)
+    return event
+
+
+def sweep(sweep_dir=DEFAULT_SWEEP_DIR, trials=30, seed=0, workers=None, threads_per_worker=2,
+          min_rounds=50, max_rounds=1000, eta=3, early_stopping_rounds=50,
+          train_dir=DEFAULT_TRAIN_DIR, test_dir=DEFAULT_TEST_DIR, cache_dir=DEFAULT_DATA_CACHE_DIR):
+    """
+    Runs (or resumes) a hyperparameter sweep over LightGBM regressors.
+
+    Parameters:
+        sweep_dir (str): Directory for the binned data, journal, trial models and results.
+        trials (int): Number of configurations, the first being train.py's.
+        seed (int): Seed of the configuration sampler.
+        workers (int): Worker processes (defaults to CPUs // threads_per_worker).
+        threads_per_worker (int): LightGBM threads per trial.
+        min_rounds (int): First rung; later rungs are eta times apart.
+        max_rounds (int): Boosting round cap.
+        eta (int): Only the best 1/eta of trials continue past each rung.
+        early_stopping_rounds (int): Patience on the validation RMSE.
+        train_dir, test_dir (str): Directories containing train.csv and test.csv.
+        cache_dir (str): dataloader's columnar cache directory.
+
+    Returns:
+        list: 'done' events of all trials, best (lowest RMSE) first.
+    """
+    os.makedirs(os.path.join(sweep_dir, 'trials'), exist_ok=True)
+    journal = Journal(os.path.join(sweep_dir, 'journal.jsonl'))
+    config = {'trials': trials, 'seed': seed, 'min_rounds': min_rounds, 'max_rounds': max_rounds,
+              'eta': eta, 'early_stopping_rounds': early_stopping_rounds}
+    events = journal.events()
+    if events:
+        if {key: events[0].get(key) for key in config} != config:
+            raise ValueError(f"{journal.path} belongs to a sweep with other settings; use another directory")
+        missing = [name for name in DATASET_FILES if not os.path.exists(os.path.join(sweep_dir, name))]
+        if missing:
+            # Rebuilt from the same data, the bins match the ones the journaled trials used
+            print(f"Resuming sweep in {sweep_dir}; rebuilding missing {', '.join(missing)}")
+            data = build_datasets(sweep_dir, train_dir, test_dir, cache_dir)
+            if data != events[0]['data']:
+                raise ValueError(f"The data in {train_dir} and {test_dir} ({data}) is not the data this sweep "
+                                 f"started with ({events[0]['data']}); use another directory")
+        else:
+            print(f"Resuming sweep in {sweep_dir}")
+    else:
+        data = build_datasets(sweep_dir, train_dir, test_dir, cache_dir)
+        journal.append({'event': 'sweep', **config, 'data': data})
+
+    rng = random.Random(seed)
+    space = [BASELINE_PARAMS] + [sample_params(rng) for _ in range(trials - 1)]
+    finished = journal.finished()
+    pending = [trial for trial in range(trials) if trial not in finished]
+    rung_rounds = rungs(min_rounds, max_rounds, eta)
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    print(f"{len(finished)} of {trials} trials already done; running {len(pending)} on {workers} workers")
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_trial, sweep_dir, trial, space[trial], threads_per_worker,
+                                   rung_rounds, eta, max_rounds, early_stopping_rounds) for trial in pending]
+        for future in as_completed(futures):
+            event = future.result()
+            finished[event['trial']] = event
+            status = f"pruned at {event['pruned_at']}" if event['pruned_at'] else f"{event['rounds']} rounds"
+            print(f"Trial {event['trial']:3d}: RMSE {event['rmse']:.4f} ({status}, {event['seconds']:.1f}s)")
+
+    leaderboard = sorted(finished.values(), key=lambda event: (event['pruned_at'] is not None, event['rmse']))
+    write_results(sweep_dir, leaderboard)
+    return leaderboard
+
+
+def write_results(sweep_dir, leaderboard):
+    """
+    Writes leaderboard.csv (wall time against RMSE per trial) and pickles the best completed trial.
+
+    Parameters:
+        sweep_dir (str): Sweep directory.
+        leaderboard (list): 'done' events, best first.
+    """
+    with open(os.path.join(sweep_dir, 'leaderboard.csv'), 'w') as file:
+        file.write('trial,rmse,seconds,best_iteration,rounds,pruned_at,params\n')
+        for event in leaderboard:
+            pruned_at = event['pruned_at'] if event['pruned_at'] is not None else ''
+            file.write(f"{event['trial']},{event['rmse']:.6f},{event['seconds']:.3f},{event['best_iteration']},"
+                       f"{event['rounds']},{pruned_at},\"{json.dumps(event['params']).replace(chr(34), chr(39))}\"\n")
+    best = leaderboard[0]
+    booster = lgb.Booster(model_file=os.path.join(sweep_dir, 'trials', f"{best['trial']}.txt"))
+    joblib.dump(booster, os.path.join(sweep_dir, 'best_model.pkl'))
+    print(f"Best: trial {best['trial']} with RMSE {best['rmse']:.4f} -> {os.path.join(sweep_dir, 'best_model.pkl')}")
+    total = sum(event['seconds'] for event in leaderboard)
+    print(f"Total trial time {total:.1f}s; top 5 (RMSE, seconds):")
+    for event in leaderboard[:5]:
+        print(f"    trial {event['trial']:3d}  {event['rmse']:.4f}  {event['seconds']:7.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel, resumable LightGBM hyperparameter sweep.")
+    parser.add_argument("--dir", default=DEFAULT_SWEEP_DIR)
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=2)
+    parser.add_argument("--min-rounds", type=int, default=50)
+    parser.add_argument("--max-rounds", type=int, default=1000)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--early-stopping-rounds", type=int, default=50)
+    parser.add_argument("--train-dir", default=DEFAULT_TRAIN_DIR, help="directory containing train.csv")
+    parser.add_argument("--test-dir", default=DEFAULT_TEST_DIR, help="directory containing test.csv")
+    parser.add_argument("--cache-dir", default=DEFAULT_DATA_CACHE_DIR, help="dataloader's columnar cache directory")
+    args = parser.parse_args()
+    sweep(args.dir, args.trials, args.seed, args.workers, args.threads_per_worker,
+          args.min_rounds, args.max_rounds, args.eta, args.early_stopping_rounds,
+          args.train_dir, args.test_dir, args.cache_dir)
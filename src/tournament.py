@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from helper import generate_all_strings
+from mnk import MNKGame
+from models.mcts import MCTS
+
+DEFAULT_LOG_PATH = "./cache/tournament/games.jsonl"
+
+
+def parse_board(text):
+    """'7x7x5' or '7,7,5' -> (7, 7, 5)."""
+    m, n, k = map(int, text.replace(',', 'x').split('x'))
+    return m, n, k
+
+
+def board_name(board):
+    return 'x'.join(map(str, board))
+
+
+def schedule(num_agents, boards, rounds=1):
+    """
+    Lists the games of a round robin in which every pair meets with both colours on every board.
+
+    Parameters:
+        num_agents (int): Number of agents.
+        boards (list): (m, n, k) tuples.
+        rounds (int): Colour-swapped game pairs per agent pair and board.
+
+    Returns:
+        list: (board, x agent index, o agent index, round) tuples.
+    """
+    games = []
+    for board in boards:
+        for i in range(num_agents):
+            for j in range(i + 1, num_agents):
+                for r in range(rounds):
+                    games.append((board, i, j, r))
+                    games.append((board, j, i, r))
+    return games
+
+
+def game_seeds(seed, board, x, o, r):
+    # Seeded from the game's identity, so a game replays the same whatever worker or order runs it
+    rng = random.Random(f"{seed}:{board_name(board)}:{x}:{o}:{r}")
+    return rng.getrandbits(32), rng.getrandbits(32)
+
+
+def play_game(board, x_strategy, o_strategy, seeds, iterations=200, time_budget_ms=None):
+    """
+    Plays one headless game between two MCTS agents.
+
+    Parameters:
+        board (tuple): (m, n, k).
+        x_strategy, o_strategy (str): Agent strings of the X (first) and O players.
+        seeds (tuple): RNG seeds of the X and O searches.
+        iterations (int): Search iterations per move.
+        time_budget_ms (float): Optional time cap per move.
+
+    Returns:
+        tuple: (winner 'X', 'O' or None, number of moves, {'X': [ms per move], 'O': [...]})
+    """
+    m, n, k = board
+    # Each agent searches its own view of the game, in which it is my_player
+    views = {player: MNKGame(m, n, k, player) for player in 'XO'}
+    agents = {
+        'X': MCTS(views['X'], x_strategy, seed=seeds[0]),
+        'O': MCTS(views['O'], o_strategy, seed=seeds[1]),
+    }
+    times = {'X': [], 'O': []}
+    moves = 0
+    game = views['X']
+    while not game.is_terminal():
+        player = game.current_player
+        start = time.perf_counter()
+        move = agents[player].search(views[player], iterations=iterations, time_budget_ms=time_budget_ms)
+        times[player].append((time.perf_counter() - start) * 1000)
+        for view in views.values():
+            view.apply(move)
+        moves += 1
+    return game.winner, moves, times
+
+
+def _play_task(task):
+    board, x, o, r, strategies, seeds, iterations, time_budget_ms = task
+    winner, moves, times = play_game(board, strategies[0], strategies[1], seeds, iterations, time_budget_ms)
+    # Compact log line: agent indices, winner as X/O/-, per-move times in tenths of a millisecond
+    return {'b': board_name(board), 'x': x, 'o': o, 'r': r, 'w': winner or '-', 'n': moves,
+            'tx': [round(ms * 10) for ms in times['X']], 'to': [round(ms * 10) for ms in times['O']]}
+
+
+def read_log(path):
+    """
+    Reads a tournament log.
+
+    Returns:
+        tuple: (header dict or None, list of game records)
+    """
+    if not os.path.exists(path):
+        return None, []
+    header, games = None, []
+    with open(path) as file:
+        for line in file:
+            if not line.endswith('\n'):
+                break  # Cut short by an interrupted run
+            record = json.loads(line)
+            if 'agents' in record:
+                header = record
+            else:
+                games.append(record)
+    return header, games
+
+
+def run_tournament(agents, boards, rounds=1, iterations=200, time_budget_ms=None, seed=0, workers=None,
+                   log_path=DEFAULT_LOG_PATH):
+    """
+    Plays (or resumes) a round robin, streaming each finished game to an append-only log.
+
+    Parameters:
+        agents (list): Agent strings.
+        boards (list): (m, n, k) tuples.
+        rounds (int): Colour-swapped game pairs per agent pair and board.
+        iterations (int): Search iterations per move.
+        time_budget_ms (float): Optional time cap per move.
+        seed (int): Base seed; every game's seeds derive from it and the game's identity.
+        workers (int): Worker processes (defaults to the CPU count).
+        log_path (str): JSONL log; the first line records the agents and settings.
+
+    Returns:
+        list: Game records of the whole tournament.
+    """
+    config = {'agents': agents, 'iterations': iterations, 'time_budget_ms': time_budget_ms, 'seed': seed}
+    header, games = read_log(log_path)
+    if header is not None and header != config:
+        raise ValueError(f"{log_path} was written by a tournament with other agents or settings")
+    if os.path.dirname(log_path):
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    played = {(game['b'], game['x'], game['o'], game['r']) for game in games}
+    pending = [(board, x, o, r) for board, x, o, r in schedule(len(agents), boards, rounds)
+               if (board_name(board), x, o, r) not in played]
+    print(f"{len(played)} games already played; {len(pending)} to go")
+
+    with open(log_path, 'a') as log, ProcessPoolExecutor(max_workers=workers) as executor:
+        if header is None:
+            log.write(json.dumps(config) + '\n')
+        futures = [executor.submit(_play_task, (board, x, o, r, (agents[x], agents[o]), game_seeds(seed, board, x, o, r),
+                                                iterations, time_budget_ms))
+                   for board, x, o, r in pending]
+        start = time.perf_counter()
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                record = future.result()
+                log.write(json.dumps(record, separators=(',', ':')) + '\n')
+                log.flush()
+                games.append(record)
+                if done % 100 == 0 or done == len(futures):
+                    print(f"{done}/{len(futures)} games, {time.perf_counter() - start:.0f}s")
+        except KeyboardInterrupt:
+            # Games already logged are kept; a rerun plays the rest
+            executor.shutdown(cancel_futures=True)
+            raise
+    return games
+
+
+def win_rate_matrix(games, num_agents, board=None):
+    """
+    Scores of every agent against every other: (wins + draws / 2) / games, over both colours.
+
+    Parameters:
+        games (list): Game records.
+        num_agents (int): Number of agents.
+        board (str): Only count games on this board ('7x7x5'); all boards if None.
+
+    Returns:
+        tuple: (scores, games played), both (num_agents, num_agents) arrays; scores are NaN for pairs that never met.
+    """
+    points = np.zeros((num_agents, num_agents))
+    counts = np.zeros((num_agents, num_agents))
+    for game in games:
+        if board is not None and game['b'] != board:
+            continue
+        x, o = game['x'], game['o']
+        x_points = {'X': 1.0, 'O': 0.0, '-': 0.5}[game['w']]
+        points[x, o] += x_points
+        points[o, x] += 1 - x_points
+        counts[x, o] += 1
+        counts[o, x] += 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return points / counts, counts
+
+
+def latency_stats(games, num_agents):
+    """
+    Per-agent move-time statistics in milliseconds.
+
+    Returns:
+        list: One dict per agent with moves, mean, p50, p95 and max.
+    """
+    times = [[] for _ in range(num_agents)]
+    for game in games:
+        times[game['x']].extend(game['tx'])
+        times[game['o']].extend(game['to'])
+    stats = []
+    for agent_times in times:
+        ms = np.array(agent_times, dtype=float) / 10
+        if len(ms) == 0:
+            stats.append({'moves': 0, 'mean': float('nan'), 'p50': float('nan'), 'p95': float('nan'), 'max': float('nan')})
+            continue
+        stats.append({'moves': len(ms), 'mean': ms.mean(), 'p50': np.percentile(ms, 50),
+                      'p95': np.percentile(ms, 95), 'max': ms.max()})
+    return stats
+
+
+def spearman(a, b):
+    """Spearman rank correlation (average ranks for ties)."""
+    def ranks(values):
+        values = np.asarray(values, dtype=float)
+        order = values.argsort()
+        ranked = np.empty(len(values))
+        ranked[order] = np.arange(len(values))
+        for value in np.unique(values):
+            tied = values == value
+            ranked[tied] = ranked[tied].mean()
+        return ranked
+    return float(np.corrcoef(ranks(a), ranks(b))[0, 1])
+
+
+def validate_predictions(games, agents, boards, model_path="./models/lightgbm_model.pkl"):
+    """
+    Compares the model's predicted utility of each agent with its tournament score, per board.
+
+    Returns:
+        dict: Board name -> Spearman correlation between predicted utility and score.
+    """
+    from inference import rank_agent_strings_for_text
+    from pipeline import ludii_mnk_description
+    correlations = {}
+    for board in boards:
+        scores, counts = win_rate_matrix(games, len(agents), board_name(board))
+        with np.errstate(invalid='ignore'):
+            overall = np.nansum(scores * counts, axis=1) / counts.sum(axis=1)
+        predicted = dict(rank_agent_strings_for_text(ludii_mnk_description(*board), model_path))
+        played = ~np.isnan(overall)
+        if played.sum() > 2:
+            correlations[board_name(board)] = spearman([predicted[agent] for agent in np.array(agents)[played]],
+                                                       overall[played])
+    return correlations
+
+
+def report(games, agents, out_dir, top=10):
+    """Writes winrate.csv (row agent's score against column agent) and prints a per-agent summary."""
+    scores, counts = win_rate_matrix(games, len(agents))
+    with open(os.path.join(out_dir, 'winrate.csv'), 'w') as file:
+        file.write('agent,' + ','.join(agents) + '\n')
+        for agent, row in zip(agents, scores):
+            file.write(agent + ',' + ','.join('' if np.isnan(value) else f'{value:.3f}' for value in row) + '\n')
+    with np.errstate(invalid='ignore'):
+        overall = np.nansum(scores * counts, axis=1) / counts.sum(axis=1)
+    stats = latency_stats(games, len(agents))
+    x_wins = sum(game['w'] == 'X' for game in games)
+    draws = sum(game['w'] == '-' for game in games)
+    print(f"{len(games)} games: X won {x_wins}, O won {len(games) - x_wins - draws}, {draws} draws")
+    print(f"{'agent':45s} {'score':>6s} {'moves':>6s} {'mean ms':>8s} {'p50':>7s} {'p95':>7s} {'max':>7s}")
+    order = np.argsort(-np.nan_to_num(overall, nan=-1))
+    for i in order[:top]:
+        s = stats[i]
+        print(f"{agents[i]:45s} {overall[i]:6.3f} {s['moves']:6d} {s['mean']:8.1f} {s['p50']:7.1f} {s['p95']:7.1f} {s['max']:7.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless MCTS self-play tournament over m,n,k boards.")
+    parser.add_argument("--boards", nargs="+", default=["3x3x3", "4x4x3"], type=parse_board, help="boards as MxNxK")
+    parser.add_argument("--agents", nargs="+", default=None, help="agent strings (default: all 90)")
+    parser.add_argument("--sample", type=int, default=None, help="play a seeded sample of this many agents")
+    parser.add_argument("--rounds", type=int, default=1, help="colour-swapped game pairs per agent pair and board")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--time-budget-ms", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--log", default=DEFAULT_LOG_PATH)
+    parser.add_argument("--validate-model", action="store_true",
+                        help="correlate the strategy model's predicted utilities with tournament scores")
+    args = parser.parse_args()
+
+    agents = args.agents or generate_all_strings()
+    if args.sample:
+        agents = sorted(random.Random(args.seed).sample(agents, args.sample), key=agents.index)
+    games = run_tournament(agents, args.boards, args.rounds, args.iterations, args.time_budget_ms, args.seed,
+                           args.workers, args.log)
+    report(games, agents, os.path.dirname(args.log) or '.')
+    if args.validate_model:
+        for board, correlation in validate_predictions(games, agents, args.boards).items():
+            print(f"Spearman(predicted utility, score) on {board}: {correlation:+.3f}")
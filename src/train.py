@@ -1,20 +1,19 @@
 from dataloader import load_data
 from models.lgbm import LGBMModel
 from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import train_test_split
 import numpy as np
 
 def train_model():
     """
     Load data, train the LightGBM regression model, and evaluate it.
     """
-    # Load data using the data loader
-    features_train, target_train, features_test, target_test = load_data()
-    
-    # Convert PyTorch tensors to numpy arrays
-    X_train = features_train.numpy()
-    y_train = target_train.numpy().ravel()  # Flatten to 1D array
-    X_test = features_test.numpy()
-    y_test = target_test.numpy().ravel()  # Flatten to 1D array
+    # Load data using the data loader (float32 NumPy arrays, memory-mapped from the cache)
+    X_train, y_train, X_test, y_test = load_data()
+
+    if y_test is None:
+        # test.csv has no target (Kaggle test set): hold out part of train for validation instead
+        X_train, X_test, y_train, y_test = train_test_split(X_train, y_train, test_size=0.2, random_state=42)
 
     # Initialize the LGBM model
     model = LGBMModel(n_estimators=1000, learning_rate=0.01)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The code runs from src/ (python main.py), so tests import its modules the same way
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,37 @@
+"""Anytime search: best_move() polled while start() runs, and the iteration budget of search()."""
+import time
+import pytest
+from mnk import MNKGame
+from models.array_tree import ArrayMCTS
+from models.mcts import MCTS
+
+# Progressive widening adds root children throughout the search, not only on the first visit
+STRATEGY = "MCTS-ProgressiveWidening-1.41421356237-Random200-false"
+
+
+@pytest.mark.parametrize("cls", [MCTS, ArrayMCTS])
+def test_best_move_while_searching(cls):
+    game = MNKGame(9, 9, 5, 'X')
+    legal = set(game.get_legal_moves())
+    mcts = cls(game, STRATEGY, seed=0)
+    mcts.start(game, time_budget_ms=500, early_stop=False)
+    polls = 0
+    deadline = time.perf_counter() + 0.5
+    while time.perf_counter() < deadline:
+        move = mcts.best_move()
+        assert move is None or move in legal
+        polls += 1
+    assert mcts.stop() in legal
+    assert polls > 100
+
+
+def test_search_spends_its_budget_unless_early_stop():
+    # 3x3x3 from the empty board is decided for UCB1 long before 2000 iterations
+    strategy = "MCTS-UCB1-1.41421356237-Random200-false"
+    game = MNKGame(3, 3, 3, 'X')
+    mcts = MCTS(game, strategy, seed=0)
+    mcts.search(game, iterations=2000)
+    assert mcts.last_iterations == 2000
+    mcts = MCTS(game, strategy, seed=0)
+    mcts.search(game, iterations=2000, early_stop=True)
+    assert mcts.last_iterations < 2000
@@ -0,0 +1,21 @@
+"""ArrayMCTS pool sizing."""
+import pytest
+from mnk import MNKGame
+from models.array_tree import ArrayMCTS
+
+STRATEGY = "MCTS-UCB1-1.41421356237-Random200-false"
+
+
+@pytest.mark.parametrize("on_full", ["stop", "recycle"])
+def test_pool_too_small_for_root_raises(on_full):
+    game = MNKGame(7, 7, 5, 'X')
+    mcts = ArrayMCTS(game, STRATEGY, seed=0, capacity=49, on_full=on_full)
+    with pytest.raises(ValueError):
+        mcts.search(game, iterations=100)
+
+
+@pytest.mark.parametrize("on_full", ["stop", "recycle"])
+def test_smallest_pool_still_returns_a_move(on_full):
+    game = MNKGame(7, 7, 5, 'X')
+    mcts = ArrayMCTS(game, STRATEGY, seed=0, capacity=50, on_full=on_full)
+    assert mcts.search(game, iterations=200) in game.get_legal_moves()
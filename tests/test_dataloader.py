@@ -0,0 +1,47 @@
+"""Columnar CSV cache: values as pandas parses them, written in one pass."""
+import numpy as np
+import pandas as pd
+from dataloader import load_data
+
+
+def write_split(directory, name, rows, rng, with_target=True):
+    frame = pd.DataFrame({"Id": np.arange(rows), "a": rng.normal(size=rows), "b": rng.integers(0, 9, size=rows).astype(float)})
+    frame.loc[rng.random(rows) < 0.1, "a"] = np.nan
+    frame["text"] = "MCTS-UCB1-0.1-Random200-true"
+    if with_target:
+        frame["utility_agent1"] = rng.uniform(-1, 1, size=rows)
+    directory.mkdir()
+    frame.to_csv(directory / f"{name}.csv", index=False)
+    return frame
+
+
+def test_cache_matches_csv_across_growth(tmp_path):
+    rng = np.random.default_rng(0)
+    train = write_split(tmp_path / "train", "train", 1500, rng)
+    test = write_split(tmp_path / "test", "test", 70, rng, with_target=False)
+    cache = tmp_path / "cache"
+    # 64-row chunks make the .npy files grow several times
+    X_train, y_train, X_test, y_test = load_data(str(tmp_path / "train"), str(tmp_path / "test"), cache_dir=str(cache),
+                                                 chunksize=64)
+    np.testing.assert_array_equal(X_train, train[["a", "b"]].to_numpy(np.float32))
+    np.testing.assert_array_equal(y_train, train["utility_agent1"].to_numpy(np.float32))
+    np.testing.assert_array_equal(X_test, test[["a", "b"]].to_numpy(np.float32))
+    assert y_test is None
+    assert not [path for path in cache.iterdir() if path.suffix == ".tmp"]
+    # Warm start reads the same arrays back
+    X_again, *_ = load_data(str(tmp_path / "train"), str(tmp_path / "test"), cache_dir=str(cache))
+    np.testing.assert_array_equal(X_again, X_train)
+
+
+def test_non_numeric_value_past_the_sample_is_nan(tmp_path):
+    rng = np.random.default_rng(1)
+    train = write_split(tmp_path / "train", "train", 1500, rng)
+    write_split(tmp_path / "test", "test", 10, rng, with_target=False)
+    # Column b looks numeric in the first 1000 rows that decide the feature columns
+    train["b"] = train["b"].astype(object)
+    train.loc[1200, "b"] = "unknown"
+    train.to_csv(tmp_path / "train" / "train.csv", index=False)
+    X_train, *_ = load_data(str(tmp_path / "train"), str(tmp_path / "test"), cache_dir=str(tmp_path / "cache"),
+                            chunksize=500)
+    assert np.isnan(X_train[1200, 1])
+    assert np.count_nonzero(np.isnan(X_train[:, 1])) == 1
@@ -0,0 +1,90 @@
+"""Single-pass Ludii parser: AST, structural counts, streaming and errors."""
+import io
+import os
+import random
+import pytest
+import ludii_parser
+from pipeline import ludii_mnk_description
+
+INPUT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "input", "input.txt")
+
+HEADS = ['game', 'players', 'equipment', 'board', 'piece', 'rules', 'play', 'end', 'if', 'move', 'trigger',
+         'is', 'result', 'start', 'meta', 'to', 'sites', 'Remove', '<', '>=', '%', 'square', 'hand', 'and', 'or']
+ATOMS = ['Add', 'Mover', 'Win', '2', '3', '12', 'Each', 'if:', '<', '=', 'use:Vertex', 'trigger', 'moveX',
+         'Line', '%', 'P1']
+
+
+def whitespace(rng, allow_empty=True):
+    return rng.choice(([''] if allow_empty else []) + [' ', '  ', '\n', '\n    ', '\t'])
+
+
+def random_ludeme(rng, depth):
+    # Random well-formed S-expressions: ludemes, arrays, atoms and string literals
+    roll = rng.random()
+    if depth > 5 or roll < 0.3:
+        if rng.random() < 0.2:
+            return '"' + rng.choice(['Mark', 'a b', 'if move', '<x>', ' pad ']) + '"'
+        return rng.choice(ATOMS)
+    if roll < 0.4:
+        items = ''.join(whitespace(rng) + random_ludeme(rng, depth + 1) for _ in range(rng.randint(0, 3)))
+        return '{' + items + whitespace(rng) + '}'
+    children = [random_ludeme(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+    return '(' + rng.choice(HEADS) + ''.join(whitespace(rng, False) + child for child in children) + whitespace(rng) + ')'
+
+
+def summary(result):
+    return ([node.to_text() for node in result.tree], result.ludemes, result.forms, result.atoms,
+            result.concept_counts, result.stats)
+
+
+def test_mnk_description_counts():
+    result = ludii_parser.parse_text(ludii_mnk_description(7, 7, 5))
+    game, = result.tree
+    assert game.head == 'game' and game.children[0] == '"MNK Game"'
+    assert result.ludemes['board'] == 1 and result.ludemes['piece'] == 1
+    assert result.forms['move Add'] == 1
+    assert result.concept_counts['Players'] == 1
+    assert result.concept_counts['Container'] == 1 and result.concept_counts['Component'] == 1
+    assert result.concept_counts['Rules'] == result.concept_counts['Play'] + result.concept_counts['End'] + 1
+
+
+def test_ast_round_trips():
+    rng = random.Random(0)
+    for _ in range(500):
+        text = random_ludeme(rng, 0)
+        if not text.startswith(('(', '{')):
+            continue
+        tree = ludii_parser.parse_text(text).tree
+        again = ludii_parser.parse_text(' '.join(node.to_text() for node in tree))
+        assert [node.to_text() for node in again.tree] == [node.to_text() for node in tree]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+def test_chunked_reads_match_whole_text(chunk_size):
+    with open(INPUT_PATH) as file:
+        text = file.read()
+    text += '\n// trailing (comment "with" {brackets}\n' + ludii_mnk_description(3, 3, 3)
+    expected = summary(ludii_parser.parse_text(text))
+    assert summary(ludii_parser.parse(io.StringIO(text), chunk_size=chunk_size)) == expected
+
+
+def test_comments_are_skipped():
+    text = ludii_mnk_description(3, 3, 3)
+    commented = text.replace("(end", "(end // no (ifs) here\n", 1)
+    assert summary(ludii_parser.parse_text(commented)) == summary(ludii_parser.parse_text(text))
+
+
+def test_bulk_rows_skip_the_tree(tmp_path):
+    path = tmp_path / "game.lud"
+    path.write_text(ludii_mnk_description(5, 5, 4))
+    result = ludii_parser.parse_file(str(path))
+    assert result.tree is None
+    (_, row, error, size, _), = ludii_parser.parse_many([str(path)])
+    assert error is None and size == path.stat().st_size
+    assert row == result.row() and row['concept_Equipment'] == result.concept_counts['Equipment']
+
+
+@pytest.mark.parametrize("text", ["foo", "(game \"G\" (players 2)", "(rules (play (move Add))))", '(game "G', "(a }"])
+def test_malformed_descriptions_raise(text):
+    with pytest.raises(ludii_parser.LudiiParseError):
+        ludii_parser.parse_text(text)
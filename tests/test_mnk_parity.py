@@ -0,0 +1,116 @@
+"""Parity of the bitboard MNKGame with the original list-of-lists engine on seeded random games."""
+import random
+import numpy as np
+import pytest
+from mnk import MNKGame
+
+BOARDS = [(3, 3, 3), (4, 4, 3), (5, 7, 4), (6, 3, 3), (1, 6, 3), (7, 7, 5), (10, 10, 5), (15, 15, 5)]
+GAMES_PER_BOARD = 20
+
+
+class ReferenceGame:
+    """The engine before bitboards: an (m, n) array of ' '/'X'/'O' scanned cell by cell."""
+
+    def __init__(self, m, n, k):
+        self.m, self.n, self.k = m, n, k
+        self.board = np.full((m, n), ' ')
+        self.current_player = 'X'
+        self.winner = None
+        self.last_move = None
+
+    def get_legal_moves(self):
+        return [(i, j) for i in range(self.m) for j in range(self.n) if self.board[i, j] == ' ']
+
+    def make_move(self, move):
+        row, col = move
+        if self.board[row, col] != ' ':
+            raise ValueError("Invalid move: Cell is already occupied.")
+        new_game = ReferenceGame(self.m, self.n, self.k)
+        new_game.board = self.board.copy()
+        new_game.board[row, col] = self.current_player
+        new_game.last_move = move
+        new_game.current_player = 'O' if self.current_player == 'X' else 'X'
+        new_game.check_winner(row, col)
+        return new_game
+
+    def is_terminal(self):
+        if self.winner is not None:
+            return True
+        return all(cell != ' ' for row in self.board for cell in row)
+
+    def check_winner(self, row, col):
+        player = self.board[row, col]
+        for dx, dy in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            count = 0
+            for step in range(-self.k + 1, self.k):
+                r, c = row + step * dx, col + step * dy
+                if 0 <= r < self.m and 0 <= c < self.n and self.board[r, c] == player:
+                    count += 1
+                    if count == self.k:
+                        self.winner = player
+                        return
+                else:
+                    count = 0
+        self.winner = None
+
+
+def assert_same(game, reference):
+    assert sorted(game.get_legal_moves()) == reference.get_legal_moves()
+    assert game.winner == reference.winner
+    assert game.is_terminal() == reference.is_terminal()
+    assert game.current_player == reference.current_player
+    assert game.last_move == reference.last_move
+    assert (game.board == reference.board).all()
+
+
+@pytest.mark.parametrize("board", BOARDS, ids=lambda board: "x".join(map(str, board)))
+def test_make_move_matches_reference(board):
+    m, n, k = board
+    rng = random.Random(f"parity:{m}x{n}x{k}")
+    for _ in range(GAMES_PER_BOARD):
+        game, reference = MNKGame(m, n, k, 'X'), ReferenceGame(m, n, k)
+        assert_same(game, reference)
+        while not reference.is_terminal():
+            move = rng.choice(reference.get_legal_moves())
+            before = game.board
+            next_game, reference = game.make_move(move), reference.make_move(move)
+            # make_move leaves the original untouched
+            assert (game.board == before).all()
+            game = next_game
+            assert_same(game, reference)
+            # Re-checking the last move gives the same verdict
+            game.check_winner(*move)
+            reference.check_winner(*move)
+            assert game.winner == reference.winner
+        occupied = [(i, j) for i in range(m) for j in range(n) if reference.board[i, j] != ' ']
+        if occupied and not game.is_terminal():
+            with pytest.raises(ValueError):
+                game.make_move(occupied[0])
+
+
+@pytest.mark.parametrize("board", BOARDS, ids=lambda board: "x".join(map(str, board)))
+def test_apply_undo_matches_reference(board):
+    m, n, k = board
+    rng = random.Random(f"undo:{m}x{n}x{k}")
+    for _ in range(GAMES_PER_BOARD):
+        game, reference = MNKGame(m, n, k, 'X'), ReferenceGame(m, n, k)
+        snapshots = []
+        while not reference.is_terminal():
+            move = rng.choice(reference.get_legal_moves())
+            snapshots.append((dict(game.bits), game.hash, game.empty_count, game.current_player, game.last_move, game.winner))
+            game.apply(move)
+            reference = reference.make_move(move)
+            assert_same(game, reference)
+        while game.history:
+            game.undo()
+            assert snapshots.pop() == (game.bits, game.hash, game.empty_count, game.current_player, game.last_move, game.winner)
+        assert_same(game, ReferenceGame(m, n, k))
+
+
+def test_board_is_read_only():
+    game = MNKGame(3, 3, 3, 'X')
+    with pytest.raises(ValueError):
+        game.board[0][0] = 'X'
+    game.board = [['X', ' ', ' '], [' ', 'O', ' '], [' ', ' ', ' ']]
+    assert game.bits == {'X': 1, 'O': 1 << 4}
+    assert game.empty_count == 7
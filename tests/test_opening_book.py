@@ -0,0 +1,66 @@
+"""Opening book: write_book/OpeningBook round trip and lookups in every orientation."""
+import pytest
+from mnk import MNKGame
+from opening_book import OpeningBook, book_key, search_position, write_book
+
+BOARD = (5, 5, 4)
+LINES = [(), ((2, 2),), ((0, 1),), ((0, 1), (3, 4)), ((1, 0), (2, 2), (4, 3))]
+
+
+def play(moves):
+    game = MNKGame(*BOARD, 'X')
+    for move in moves:
+        game.apply(move)
+    game.my_player = game.current_player
+    return game
+
+
+@pytest.fixture(scope="module")
+def book(tmp_path_factory):
+    # Small searches of a few positions, as build_book runs them
+    searched = [search_position((BOARD, moves, "MCTS-UCB1-1.41421356237-Random200-true", 200, seed, 0))
+                for seed, moves in enumerate(LINES)]
+    entries = {key: entry for key, entry, _ in searched}
+    path = str(tmp_path_factory.mktemp("book") / "book.bin")
+    write_book(path, entries)
+    with OpeningBook(path) as opened:
+        yield opened, entries
+
+
+def test_entries_round_trip(book):
+    opened, entries = book
+    assert len(opened) == len(entries) == len(LINES)
+    assert opened.slots >= 2 * len(entries)
+    for key, (cell, value, visits) in entries.items():
+        assert opened.entry(key) == (cell, round(value * 1000) / 1000, visits)
+    assert dict(opened.items()) == {key: opened.entry(key) for key in entries}
+
+
+def test_lookup_in_every_orientation(book):
+    opened, entries = book
+    for moves in LINES:
+        state = play(moves)
+        move = opened.lookup(state)
+        cell, _, _ = entries[book_key(state)[0]]
+        # The stored cell is the book move in the canonical orientation
+        assert state.to_canonical(move, book_key(state)[1]) == divmod(cell, state.n)
+        after = state.make_move(move).canonical()[0]
+        for symmetry in range(8):
+            image = play([state.to_canonical(played, symmetry) for played in moves])
+            answer = opened.lookup(image)
+            # A position with symmetries of its own has several equivalent answers; they reach the same position
+            assert image.make_move(answer).canonical()[0] == after
+            if len(set(state.symmetry_hashes())) == 8:
+                assert answer == state.to_canonical(move, symmetry)
+
+
+def test_lookup_misses(book, tmp_path):
+    opened, entries = book
+    assert opened.lookup(play([(4, 4), (0, 0)])) is None
+    # A stored move on an occupied cell can only be a key collision
+    state = play([(2, 2)])
+    key, symmetry = book_key(state)
+    row, col = state.to_canonical((2, 2), symmetry)
+    write_book(str(tmp_path / "collision.bin"), {key: (row * state.n + col, 0.5, 10)})
+    with OpeningBook(str(tmp_path / "collision.bin")) as collision:
+        assert collision.lookup(state) is None
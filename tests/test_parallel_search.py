@@ -0,0 +1,50 @@
+"""Root- and leaf-parallel search: reproducible with a seed, and proofs survive the root merge."""
+import numpy as np
+import pytest
+from mnk import MNKGame
+from models.mcts import MCTS
+
+STRATEGY = "MCTS-UCB1-1.41421356237-Random200-true"
+
+
+def search(parallel, seed, game=None, threat_search_nodes=1000, strategy=STRATEGY):
+    game = game or MNKGame(5, 5, 4, 'X')
+    mcts = MCTS(game, strategy, seed=seed)
+    mcts.threat_search_nodes = threat_search_nodes
+    try:
+        move = mcts.search(game, iterations=400, workers=2, parallel=parallel, early_stop=False)
+        return move, list(mcts.worker_iterations), mcts
+    finally:
+        mcts.close()
+
+
+@pytest.mark.parametrize("parallel", ["root", "leaf"])
+def test_parallel_search_is_deterministic(parallel):
+    first, second = search(parallel, seed=7), search(parallel, seed=7)
+    assert first[:2] == second[:2]
+    assert sum(first[1]) == 400
+
+
+def test_root_parallel_keeps_worker_proofs():
+    # X has three in a row on 5x5x4 with O elsewhere; only (0, 3) wins at once
+    game = MNKGame(5, 5, 4, 'X')
+    for move in [(0, 0), (4, 4), (0, 1), (2, 0), (0, 2), (3, 2)]:
+        game.apply(move)
+    # With the root threat search off here, only the workers' own searches can prove it
+    move, _, mcts = search("root", seed=1, game=game, threat_search_nodes=0)
+    assert move == (0, 3)
+    assert mcts.root.child_proven.max() == 1
+    assert mcts.root.proven == -1
+
+
+@pytest.mark.parametrize("playout", ["MAST", "NST"])
+def test_leaf_parallel_shares_playout_tables(playout):
+    # Workers read the tables from shared memory; the search must match a rerun and hand them back as private arrays
+    strategy = f"MCTS-UCB1-1.41421356237-{playout}-false"
+    first, second = search("leaf", 3, strategy=strategy), search("leaf", 3, strategy=strategy)
+    assert first[:2] == second[:2]
+    policy, other = first[2].policy, second[2].policy
+    for name in policy.tables:
+        assert getattr(policy, name).base is None
+        assert np.array_equal(getattr(policy, name), getattr(other, name))
+    assert policy.counts.sum() > 0
@@ -0,0 +1,31 @@
+"""Strategy cache: batched pre-warming and the same report as uncached inference."""
+import os
+import pytest
+from helper import report_best
+from pipeline import ludii_mnk_description
+from strategy_cache import StrategyCache, get_best_string_cached
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "models", "lightgbm_model.pkl")
+
+pytest.importorskip("sklearn")
+from inference import rank_agent_strings_for_text  # noqa: E402  (needs the model's dependencies)
+
+
+def test_prewarm_matches_single_rankings(tmp_path):
+    sizes = [(3, 3, 3), (4, 4, 3), (7, 7, 5), (3, 3, 3)]
+    with StrategyCache(str(tmp_path / "cache.sqlite"), MODEL_PATH) as cache:
+        assert cache.prewarm(sizes, batch_size=2) == 3
+        assert len(cache) == 3
+        assert cache.prewarm(sizes) == 0
+        for m, n, k in sizes:
+            description = ludii_mnk_description(m, n, k)
+            expected = rank_agent_strings_for_text(description, MODEL_PATH)
+            assert cache.get(description) == expected
+
+
+def test_cached_report_matches_uncached(tmp_path, capsys):
+    expected = report_best(rank_agent_strings_for_text(ludii_mnk_description(5, 5, 4), MODEL_PATH))
+    uncached = capsys.readouterr().out
+    for _ in range(2):  # a miss, then a hit
+        assert get_best_string_cached(5, 5, 4, str(tmp_path / "cache.sqlite"), MODEL_PATH) == expected
+        assert capsys.readouterr().out == uncached
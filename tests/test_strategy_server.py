@@ -0,0 +1,58 @@
+"""rank_description: answers from a running server, and in-process rankings when the server fails."""
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+from multiprocessing.connection import Listener
+import pytest
+from strategy_server import key_path, rank_description
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+MODEL_PATH = os.path.join(SRC, "models", "lightgbm_model.pkl")
+DESCRIPTION = '(game "G" (players 2) (equipment { (board (square 3)) }) (rules (play (move Add))))'
+
+
+def fake_server(address, reply):
+    """One-connection stand-in for StrategyServer: sends reply, or drops the request if reply is None."""
+    authkey = b"k" * 32
+    with open(key_path(address), 'wb') as file:
+        file.write(authkey)
+    listener = Listener(address, family='AF_UNIX', authkey=authkey)
+
+    def serve():
+        with listener.accept() as connection:
+            connection.recv()
+            if reply is not None:
+                connection.send(reply)
+        listener.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_server_answer_skips_inference_import(tmp_path):
+    # In a fresh interpreter, so the modules loaded by other tests do not count
+    script = textwrap.dedent(f"""
+        import sys
+        sys.path.insert(0, {SRC!r}); sys.path.insert(0, {os.path.dirname(__file__)!r})
+        from test_strategy_server import fake_server
+        from strategy_server import rank_description
+        address = {str(tmp_path / "s.sock")!r}
+        thread = fake_server(address, {{"ranking": [("A", 0.5)], "model_hash": "h"}})
+        assert rank_description("(game)", address, model_hash="h") == [("A", 0.5)]
+        thread.join()
+        assert "inference" not in sys.modules and "pandas" not in sys.modules, "inference was imported"
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+def test_dropped_request_ranks_in_process(tmp_path):
+    pytest.importorskip("sklearn")
+    from inference import rank_agent_strings_for_text
+    address = str(tmp_path / "s.sock")
+    thread = fake_server(address, None)
+    assert rank_description(DESCRIPTION, address, MODEL_PATH) == rank_agent_strings_for_text(DESCRIPTION, MODEL_PATH)
+    thread.join()
@@ -0,0 +1,61 @@
+"""Board symmetries: canonical keys shared by symmetric positions, and move mapping in and out of them."""
+import random
+import pytest
+from mnk import MNKGame
+
+BOARDS = [(3, 3, 3), (5, 5, 4), (4, 6, 3), (7, 7, 5)]
+
+
+def random_moves(board, rng, plies):
+    m, n, k = board
+    game = MNKGame(m, n, k, 'X')
+    moves = []
+    while len(moves) < plies and not game.is_terminal():
+        moves.append(rng.choice(game.get_legal_moves()))
+        game.apply(moves[-1])
+    return moves
+
+
+def play(board, moves):
+    game = MNKGame(*board, 'X')
+    for move in moves:
+        game.apply(move)
+    return game
+
+
+def symmetries(board):
+    m, n, _ = board
+    return range(8 if m == n else 4)
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_symmetric_positions_share_the_canonical_key(board):
+    rng = random.Random(str(board))
+    for plies in range(1, 8):
+        moves = random_moves(board, rng, plies)
+        game = play(board, moves)
+        hashes = game.symmetry_hashes()
+        assert len(hashes) == len(symmetries(board))
+        assert hashes[0] == game.hash
+        for symmetry in symmetries(board):
+            image = play(board, [game.to_canonical(move, symmetry) for move in moves])
+            assert image.hash == hashes[symmetry]
+            assert image.canonical()[0] == game.canonical()[0]
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_moves_round_trip_through_every_symmetry(board):
+    game = MNKGame(*board, 'X')
+    cells = game.get_legal_moves()
+    for symmetry in symmetries(board):
+        images = [game.to_canonical(cell, symmetry) for cell in cells]
+        assert sorted(images) == cells
+        assert [game.from_canonical(image, symmetry) for image in images] == cells
+
+
+@pytest.mark.parametrize("board", BOARDS)
+def test_symmetry_hashes_after_matches_playing_the_move(board):
+    rng = random.Random(1)
+    game = play(board, random_moves(board, rng, 3))
+    for move in game.get_legal_moves():
+        assert game.symmetry_hashes_after(game.symmetry_hashes(), move) == game.make_move(move).symmetry_hashes()
@@ -0,0 +1,57 @@
+"""TreeArrayPredictor parity with LightGBM's own predict."""
+import numpy as np
+import pytest
+from models.tree_predictor import TreeArrayPredictor
+
+lgb = pytest.importorskip("lightgbm")
+from models.lgbm import LGBMModel  # noqa: E402  (needs LightGBM)
+
+
+def synthetic_data(rows=4000, features=12, seed=0):
+    # NaNs and exact zeros, so every missing-value rule is exercised
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    X[rng.random(X.shape) < 0.1] = 0.0
+    y = np.nan_to_num(X[:, 0]) * 2 + np.isnan(X[:, 1]) - (X[:, 2] == 0) + rng.normal(size=rows) * 0.1
+    return X, y
+
+
+def train(X, y, trees=40, **params):
+    return lgb.train({"objective": "regression", "verbose": -1, **params}, lgb.Dataset(X, y), trees)
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {"zero_as_missing": True},
+    {"num_leaves": 127, "min_data_in_leaf": 5},  # Over 64 leaves: walked level by level
+    {"num_leaves": 127, "min_data_in_leaf": 5, "zero_as_missing": True},
+    {"objective": "huber"},
+], ids=["default", "zero-as-missing", "deep", "deep-zero-as-missing", "huber"])
+def test_predictions_match_booster(params):
+    X, y = synthetic_data()
+    booster = train(X, y, **params)
+    predictor = TreeArrayPredictor.from_booster(booster)
+    assert predictor.quick_scorer == (params.get("num_leaves", 31) <= 64)
+    for features in (X, X.astype(np.float64), X[0]):
+        np.testing.assert_allclose(predictor.predict(features), booster.predict(np.atleast_2d(features)), rtol=0, atol=1e-9)
+
+
+def test_lgbm_model_export_round_trip(tmp_path):
+    X, y = synthetic_data()
+    model = LGBMModel(n_estimators=30)
+    model.model.set_params(verbose=-1)
+    model.train(X[:3000], y[:3000], X[3000:], y[3000:], early_stopping_rounds=None)
+    path = tmp_path / "predictor.npz"
+    model.export(str(path))
+    loaded = TreeArrayPredictor.load(path)
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("params", [{"reg_sqrt": True}, {"objective": "poisson"}, {"objective": "binary"}])
+def test_non_identity_outputs_are_rejected(params):
+    X, y = synthetic_data(rows=500)
+    if params.get("objective") == "binary":
+        y = (y > 0).astype(float)
+    with pytest.raises(ValueError):
+        TreeArrayPredictor.from_booster(train(X, np.abs(y), trees=5, **params))